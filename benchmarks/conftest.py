@@ -0,0 +1,246 @@
+"""API benchmarks against a locally started server and database.
+
+For every --bench-scales entry the suite creates a scratch MySQL database,
+migrates it, bulk-loads a synthetic dataset of that size (generate_dataset.py)
+and starts the server on a free port. Each benchmark times one endpoint and
+fails when its median is more than --bench-threshold above the stored baseline
+(benchmarks/baselines.json, recorded per machine since timings only compare
+on the same hardware). A benchmark without a baseline fails too, so record them first with
+--update-baselines on the machine that runs the comparisons.
+
+    python -m pytest benchmarks --bench-scales 1,10,100
+    python -m pytest benchmarks --bench-scales 1,10,100 --update-baselines
+
+Needs the mysql command-line client, Node with the server's dependencies
+installed, and DB_HOST/DB_PORT/DB_USER/DB_PASSWORD for an account that may
+create databases (same names and defaults as server/db.ts).
+"""
+import json
+import math
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import pytest
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+SERVER_DIR = os.path.join(ROOT, 'server')
+BASELINES = os.path.join(HERE, 'baselines.json')
+
+sys.path.insert(0, ROOT)
+import generate_dataset  # noqa: E402
+
+USERNAME = 'admin'
+PASSWORD = 'admin123'
+STARTUP_TIMEOUT = 120
+# Differences smaller than this are noise, whatever the percentage
+MIN_REGRESSION_MS = 5.0
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('bench', 'API benchmarks')
+    group.addoption('--bench-scales', default=os.environ.get('BENCH_SCALES', '1,10'),
+                    help='Dataset sizes as multiples of the ERP exports (default 1,10)')
+    group.addoption('--bench-rounds', type=int, default=int(os.environ.get('BENCH_ROUNDS', '20')),
+                    help='Timed calls per benchmark (default 20)')
+    group.addoption('--bench-threshold', type=float, default=float(os.environ.get('BENCH_THRESHOLD', '0.25')),
+                    help='Allowed slowdown of the median over the baseline (default 0.25 = 25%%)')
+    group.addoption('--bench-seed', type=int, default=1, help='Dataset seed')
+    group.addoption('--bench-json', help='Also write this run\'s results to a JSON file')
+    group.addoption('--update-baselines', action='store_true',
+                    help='Record this run as the new baselines instead of comparing')
+    group.addoption('--bench-keep-db', action='store_true', help='Keep the scratch databases')
+
+
+def pytest_generate_tests(metafunc):
+    if 'scale' in metafunc.fixturenames:
+        scales = [float(s) for s in metafunc.config.getoption('bench_scales').split(',') if s.strip()]
+        metafunc.parametrize('scale', scales, ids=[f'{s:g}x' for s in scales], scope='session')
+
+
+def pytest_configure(config):
+    config.bench_results = {}
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    results = config.bench_results
+    if not results:
+        return
+    if config.getoption('bench_json'):
+        with open(config.getoption('bench_json'), 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if config.getoption('update_baselines'):
+        baselines = load_baselines()
+        baselines.update({key: {'median': r['median'], 'p95': r['p95']} for key, r in results.items()})
+        with open(BASELINES, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config.bench_results
+    if not results:
+        return
+    terminalreporter.section('API benchmarks (ms)')
+    terminalreporter.write_line(f"{'benchmark':<50}{'median':>10}{'p95':>10}{'baseline':>10}{'change':>9}")
+    for key, r in sorted(results.items()):
+        baseline = r.get('baseline')
+        change = f"{(r['median'] / baseline - 1) * 100:+.0f}%" if baseline else ''
+        terminalreporter.write_line(
+            f"{key:<50}{r['median']:>10.1f}{r['p95']:>10.1f}{baseline or 0:>10.1f}{change:>9}"
+        )
+    if config.getoption('update_baselines'):
+        terminalreporter.write_line(f'Baselines written to {BASELINES}')
+
+
+def load_baselines():
+    try:
+        with open(BASELINES) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+# ---- Database and server ---------------------------------------------------
+
+def db_settings():
+    return {
+        'host': os.environ.get('DB_HOST', 'localhost'),
+        'port': os.environ.get('DB_PORT', '3306'),
+        'user': os.environ.get('DB_USER', 'root'),
+        'password': os.environ.get('DB_PASSWORD', ''),
+    }
+
+
+def mysql(sql=None, database=None, source=None):
+    """Run statements (or a file) through the mysql client"""
+    if not shutil.which('mysql'):
+        pytest.skip('mysql client not installed')
+    db = db_settings()
+    command = ['mysql', '-h', db['host'], '-P', db['port'], '-u', db['user']]
+    if database:
+        command.append(database)
+    env = {**os.environ, 'MYSQL_PWD': db['password']}
+    if source:
+        with open(source, 'rb') as f:
+            subprocess.run(command, stdin=f, env=env, check=True)
+    else:
+        subprocess.run(command + ['-e', sql], env=env, check=True)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_until_ready(base_url, process):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'Server exited with code {process.returncode} during startup')
+        try:
+            if requests.get(f'{base_url}/api/ready', timeout=2).status_code == 200:
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f'Server not ready after {STARTUP_TIMEOUT}s')
+
+
+class Api:
+    """Logged-in session against one benchmark server"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.session = requests.Session()
+        resp = self.session.post(f'{base_url}/api/auth/login', json={'username': USERNAME, 'password': PASSWORD}, timeout=30)
+        resp.raise_for_status()
+        self.session.headers['Authorization'] = f"Bearer {resp.json()['token']}"
+
+    def request(self, method, path, **kwargs):
+        resp = self.session.request(method, self.base_url + path, timeout=120, **kwargs)
+        assert resp.status_code < 400, f'{method} {path} -> {resp.status_code}: {resp.text[:200]}'
+        return resp.json() if resp.content and resp.headers.get('Content-Type', '').startswith('application/json') else None
+
+
+@pytest.fixture(scope='session')
+def server(scale, request, tmp_path_factory):
+    """Server on a scratch database holding `scale` times the ERP exports"""
+    config = request.config
+    database = f"ihome_bench_{f'{scale:g}'.replace('.', '_')}x"
+    mysql(f'DROP DATABASE IF EXISTS {database}; CREATE DATABASE {database} CHARACTER SET utf8mb4')
+
+    env = {**os.environ, 'DB_NAME': database, 'DB_READ_HOST': '', 'MIGRATE_ON_START': 'false', 'REDIS_URL': ''}
+    subprocess.run(['npx', 'tsx', 'migrate.ts'], cwd=SERVER_DIR, env=env, check=True)
+
+    out = tmp_path_factory.mktemp(database)
+    profile = generate_dataset.Profile(generate_dataset.PURCHASE_CSV, generate_dataset.SALES_CSV)
+    generate_dataset.write_sql(generate_dataset.Generator(profile, config.getoption('bench_seed'), scale, 'BENCH'), str(out))
+    mysql(database=database, source=str(out / 'dataset.sql'))
+
+    port = free_port()
+    process = subprocess.Popen(['npx', 'tsx', 'index.ts'], cwd=SERVER_DIR, env={**env, 'PORT': str(port)},
+                               stdout=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        wait_until_ready(base_url, process)
+        yield Api(base_url)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        if not config.getoption('bench_keep_db'):
+            mysql(f'DROP DATABASE IF EXISTS {database}')
+
+
+# ---- Timing ----------------------------------------------------------------
+
+@pytest.fixture
+def bench(request, scale):
+    """bench(label, fn) calls fn(n) twice untimed, then --bench-rounds times
+    timed, records median and p95 and checks the median against the baseline
+    (failing when there is none, unless --update-baselines)"""
+    config = request.config
+
+    def run(label, fn, rounds=None, warmup=2):
+        rounds = rounds or config.getoption('bench_rounds')
+        for n in range(warmup):
+            fn(-1 - n)
+        timings = []
+        for n in range(rounds):
+            start = time.perf_counter()
+            fn(n)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+
+        key = f'{scale:g}x {label}'
+        median = statistics.median(timings)
+        result = {'median': median, 'p95': timings[math.ceil(0.95 * len(timings)) - 1], 'rounds': rounds}
+        baseline = load_baselines().get(key, {}).get('median')
+        if baseline:
+            result['baseline'] = baseline
+        config.bench_results[key] = result
+
+        if config.getoption('update_baselines'):
+            return result
+        if not baseline:
+            pytest.fail(f'{key}: no baseline recorded in {os.path.basename(BASELINES)}; '
+                        'run with --update-baselines on the reference machine first', pytrace=False)
+        limit = baseline * (1 + config.getoption('bench_threshold'))
+        assert median <= limit or median - baseline < MIN_REGRESSION_MS, (
+            f'{key} regressed: median {median:.1f} ms vs baseline {baseline:.1f} ms '
+            f'(limit {limit:.1f} ms)'
+        )
+        return result
+
+    return run
@@ -0,0 +1,149 @@
+"""Timed list, create and import endpoints (see conftest.py for the setup)"""
+import csv
+import io
+import time
+
+import pytest
+
+# Lists get a unique query string per call so the response cache never
+# answers: these measure the query and serialization, which grow with the data
+LISTS = [
+    '/api/products',
+    '/api/customers',
+    '/api/suppliers',
+    '/api/invoices',
+    '/api/purchases',
+    '/api/expenses',
+    '/api/expenses/categories',
+]
+
+IMPORT_ROWS = 500
+JOB_TIMEOUT = 300
+
+
+@pytest.fixture(scope='module')
+def product_ids(server):
+    products = server.request('GET', '/api/products')
+    return [p['id'] for p in products[:20]]
+
+
+@pytest.mark.parametrize('path', LISTS)
+def test_list(server, bench, path):
+    bench(f'GET {path}', lambda n: server.request('GET', f'{path}?bench={time.monotonic_ns()}'))
+
+
+def test_get_product(server, bench, product_ids):
+    bench('GET /api/products/:id', lambda n: server.request('GET', f'/api/products/{product_ids[n % len(product_ids)]}'))
+
+
+def test_create_product(server, bench):
+    run = time.time_ns()
+    bench('POST /api/products', lambda n: server.request('POST', '/api/products', json={
+        'name': f'Benchmark product {n}',
+        'sku': f'BENCH-{run}-{n}',
+        'category': 'Benchmark',
+        'price': 50,
+        'costPrice': 30,
+        'quantity': 100,
+    }))
+
+
+def test_create_customer(server, bench):
+    bench('POST /api/customers', lambda n: server.request('POST', '/api/customers', json={
+        'name': f'Benchmark customer {n}',
+        'phone': '01000000000',
+        'customerType': 'individual',
+    }))
+
+
+def test_create_invoice(server, bench, product_ids):
+    def create(n):
+        items = [{'productId': pid, 'productName': 'Benchmark item', 'quantity': 1, 'unitPrice': 50, 'total': 50}
+                 for pid in product_ids[:3]]
+        server.request('POST', '/api/invoices', json={
+            'customer': {'name': 'Benchmark customer'},
+            'type': 'invoice',
+            'status': 'paid',
+            'subtotal': 50 * len(items),
+            'total': 50 * len(items),
+            'items': items,
+        })
+
+    bench('POST /api/invoices', create)
+
+
+def test_create_purchase(server, bench, product_ids):
+    bench('POST /api/purchases', lambda n: server.request('POST', '/api/purchases', json={
+        'supplier': {'name': 'Benchmark supplier'},
+        'status': 'received',
+        'subtotal': 140,
+        'total': 140,
+        'items': [{'productId': product_ids[n % len(product_ids)], 'productName': 'Benchmark item',
+                   'quantity': 5, 'unitCost': 28, 'total': 140}],
+    }))
+
+
+def test_create_expense(server, bench):
+    bench('POST /api/expenses', lambda n: server.request('POST', '/api/expenses', json={
+        'amount': 12.5,
+        'description': 'Benchmark expense',
+        'date': time.strftime('%Y-%m-%d'),
+    }))
+
+
+# ---- Imports: upload a CSV and wait for the background job -----------------
+
+def csv_file(header, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def run_import(server, path, body):
+    job = server.request('POST', path, files={'csv': ('import.csv', body, 'text/csv')})
+    deadline = time.monotonic() + JOB_TIMEOUT
+    while time.monotonic() < deadline:
+        status = server.request('GET', f"/api/jobs/{job['jobId']}")
+        if status['status'] in ('completed', 'failed'):
+            assert status['status'] == 'completed', f"{path} import failed: {status.get('message')}"
+            return
+        time.sleep(0.05)
+    raise AssertionError(f'{path} import still running after {JOB_TIMEOUT}s')
+
+
+@pytest.mark.parametrize('mode', ['batch', 'load'])
+def test_import_products(server, bench, mode):
+    run = time.time_ns()
+    path = '/api/products/import' + ('?mode=load' if mode == 'load' else '')
+
+    def upload(n):
+        body = csv_file(['name', 'sku', 'category', 'price', 'costPrice', 'quantity'], [
+            [f'Imported product {i}', f'BENCH-IMP-{run}-{mode}-{n}-{i}', 'Benchmark', 50, 30, 10]
+            for i in range(IMPORT_ROWS)
+        ])
+        run_import(server, path, body)
+
+    bench(f'POST /api/products/import ({mode}, {IMPORT_ROWS} rows)', upload, rounds=5, warmup=1)
+
+
+def test_import_customers(server, bench):
+    def upload(n):
+        body = csv_file(['name', 'email', 'phone', 'customerType'], [
+            [f'Imported customer {n}-{i}', '', '01000000000', 'individual'] for i in range(IMPORT_ROWS)
+        ])
+        run_import(server, '/api/customers/import', body)
+
+    bench(f'POST /api/customers/import ({IMPORT_ROWS} rows)', upload, rounds=5, warmup=1)
+
+
+def test_import_purchases(server, bench, product_ids):
+    def upload(n):
+        body = csv_file(['invoiceNumber', 'supplierName', 'productName', 'productId', 'quantity', 'unitCost'], [
+            [f'BENCH-PUR-{n}-{i // 5}', 'Benchmark supplier', 'Benchmark item', product_ids[i % len(product_ids)], 2, 28]
+            for i in range(IMPORT_ROWS)
+        ])
+        run_import(server, '/api/purchases/import', body)
+
+    bench(f'POST /api/purchases/import ({IMPORT_ROWS} rows)', upload, rounds=5, warmup=1)
@@ -0,0 +1,537 @@
+"""Synthetic datasets shaped like the ERP exports, for scale testing.
+
+Learns from 'Purchase Invoice.csv' and 'Sales Invoice (1).csv' next to this
+script: the item catalog (SKU formats, names, groups, rate ranges), customer
+names and their titles, suppliers, items per invoice, quantities and discounts.
+It then generates --scale times the exported volume, the same for a given
+--seed, in one of two formats:
+
+    # ERP-format CSVs, to go through the API with import_history.py
+    python generate_dataset.py --scale 10 --format csv --out dataset-10x
+    python import_history.py --purchases "dataset-10x/Purchase Invoice.csv" --sales "dataset-10x/Sales Invoice.csv"
+
+    # Bulk SQL straight into MySQL (much faster for 100x / 1000x)
+    python generate_dataset.py --scale 1000 --format sql --out dataset-1000x
+    mysql ihome_system < dataset-1000x/dataset.sql
+
+The SQL inserts products, customers, suppliers, invoices and purchases with
+their items and the matching stock ledger, so products.quantity agrees with
+stock_movements. It is meant for a dedicated, freshly migrated database
+(npm run migrate): the catalog reuses the exported SKUs, which are unique.
+"""
+import argparse
+import csv
+import datetime
+import os
+import random
+import statistics
+import string
+import sys
+import uuid
+from collections import defaultdict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PURCHASE_CSV = os.path.join(HERE, 'Purchase Invoice.csv')
+SALES_CSV = os.path.join(HERE, 'Sales Invoice (1).csv')
+
+# Honorifics the exports put in front of customer names
+TITLES = {'م', 'م.', 'ا.', 'ا/', 'أ.', 'استاذ', 'أستاذ', 'مهندس', 'د.', 'دكتور'}
+# Item groups that are services rather than stock (e.g. installation)
+SERVICE_GROUPS = {'تركيب'}
+SQL_BATCH = 1000
+
+
+def clean_sku(value):
+    sku = str(value or '').strip()
+    if sku.endswith('.0'):
+        sku = sku[:-2]
+    return sku
+
+
+def number(value, default=0.0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def read_invoices(path):
+    """Header row plus item rows per invoice; continuation rows have no ID"""
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        columns = reader.fieldnames
+        invoices = []
+        for row in reader:
+            if row['ID']:
+                invoices.append({'header': row, 'items': []})
+            if invoices and row.get('Item Name (Items)'):
+                invoices[-1]['items'].append(row)
+    return columns, invoices
+
+
+def sku_shape(sku):
+    """'T5-4C-120' -> 'A9-9A-999': digits and letters become placeholders"""
+    return ''.join('9' if c.isdigit() else 'a' if c.islower() else 'A' if c.isupper() else c for c in sku)
+
+
+def fill_shape(rng, shape):
+    pools = {'9': string.digits, 'a': string.ascii_lowercase, 'A': string.ascii_uppercase}
+    return ''.join(rng.choice(pools[c]) if c in pools else c for c in shape)
+
+
+class Profile:
+    """Column distributions learned from the two exports"""
+
+    def __init__(self, purchase_path, sales_path):
+        self.purchase_columns, purchases = read_invoices(purchase_path)
+        self.sales_columns, sales = read_invoices(sales_path)
+        if not purchases or not sales:
+            raise SystemExit('Both exports need at least one invoice to learn from')
+
+        self.catalog = {}  # sku -> item
+        self.purchase_lines = [len(inv['items']) for inv in purchases if inv['items']]
+        self.sales_lines = [len(inv['items']) for inv in sales if inv['items']]
+        self.purchase_qty = []
+        self.sales_qty = []
+        self.discounts = []
+        self.suppliers = sorted({inv['header']['Supplier'] for inv in purchases if inv['header']['Supplier']})
+        self.credit_to = next((inv['header']['Credit To'] for inv in purchases if inv['header']['Credit To']), '')
+
+        for inv in purchases:
+            for row in inv['items']:
+                item = self._item(row)
+                item['costs'].append(number(row['Rate (Items)']))
+                self.purchase_qty.append(max(1, int(number(row['Accepted Qty (Items)'], 1))))
+        for inv in sales:
+            for row in inv['items']:
+                item = self._item(row)
+                item['prices'].append(number(row['Rate (Items)']))
+                qty = int(number(row['Quantity (Items)'], 1))
+                if qty > 0:  # negative quantities are returns
+                    self.sales_qty.append(qty)
+                self.discounts.append(number(row['Discount (%) on Price List Rate with Margin (Items)']))
+
+        # Typical sale/cost ratio, for items seen on one side only
+        ratios = [statistics.median(i['prices']) / statistics.median(i['costs'])
+                  for i in self.catalog.values() if i['prices'] and i['costs'] and min(i['costs']) > 0]
+        self.markup = statistics.median(ratios) if ratios else 1.3
+        self.shapes = [sku_shape(sku) for sku in self.catalog]
+
+        # Customers: optional title + given name + family name; anything else
+        # (shops, offices, companies) is reused as a name stem
+        self.titles, self.given, self.family, self.businesses = [], [], [], []
+        people = 0
+        names = {inv['header']['Customer Name'].strip() for inv in sales if inv['header'].get('Customer Name')}
+        for name in sorted(names):
+            words = name.split()
+            if words[0] in TITLES and len(words) >= 2:
+                people += 1
+                self.titles.append(words[0])
+                self.given.append(words[1])
+                self.family.extend(words[2:])
+            else:
+                self.businesses.append(name)
+        self.customer_count = len(names)
+        self.people_share = people / len(names) if names else 1.0
+        self.family = self.family or self.given
+        self.header_values = {
+            'sales': {k: v for k, v in sales[0]['header'].items() if k in (
+                'Company', 'Currency', 'Price List', 'Price List Currency', 'Debit To')},
+            'items': {k: v for k, v in sales[0]['items'][0].items() if k in (
+                'Cost Center (Items)', 'Income Account (Items)')},
+            'payment': next(({k: v for k, v in inv['header'].items() if k in (
+                'Account (Sales Invoice Payment)', 'Mode of Payment (Sales Invoice Payment)',
+                'Type (Sales Invoice Payment)')} for inv in sales if inv['header'].get('Mode of Payment (Sales Invoice Payment)')), {}),
+        }
+        dates = [inv['header']['Date'] for inv in purchases + sales if inv['header']['Date']]
+        self.first_date = datetime.date.fromisoformat(min(dates))
+        self.last_date = datetime.date.fromisoformat(max(dates))
+        self.purchase_count = len(purchases)
+        self.sales_count = len(sales)
+
+    def _item(self, row):
+        sku = clean_sku(row['Item (Items)'])
+        item = self.catalog.get(sku)
+        if item is None:
+            item = self.catalog[sku] = {
+                'sku': sku,
+                'name': row['Item Name (Items)'].strip(),
+                'group': row['Item Group (Items)'] or 'Uncategorized',
+                'uom': row['UOM (Items)'] or 'Nos',
+                'costs': [],
+                'prices': [],
+            }
+        return item
+
+
+class Generator:
+    """Deterministic, streaming generation of a dataset --scale times the exports"""
+
+    def __init__(self, profile, seed, scale, prefix):
+        self.p = profile
+        self.rng = random.Random(seed)
+        # Format-specific details (row names, timestamps, ledger ids) draw from
+        # their own stream, so CSV and SQL describe the same documents
+        self.extras = random.Random(-seed - 1)
+        self.prefix = prefix
+        # Millisecond clock for UUIDv7 ids, starting at the exported period
+        self.clock = (profile.first_date - datetime.date(1970, 1, 1)).days * 86400000
+        self.products = self._products(max(len(profile.catalog), round(len(profile.catalog) * scale)))
+        self.customers = self._customers(max(1, round(profile.customer_count * scale)))
+        self.suppliers = self._suppliers(max(1, round(len(profile.suppliers) * scale)))
+        self.sales_count = max(1, round(profile.sales_count * scale))
+        self.purchase_count = max(1, round(profile.purchase_count * scale))
+        self.stocked = [p for p in self.products if p['group'] not in SERVICE_GROUPS]
+
+    def uuid(self, rng=None):
+        """UUIDv7 like the server's newId(), ordered by generation"""
+        self.clock += 1
+        rand = (rng or self.rng).getrandbits(74)
+        return uuid.UUID(int=(self.clock << 80) | (0x7 << 76) | ((rand >> 62) << 64) | (0b10 << 62) | (rand & ((1 << 62) - 1)))
+
+    def row_id(self):
+        """ERP child row names: 10 lowercase alphanumerics"""
+        return ''.join(self.extras.choices(string.ascii_lowercase + string.digits, k=10))
+
+    def rate(self, value):
+        return round(value) if value >= 10 else round(value, 2)
+
+    def _products(self, count):
+        rng, p = self.rng, self.p
+        products, skus = [], set()
+        # The exported catalog first, then variants of it with SKUs of the same shape
+        sources = list(p.catalog.values())
+        for n in range(count):
+            source = sources[n % len(sources)]
+            if n < len(sources):
+                sku, name = source['sku'], source['name']
+            else:
+                shape = rng.choice(p.shapes)
+                sku = fill_shape(rng, shape)
+                while sku in skus or not sku:
+                    shape += rng.choice('9A')
+                    sku = fill_shape(rng, shape)
+                name = f"{source['name']} {sku}"
+            skus.add(sku)
+
+            if source['costs'] and source['prices']:
+                cost, price = rng.choice(source['costs']), rng.choice(source['prices'])
+            elif source['costs']:
+                cost = rng.choice(source['costs'])
+                price = cost * p.markup
+            else:
+                price = rng.choice(source['prices'])
+                cost = price / p.markup
+            jitter = 1 if n < len(sources) else rng.uniform(0.8, 1.25)
+            products.append({
+                'id': self.uuid(),
+                'sku': sku,
+                'name': name,
+                'group': source['group'],
+                'uom': source['uom'],
+                'cost': self.rate(cost * jitter),
+                'price': self.rate(max(price, cost) * jitter),
+                'quantity': 0,
+            })
+        return products
+
+    def _customers(self, count):
+        rng, p = self.rng, self.p
+        customers = []
+        for n in range(count):
+            if not p.businesses or rng.random() < p.people_share:
+                name = f'{rng.choice(p.titles)} {rng.choice(p.given)} {rng.choice(p.family)}' if p.titles else rng.choice(p.given)
+                kind = 'individual'
+            else:
+                name = f'{rng.choice(p.businesses)} {n + 1}'
+                kind = 'company'
+            customers.append({
+                'id': self.uuid(),
+                'name': name,
+                'type': kind,
+                'phone': '01' + rng.choice('0125') + ''.join(rng.choices(string.digits, k=8)),
+            })
+        return customers
+
+    def _suppliers(self, count):
+        names = list(self.p.suppliers)
+        suppliers = []
+        for n in range(count):
+            name = names[n] if n < len(names) else f'{self.rng.choice(names)} {n + 1}'
+            suppliers.append({'id': self.uuid(), 'name': name})
+        return suppliers
+
+    def _dates(self, count):
+        """Sorted invoice dates spread over the exported period"""
+        span = (self.p.last_date - self.p.first_date).days
+        return sorted(self.p.first_date + datetime.timedelta(days=self.rng.randint(0, span)) for _ in range(count))
+
+    def purchases(self):
+        rng, p = self.rng, self.p
+        for n, date in enumerate(self._dates(self.purchase_count), 1):
+            lines = min(rng.choice(p.purchase_lines), len(self.stocked))
+            items = []
+            for product in rng.sample(self.stocked, lines):
+                qty = rng.choice(p.purchase_qty)
+                items.append({'id': self.uuid(), 'product': product, 'qty': qty, 'rate': product['cost'], 'amount': qty * product['cost']})
+            yield {
+                'id': self.uuid(),
+                'number': f'{self.prefix}-PINV-{date.year}-{n:05d}',
+                'date': date,
+                'supplier': rng.choice(self.suppliers),
+                'items': items,
+                'total': sum(i['amount'] for i in items),
+            }
+
+    def sales(self):
+        rng, p = self.rng, self.p
+        for n, date in enumerate(self._dates(self.sales_count), 1):
+            lines = min(rng.choice(p.sales_lines), len(self.products))
+            items = []
+            for product in rng.sample(self.products, lines):
+                qty = rng.choice(p.sales_qty)
+                pct = rng.choice(p.discounts)
+                rate = self.rate(product['price'] * (1 - pct / 100))
+                items.append({
+                    'id': self.uuid(), 'product': product, 'qty': qty, 'rate': rate,
+                    'amount': qty * rate, 'discount_pct': pct, 'discount': round(product['price'] - rate, 2),
+                })
+            yield {
+                'id': self.uuid(),
+                'number': f'{self.prefix}-SINV-{date.year}-{n:05d}',
+                'date': date,
+                'customer': rng.choice(self.customers),
+                'items': items,
+                'total': sum(i['amount'] for i in items),
+            }
+
+
+# ---- ERP-format CSV ----------------------------------------------------------
+
+def write_csv(gen, out):
+    p = gen.p
+    counts = {'purchase invoices': 0, 'sales invoices': 0}
+
+    with open(os.path.join(out, 'Purchase Invoice.csv'), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, p.purchase_columns, quoting=csv.QUOTE_NONNUMERIC, restval='')
+        writer.writeheader()
+        for inv in gen.purchases():
+            counts['purchase invoices'] += 1
+            for i, item in enumerate(inv['items']):
+                row = {
+                    'ID (Items)': gen.row_id(),
+                    'Accepted Qty (Items)': float(item['qty']),
+                    'Accepted Qty in Stock UOM (Items)': float(item['qty']),
+                    'Amount (Items)': float(item['amount']),
+                    'Amount (Company Currency) (Items)': float(item['amount']),
+                    'Item Name (Items)': item['product']['name'],
+                    'Rate (Items)': float(item['rate']),
+                    'Rate (Company Currency) (Items)': float(item['rate']),
+                    'UOM (Items)': item['product']['uom'],
+                    'UOM Conversion Factor (Items)': 1.0,
+                    'Item (Items)': item['product']['sku'],
+                    'Item Group (Items)': item['product']['group'],
+                }
+                if i == 0:
+                    row.update({
+                        'ID': inv['number'],
+                        'Series': f'{gen.prefix}-PINV-.YYYY.-',
+                        'Supplier': inv['supplier']['name'],
+                        'Date': inv['date'].isoformat(),
+                        'Credit To': p.credit_to,
+                        'Grand Total': float(inv['total']),
+                        'Payment Amount (Payment Schedule)': float(inv['total']),
+                    })
+                writer.writerow(row)
+
+    with open(os.path.join(out, 'Sales Invoice.csv'), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, p.sales_columns, quoting=csv.QUOTE_NONNUMERIC, restval='')
+        writer.writeheader()
+        for inv in gen.sales():
+            counts['sales invoices'] += 1
+            for i, item in enumerate(inv['items']):
+                row = {
+                    **p.header_values['items'],
+                    'ID (Items)': gen.row_id(),
+                    'Amount (Items)': float(item['amount']),
+                    'Amount (Company Currency) (Items)': float(item['amount']),
+                    'Item Name (Items)': item['product']['name'],
+                    'Rate (Items)': float(item['rate']),
+                    'Rate (Company Currency) (Items)': float(item['rate']),
+                    'UOM (Items)': item['product']['uom'],
+                    'UOM Conversion Factor (Items)': 1.0,
+                    'Quantity (Items)': float(item['qty']),
+                    'Discount (%) on Price List Rate with Margin (Items)': float(item['discount_pct']),
+                    'Discount Amount (Items)': float(item['discount']),
+                    'Item (Items)': item['product']['sku'],
+                    'Item Group (Items)': item['product']['group'],
+                }
+                if i == 0:
+                    total = float(inv['total'])
+                    row.update({
+                        **p.header_values['sales'],
+                        **p.header_values['payment'],
+                        'ID': inv['number'],
+                        'Series': f'{gen.prefix}-SINV-.YYYY.-',
+                        'Date': inv['date'].isoformat(),
+                        'Exchange Rate': 1.0,
+                        'Price List Exchange Rate': 1.0,
+                        'Net Total (Company Currency)': total,
+                        'Grand Total (Company Currency)': total,
+                        'Grand Total': total,
+                        'Customer': inv['customer']['name'],
+                        'Customer Name': inv['customer']['name'],
+                        'Title': inv['customer']['name'],
+                        'Paid Amount': total,
+                        'Paid Amount (Company Currency)': total,
+                        'Total Quantity': float(sum(it['qty'] for it in inv['items'])),
+                        'ID (Sales Invoice Payment)': gen.row_id(),
+                        'Amount (Sales Invoice Payment)': total,
+                    })
+                writer.writerow(row)
+
+    return counts
+
+
+# ---- Bulk SQL ----------------------------------------------------------------
+
+def sql_value(value):
+    if value is None:
+        return 'NULL'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, uuid.UUID):
+        # Ids are BINARY(16)
+        return f'0x{value.hex}'
+    text = str(value).replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n')
+    return f"'{text}'"
+
+
+class SqlWriter:
+    """Multi-row INSERTs, SQL_BATCH rows per statement"""
+
+    def __init__(self, f):
+        self.f = f
+        self.pending = defaultdict(list)
+        self.columns = {}
+        self.counts = defaultdict(int)
+
+    def insert(self, table, row):
+        self.columns.setdefault(table, list(row))
+        self.pending[table].append(row)
+        self.counts[table] += 1
+        if len(self.pending[table]) >= SQL_BATCH:
+            self.flush(table)
+
+    def flush(self, table=None):
+        for name in [table] if table else list(self.pending):
+            rows = self.pending.pop(name, [])
+            if not rows:
+                continue
+            values = ',\n'.join('(' + ', '.join(sql_value(r[c]) for c in self.columns[name]) + ')' for r in rows)
+            self.f.write(f"INSERT INTO {name} ({', '.join(self.columns[name])}) VALUES\n{values};\n")
+
+
+def timestamp(rng, date):
+    return f'{date.isoformat()} {rng.randint(9, 21):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}'
+
+
+def write_sql(gen, out):
+    rng = gen.extras
+    with open(os.path.join(out, 'dataset.sql'), 'w', encoding='utf-8') as f:
+        f.write('SET NAMES utf8mb4;\nSET foreign_key_checks = 0;\nSET unique_checks = 0;\nSTART TRANSACTION;\n')
+        sql = SqlWriter(f)
+
+        for c in gen.customers:
+            sql.insert('customers', {'id': c['id'], 'name': c['name'], 'email': '', 'phone': c['phone'], 'address': '', 'customer_type': c['type']})
+        for s in gen.suppliers:
+            sql.insert('suppliers', {'id': s['id'], 'name': s['name'], 'email': '', 'phone': '', 'address': ''})
+
+        def movement(product, kind, qty, reference_type, reference_id, at, note=None):
+            product['quantity'] += qty
+            sql.insert('stock_movements', {
+                'id': gen.uuid(rng), 'product_id': product['id'], 'type': kind, 'quantity': qty,
+                'reference_type': reference_type, 'reference_id': reference_id, 'note': note, 'created_at': at,
+            })
+
+        for inv in gen.purchases():
+            at = timestamp(rng, inv['date'])
+            sql.insert('purchase_invoices', {
+                'id': inv['id'], 'invoice_number': inv['number'], 'supplier_id': inv['supplier']['id'],
+                'supplier_name': inv['supplier']['name'], 'status': 'received', 'subtotal': inv['total'],
+                'total': inv['total'], 'notes': '', 'created_at': at, 'updated_at': at,
+            })
+            for item in inv['items']:
+                sql.insert('purchase_items', {
+                    'id': item['id'], 'purchase_id': inv['id'], 'product_id': item['product']['id'],
+                    'product_name': item['product']['name'], 'quantity': item['qty'],
+                    'unit_cost': item['rate'], 'total': item['amount'],
+                })
+                movement(item['product'], 'purchase', item['qty'], 'purchase', inv['id'], at)
+
+        for inv in gen.sales():
+            at = timestamp(rng, inv['date'])
+            customer = inv['customer']
+            sql.insert('invoices', {
+                'id': inv['id'], 'invoice_number': inv['number'], 'customer_id': customer['id'],
+                'customer_name': customer['name'], 'customer_email': '', 'customer_phone': customer['phone'],
+                'type': 'invoice', 'status': 'paid', 'subtotal': inv['total'], 'discount': 0, 'tax': 0,
+                'total': inv['total'], 'notes': '', 'created_at': at, 'updated_at': at,
+            })
+            for item in inv['items']:
+                sql.insert('invoice_items', {
+                    'id': item['id'], 'invoice_id': inv['id'], 'product_id': item['product']['id'],
+                    'product_name': item['product']['name'], 'quantity': item['qty'],
+                    'unit_price': item['rate'], 'total': item['amount'],
+                })
+                movement(item['product'], 'sale', -item['qty'], 'invoice', inv['id'], at)
+
+        # Opening stock covers whatever was sold beyond what was bought, plus a
+        # little on hand, so no balance ends up negative
+        opened = f'{gen.p.first_date.isoformat()} 00:00:00'
+        for product in gen.products:
+            if product['group'] in SERVICE_GROUPS:
+                continue
+            opening = max(0, -product['quantity']) + rng.randint(0, 20)
+            if opening:
+                movement(product, 'adjustment', opening, 'product', product['id'], opened, 'Opening stock')
+
+        for product in gen.products:
+            sql.insert('products', {
+                'id': product['id'], 'name': product['name'], 'sku': product['sku'], 'category': product['group'],
+                'price': product['price'], 'cost': product['cost'], 'quantity': product['quantity'],
+                'description': 'Synthetic dataset',
+            })
+
+        sql.flush()
+        f.write('COMMIT;\nSET unique_checks = 1;\nSET foreign_key_checks = 1;\n')
+    return dict(sql.counts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate a synthetic dataset shaped like the ERP exports')
+    parser.add_argument('--scale', type=float, default=10, help='Multiple of the exported volume (e.g. 10, 100, 1000)')
+    parser.add_argument('--seed', type=int, default=1, help='Same seed, same dataset')
+    parser.add_argument('--format', choices=('csv', 'sql'), default='csv', help='ERP-format CSVs for import_history.py, or bulk SQL')
+    parser.add_argument('--out', help='Output directory (default dataset-<scale>x)')
+    parser.add_argument('--prefix', default='SYN', help='Invoice number prefix, keeps synthetic documents apart from real ones')
+    parser.add_argument('--purchases', default=PURCHASE_CSV, help='Purchase Invoice export to learn from')
+    parser.add_argument('--sales', default=SALES_CSV, help='Sales Invoice export to learn from')
+    args = parser.parse_args()
+
+    if args.scale <= 0:
+        sys.exit('--scale must be positive')
+    out = args.out or f'dataset-{args.scale:g}x'
+    os.makedirs(out, exist_ok=True)
+
+    profile = Profile(args.purchases, args.sales)
+    gen = Generator(profile, args.seed, args.scale, args.prefix)
+    print(f"Learned {len(profile.catalog)} items, {profile.customer_count} customers, {len(profile.suppliers)} suppliers, "
+          f"{profile.purchase_count} purchases and {profile.sales_count} sales invoices")
+    print(f"Generating {args.scale:g}x: {len(gen.products)} products, {len(gen.customers)} customers, "
+          f"{len(gen.suppliers)} suppliers, {gen.purchase_count} purchases, {gen.sales_count} sales invoices")
+
+    counts = write_csv(gen, out) if args.format == 'csv' else write_sql(gen, out)
+    for name, count in counts.items():
+        print(f"  {name}: {count}")
+    print(f"Written to {out}/")
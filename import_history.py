@@ -1,3 +1,5 @@
+import argparse
+
 import pandas as pd
 import requests
 import json
@@ -5,6 +7,8 @@ import os
 import math
 
 API_BASE = 'http://localhost:3001/api'
+PURCHASES_CSV = '/Users/hosam/Desktop/dev/iHomeSystem/Purchase Invoice.csv'
+SALES_CSV = '/Users/hosam/Desktop/dev/iHomeSystem/Sales Invoice (1).csv'
 
 def get_products_lookup():
     """Fetch all products and return lookup dicts by SKU and Name"""
@@ -72,14 +76,17 @@ def get_or_create_product(sku, name, category, cost, price, by_sku, by_name):
         print(f"Error creating product {name}: {e}")
         return None
 
-def import_purchases(by_sku, by_name):
+def import_purchases(by_sku, by_name, path=PURCHASES_CSV):
     print("\n--- Importing Purchases ---")
     try:
-        df = pd.read_csv('/Users/hosam/Desktop/dev/iHomeSystem/Purchase Invoice.csv')
+        df = pd.read_csv(path)
     except Exception as e:
         print(f"Error reading Purchase Invoice.csv: {e}")
         return
 
+    # Item rows after the first carry no invoice ID
+    df['ID'] = df['ID'].ffill()
+
     # Group by Invoice ID
     grouped = df.groupby('ID')
     
@@ -200,10 +207,10 @@ def import_purchases(by_sku, by_name):
 
     print(f"Purchases Import: {success_count} success, {fail_count} failed")
 
-def import_sales(by_sku, by_name):
+def import_sales(by_sku, by_name, path=SALES_CSV):
     print("\n--- Importing Sales ---")
     try:
-        df = pd.read_csv('/Users/hosam/Desktop/dev/iHomeSystem/Sales Invoice (1).csv')
+        df = pd.read_csv(path)
     except Exception as e:
         print(f"Error reading Sales Invoice.csv: {e}")
         return
@@ -329,6 +336,11 @@ def import_sales(by_sku, by_name):
     print(f"Sales Import: {success_count} success, {fail_count} failed")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Import ERP purchase and sales invoice exports through the API')
+    parser.add_argument('--purchases', default=PURCHASES_CSV, help='Purchase Invoice export (CSV)')
+    parser.add_argument('--sales', default=SALES_CSV, help='Sales Invoice export (CSV)')
+    args = parser.parse_args()
+
     by_sku, by_name = get_products_lookup()
-    import_purchases(by_sku, by_name)
-    import_sales(by_sku, by_name)
+    import_purchases(by_sku, by_name, args.purchases)
+    import_sales(by_sku, by_name, args.sales)
@@ -0,0 +1,113 @@
+import argparse
+import glob
+import os
+import sys
+
+import requests
+from openpyxl import load_workbook
+
+API_BASE = 'http://localhost:3001/api'
+
+# ERP "Stock Balance" report columns
+SKU_COLUMN = 'Item'
+NAME_COLUMN = 'Item Name'
+QTY_COLUMN = 'Balance Qty'
+RATE_COLUMN = 'Valuation Rate'
+
+
+def latest_snapshot():
+    """Most recent Stock Balance_*.xlsx next to this script"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    files = sorted(glob.glob(os.path.join(here, 'Stock Balance_*.xlsx')), key=os.path.getmtime)
+    return files[-1] if files else None
+
+
+def clean_sku(value):
+    sku = str(value).strip() if value is not None else ''
+    # Numeric item codes come back as floats
+    if sku.endswith('.0'):
+        sku = sku[:-2]
+    return sku
+
+
+def read_snapshot(path):
+    """Stream rows out of the workbook without loading it into memory"""
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = [str(c).strip() if c is not None else '' for c in next(rows)]
+        try:
+            sku_idx = header.index(SKU_COLUMN)
+            qty_idx = header.index(QTY_COLUMN)
+        except ValueError:
+            raise SystemExit(f"Missing '{SKU_COLUMN}' or '{QTY_COLUMN}' column in {path}")
+        name_idx = header.index(NAME_COLUMN) if NAME_COLUMN in header else None
+        rate_idx = header.index(RATE_COLUMN) if RATE_COLUMN in header else None
+
+        snapshot = []
+        for row in rows:
+            sku = clean_sku(row[sku_idx])
+            # The report ends with a "Total" row that has no item name
+            if not sku or (name_idx is not None and row[name_idx] is None):
+                continue
+            snapshot.append({
+                'sku': sku,
+                'quantity': row[qty_idx] or 0,
+                'cost': row[rate_idx] if rate_idx is not None else None,
+            })
+        return snapshot
+    finally:
+        wb.close()
+
+
+def print_report(result):
+    mode = 'DRY RUN' if result['dryRun'] else 'APPLIED'
+    print(f"\n--- Stock Balance Reconciliation ({mode}) ---")
+    print(f"Rows in snapshot: {result['received']}")
+    print(f"Matched: {result['matched']}  Unchanged: {result['unchanged']}  Changed: {result['changed']}")
+
+    for change in result['changes']:
+        qty, cost = change['quantity'], change['cost']
+        parts = []
+        if qty['from'] != qty['to']:
+            parts.append(f"qty {qty['from']} -> {qty['to']} ({qty['to'] - qty['from']:+d})")
+        if cost['from'] != cost['to']:
+            parts.append(f"cost {cost['from']} -> {cost['to']}")
+        print(f"  {change['sku']:<12} {change['name'][:40]:<40} {', '.join(parts)}")
+
+    if result['missing']:
+        print(f"\nNot found ({len(result['missing'])}): {', '.join(result['missing'])}")
+    if result['ambiguous']:
+        print(f"Duplicate SKU in products ({len(result['ambiguous'])}): {', '.join(result['ambiguous'])}")
+    if result['invalid']:
+        print(f"Invalid rows: {len(result['invalid'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Reconcile product stock and cost with an ERP Stock Balance export')
+    parser.add_argument('file', nargs='?', help='Stock Balance .xlsx (defaults to the newest one in this folder)')
+    parser.add_argument('--dry-run', action='store_true', help='Report differences without applying them')
+    parser.add_argument('--no-cost', action='store_true', help='Only reconcile quantities')
+    args = parser.parse_args()
+
+    path = args.file or latest_snapshot()
+    if not path:
+        sys.exit('No Stock Balance_*.xlsx found')
+
+    print(f"Reading {path}...")
+    rows = read_snapshot(path)
+    if args.no_cost:
+        for row in rows:
+            row['cost'] = None
+    print(f"Loaded {len(rows)} items")
+
+    res = requests.post(f"{API_BASE}/products/stock-balance", json={
+        'rows': rows,
+        'dryRun': args.dry_run,
+        'note': f"Stock balance {os.path.basename(path)}",
+    })
+    if not res.ok:
+        sys.exit(f"Reconciliation failed: {res.text}")
+
+    print_report(res.json())
@@ -0,0 +1,95 @@
+import { newId, binId } from './lib/ids.js';
+import type { PoolConnection } from 'mysql2/promise';
+import pool from './db.js';
+
+// Throughput of the invoice create path (header + items in a transaction, then
+// the read-back) with client-side interpolation (query) versus server-side
+// prepared statements (execute).
+//
+//   npx tsx bench_invoices.ts [invoices per mode] [concurrency] [items per invoice]
+//
+// Invoices are created without product ids so no stock moves; they are
+// deleted again at the end.
+
+const TOTAL = parseInt(process.argv[2] || '500');
+const CONCURRENCY = parseInt(process.argv[3] || '8');
+const ITEMS = parseInt(process.argv[4] || '5');
+const MARKER = `BENCH-${Date.now()}`;
+
+type Mode = 'query' | 'execute';
+
+function run(connection: PoolConnection | typeof pool, mode: Mode, sql: string, params: unknown[]) {
+    return mode === 'execute' ? connection.execute(sql, params as any[]) : connection.query(sql, params);
+}
+
+async function createInvoice(mode: Mode, n: number) {
+    const connection = await pool.getConnection();
+    const id = newId();
+    try {
+        await connection.beginTransaction();
+        await run(connection, mode,
+            `INSERT INTO invoices (id, invoice_number, customer_id, customer_name, customer_email, customer_phone, type, status, subtotal, discount, tax, total, notes)
+             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
+            [binId(id), `${MARKER}-${mode}-${n}`, null, 'Benchmark', '', '', 'invoice', 'draft', ITEMS * 10, 0, 0, ITEMS * 10, '']
+        );
+        for (let i = 0; i < ITEMS; i++) {
+            await run(connection, mode,
+                `INSERT INTO invoice_items (id, invoice_id, product_id, product_name, quantity, unit_price, total)
+                 VALUES (?, ?, ?, ?, ?, ?, ?)`,
+                [binId(newId()), binId(id), null, `Item ${i}`, 1, 10, 10]
+            );
+        }
+        await connection.commit();
+    } catch (error) {
+        await connection.rollback();
+        throw error;
+    } finally {
+        connection.release();
+    }
+
+    await run(pool, mode, 'SELECT * FROM invoices WHERE id = ?', [binId(id)]);
+    await run(pool, mode, 'SELECT * FROM invoice_items WHERE invoice_id = ?', [binId(id)]);
+}
+
+async function bench(mode: Mode) {
+    let next = 0;
+    const started = process.hrtime.bigint();
+    const latencies: number[] = [];
+
+    await Promise.all(Array.from({ length: CONCURRENCY }, async () => {
+        while (next < TOTAL) {
+            const n = next++;
+            const start = process.hrtime.bigint();
+            await createInvoice(mode, n);
+            latencies.push(Number(process.hrtime.bigint() - start) / 1e6);
+        }
+    }));
+
+    const seconds = Number(process.hrtime.bigint() - started) / 1e9;
+    latencies.sort((a, b) => a - b);
+    const pick = (p: number) => latencies[Math.min(latencies.length - 1, Math.floor(p * latencies.length))].toFixed(1);
+    console.log(
+        `${mode.padEnd(8)} ${(TOTAL / seconds).toFixed(1).padStart(8)} invoices/s` +
+        `   p50 ${pick(0.5)} ms   p95 ${pick(0.95)} ms   p99 ${pick(0.99)} ms`
+    );
+}
+
+async function main() {
+    console.log(`${TOTAL} invoices x ${ITEMS} items per mode, concurrency ${CONCURRENCY}`);
+    try {
+        // Warm both paths (connections, statement cache) before measuring
+        await createInvoice('query', -1);
+        await createInvoice('execute', -1);
+
+        await bench('query');
+        await bench('execute');
+    } finally {
+        await pool.query('DELETE FROM invoices WHERE invoice_number LIKE ?', [`${MARKER}-%`]);
+        await pool.end();
+    }
+}
+
+main().catch((error) => {
+    console.error('Benchmark failed:', error);
+    process.exitCode = 1;
+});
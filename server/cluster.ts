@@ -0,0 +1,186 @@
+import cluster, { type Worker } from 'cluster';
+import http from 'http';
+import os from 'os';
+import dotenv from 'dotenv';
+import { relayBroadcasts, SHUTDOWN_MESSAGE, READY_MESSAGE } from './lib/ipc.js';
+
+// Multi-process mode: one Express worker per core behind the cluster module's
+// shared port (npm run start:cluster).
+//
+// Workers share nothing in memory. Instead:
+//  - the primary migrates the schema if needed and fails interrupted imports once,
+//    before forking
+//  - change events (SSE) and cache invalidations are relayed between workers over IPC
+//  - import jobs live in MySQL and are claimed atomically, so any worker can run them
+//  - stock reconciliation, queued-import pickup and the thumbnail backfill run in
+//    the leader worker (slot 0) only
+//
+// SIGHUP replaces workers one at a time (rolling restart); SIGTERM/SIGINT drain
+// all of them and exit.
+
+dotenv.config();
+
+const WORKERS = parseInt(process.env.CLUSTER_WORKERS || '') || os.availableParallelism();
+const SHUTDOWN_TIMEOUT_MS = parseInt(process.env.CLUSTER_SHUTDOWN_TIMEOUT_MS || '30000');
+const STARTUP_TIMEOUT_MS = parseInt(process.env.CLUSTER_STARTUP_TIMEOUT_MS || '60000');
+const RESPAWN_DELAY_MS = 1000;
+
+const slots = new Map<number, number>(); // worker id -> slot
+const retiring = new Set<number>();
+// Replacements a rolling restart is still waiting on. The old worker keeps
+// serving its slot until they are ready, so they are never respawned.
+const replacing = new Set<number>();
+let stopping = false;
+let restarting = false;
+
+function spawn(slot: number) {
+    const worker = cluster.fork({
+        CLUSTER_WORKER: '1',
+        CLUSTER_LEADER: slot === 0 ? '1' : '',
+        CLUSTER_SLOT: String(slot),
+    });
+    slots.set(worker.id, slot);
+    return worker;
+}
+
+// Workers report ready once warmed up (see /api/ready), not merely listening
+function ready(worker: Worker) {
+    return new Promise<void>((resolve, reject) => {
+        const onMessage = (message: unknown) => {
+            if (message === READY_MESSAGE) settle();
+        };
+        const onExit = (code: number, signal: string) => {
+            settle(new Error(`worker ${worker.process.pid} exited (${signal || code}) during startup`));
+        };
+        const timer = setTimeout(() => {
+            settle(new Error(`worker ${worker.process.pid} not ready after ${STARTUP_TIMEOUT_MS}ms`));
+        }, STARTUP_TIMEOUT_MS);
+        function settle(error?: Error) {
+            clearTimeout(timer);
+            worker.off('message', onMessage);
+            worker.off('exit', onExit);
+            if (error) reject(error);
+            else resolve();
+        }
+        worker.on('message', onMessage);
+        worker.once('exit', onExit);
+    });
+}
+
+// Ask a worker to drain and exit; kill it if it takes too long
+function retire(worker: Worker) {
+    retiring.add(worker.id);
+    return new Promise<void>((resolve) => {
+        const timer = setTimeout(() => worker.process.kill('SIGKILL'), SHUTDOWN_TIMEOUT_MS);
+        worker.once('exit', () => {
+            clearTimeout(timer);
+            resolve();
+        });
+        if (worker.isConnected()) {
+            worker.send(SHUTDOWN_MESSAGE);
+        } else {
+            worker.process.kill('SIGTERM');
+        }
+    });
+}
+
+// Start the replacement first and retire the old worker once the new one
+// is ready, so capacity never drops by more than one worker. A replacement
+// that dies or hangs during startup stops the restart; the old worker keeps
+// its slot (and, in slot 0, the leader-only jobs).
+async function rollingRestart() {
+    if (restarting || stopping) return;
+    restarting = true;
+    console.log('🔄 Rolling restart');
+    try {
+        for (const [id, slot] of [...slots]) {
+            const current = cluster.workers?.[id];
+            if (!current) continue;
+            const replacement = spawn(slot);
+            replacing.add(replacement.id);
+            try {
+                await ready(replacement);
+            } catch (error) {
+                if (!replacement.isDead()) await retire(replacement);
+                throw error;
+            } finally {
+                replacing.delete(replacement.id);
+            }
+            await retire(current);
+        }
+        console.log('✅ Rolling restart complete');
+    } catch (error) {
+        console.error('Rolling restart stopped:', error);
+    } finally {
+        restarting = false;
+    }
+}
+
+async function stop() {
+    if (stopping) return;
+    stopping = true;
+    await Promise.all(Object.values(cluster.workers || {}).map(worker => worker && retire(worker)));
+    process.exit(0);
+}
+
+// Aggregated metrics of all workers (each worker's /api/metrics only covers
+// itself). Unauthenticated, so it listens on loopback unless METRICS_HOST says
+// otherwise.
+async function serveClusterMetrics(port: number, host: string) {
+    const { default: client } = await import('prom-client');
+    const aggregator = new client.AggregatorRegistry();
+    http.createServer(async (req, res) => {
+        try {
+            const body = await aggregator.clusterMetrics();
+            res.writeHead(200, { 'Content-Type': aggregator.contentType });
+            res.end(body);
+        } catch (error) {
+            res.writeHead(500);
+            res.end(String(error));
+        }
+    }).listen(port, host, () => {
+        console.log(`📈 Cluster metrics on http://${host}:${port}/metrics`);
+    });
+}
+
+async function primary() {
+    // Migrations and recovery run once, before any worker serves traffic
+    const { default: pool, readPool, ensureSchema } = await import('./db.js');
+    const { failInterruptedImports } = await import('./lib/jobs.js');
+    await ensureSchema();
+    await failInterruptedImports();
+    await pool.end();
+    if (readPool !== pool) await readPool.end();
+
+    relayBroadcasts();
+
+    cluster.on('exit', (worker, code, signal) => {
+        const slot = slots.get(worker.id)!;
+        slots.delete(worker.id);
+        if (retiring.delete(worker.id) || replacing.has(worker.id) || stopping) return;
+        console.error(`Worker ${worker.process.pid} died (${signal || code}); restarting`);
+        setTimeout(() => spawn(slot), RESPAWN_DELAY_MS);
+    });
+
+    process.on('SIGHUP', rollingRestart);
+    process.on('SIGTERM', stop);
+    process.on('SIGINT', stop);
+
+    if (process.env.METRICS_PORT) {
+        await serveClusterMetrics(parseInt(process.env.METRICS_PORT), process.env.METRICS_HOST || '127.0.0.1');
+    }
+
+    console.log(`🧩 Primary ${process.pid} starting ${WORKERS} workers`);
+    for (let slot = 0; slot < WORKERS; slot++) {
+        spawn(slot);
+    }
+}
+
+if (cluster.isPrimary) {
+    primary().catch((error) => {
+        console.error('Failed to start cluster:', error);
+        process.exit(1);
+    });
+} else {
+    import('./index.js');
+}
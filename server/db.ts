@@ -1,28 +1,247 @@
 import mysql from 'mysql2/promise';
+import type { PoolConnection, PoolOptions } from 'mysql2/promise';
+import type { RowDataPacket } from 'mysql2';
 import dotenv from 'dotenv';
+import { seedOpeningBalances } from './lib/stock.js';
+import { instrumentPool } from './lib/queryTrace.js';
+import { typeCast, binId, NEW_ID_SQL, ID_COLUMNS } from './lib/ids.js';
 
 dotenv.config();
 
-const pool = mysql.createPool({
-  host: process.env.DB_HOST || 'localhost',
-  port: parseInt(process.env.DB_PORT || '3306'),
-  user: process.env.DB_USER || 'root',
-  password: process.env.DB_PASSWORD || '',
-  database: process.env.DB_NAME || 'ihome_system',
-  waitForConnections: true,
-  connectionLimit: 10,
-  queueLimit: 0,
-  decimalNumbers: true,
-});
+const env = (name: string, fallback: number) => {
+  const value = parseInt(process.env[name] || '');
+  return Number.isFinite(value) ? value : fallback;
+};
+
+// Pool sizing comes from the environment. The wait queue is bounded so an
+// overloaded server fails fast ("Queue limit reached") instead of piling up
+// requests; idle connections are closed and live ones kept alive through NAT
+// and proxies.
+function poolOptions(prefix: string, fallback?: PoolOptions): PoolOptions {
+  const connectionLimit = env(`${prefix}_POOL_SIZE`, fallback?.connectionLimit ?? 10);
+  return {
+    host: process.env[`${prefix}_HOST`] || fallback?.host || 'localhost',
+    port: env(`${prefix}_PORT`, fallback?.port ?? 3306),
+    user: process.env[`${prefix}_USER`] || fallback?.user || 'root',
+    password: process.env[`${prefix}_PASSWORD`] ?? fallback?.password ?? '',
+    database: process.env[`${prefix}_NAME`] || fallback?.database || 'ihome_system',
+    waitForConnections: true,
+    connectionLimit,
+    queueLimit: env(`${prefix}_QUEUE_LIMIT`, connectionLimit * 10),
+    maxIdle: env(`${prefix}_POOL_MAX_IDLE`, connectionLimit),
+    idleTimeout: env(`${prefix}_IDLE_TIMEOUT_MS`, fallback?.idleTimeout ?? 60000),
+    connectTimeout: env(`${prefix}_CONNECT_TIMEOUT_MS`, fallback?.connectTimeout ?? 10000),
+    enableKeepAlive: true,
+    keepAliveInitialDelay: env(`${prefix}_KEEPALIVE_MS`, fallback?.keepAliveInitialDelay ?? 10000),
+    // Per-connection LRU of server-side statements used by execute(); keep the
+    // total (pool size x this) well below the server's max_prepared_stmt_count
+    maxPreparedStatements: env(`${prefix}_MAX_PREPARED_STATEMENTS`, 100),
+    decimalNumbers: true,
+    // BINARY(16) ids come back as UUID strings (lib/ids.ts)
+    typeCast,
+  };
+}
+
+const primaryOptions = poolOptions('DB');
+const pool = mysql.createPool(primaryOptions);
+instrumentPool(pool);
+
+// Optional read replica (DB_READ_HOST, with DB_READ_* overrides falling back to
+// the primary settings). List and report reads that can tolerate replication lag
+// go here; writes, transactions and read-your-write lookups stay on the primary.
+// Without a replica this is the primary pool.
+export const readPool = process.env.DB_READ_HOST ? mysql.createPool(poolOptions('DB_READ', primaryOptions)) : pool;
+if (readPool !== pool) instrumentPool(readPool);
+
+async function ensureColumn(connection: PoolConnection, table: string, column: string, definition: string) {
+  const [rows] = await connection.query<RowDataPacket[]>(
+    'SELECT COUNT(*) AS count FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = ? AND COLUMN_NAME = ?',
+    [table, column]
+  );
+  if (rows[0].count === 0) {
+    await connection.query(`ALTER TABLE ${table} ADD COLUMN ${column} ${definition}`);
+  }
+}
+
+async function hasIndex(connection: PoolConnection, table: string, index: string) {
+  const [rows] = await connection.query<RowDataPacket[]>(
+    'SELECT COUNT(*) AS count FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = ? AND INDEX_NAME = ?',
+    [table, index]
+  );
+  return rows[0].count > 0;
+}
+
+async function ensureIndex(connection: PoolConnection, table: string, index: string, definition: string) {
+  if (!(await hasIndex(connection, table, index))) {
+    await connection.query(`ALTER TABLE ${table} ADD INDEX ${index} ${definition}`);
+  }
+}
+
+const UPDATED_AT = 'TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)';
+
+// updated_at columns created with second precision
+async function ensureMicrosecondUpdatedAt(connection: PoolConnection, table: string) {
+  const [rows] = await connection.query<RowDataPacket[]>(
+    "SELECT DATETIME_PRECISION AS precision_ FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = ? AND COLUMN_NAME = 'updated_at'",
+    [table]
+  );
+  if (rows.length > 0 && Number(rows[0].precision_) < 6) {
+    await connection.query(`ALTER TABLE ${table} MODIFY updated_at ${UPDATED_AT}`);
+  }
+}
+
+// SKU is the import upsert key. Blank SKUs become NULL (which UNIQUE allows
+// repeatedly); existing duplicates must be cleaned up by hand first.
+async function ensureUniqueSku(connection: PoolConnection) {
+  if (await hasIndex(connection, 'products', 'uq_products_sku')) return;
+
+  await connection.query("UPDATE products SET sku = NULL WHERE TRIM(sku) = ''");
+  const [duplicates] = await connection.query<RowDataPacket[]>(
+    'SELECT sku, COUNT(*) AS count FROM products WHERE sku IS NOT NULL GROUP BY sku HAVING COUNT(*) > 1'
+  );
+  if (duplicates.length > 0) {
+    console.warn(`⚠️ Unique SKU index not created: ${duplicates.length} duplicated SKU(s), e.g. ${duplicates.slice(0, 5).map(d => d.sku).join(', ')}`);
+    return;
+  }
+  await connection.query('ALTER TABLE products ADD UNIQUE INDEX uq_products_sku (sku)');
+}
+
+// Id and reference columns (ID_COLUMNS) of databases created before BINARY(16)
+// ids. UUID text to its 16 bytes; anything else (hand-made keys such as
+// "cust-...") maps to the MD5 of the text, so equal keys still match across
+// tables; blanks become NULL. binId() in lib/ids.ts is the same mapping.
+const uuidBytes = (column: string) => {
+  const text = `NULLIF(${column}, '')`;
+  return `COALESCE(IF(LENGTH(REPLACE(${text}, '-', '')) = 32, UNHEX(REPLACE(${text}, '-', '')), NULL), UNHEX(MD5(${text})))`;
+};
+
+async function migrateIdColumns(connection: PoolConnection) {
+  const [columns] = await connection.query<RowDataPacket[]>(
+    `SELECT TABLE_NAME AS tableName, COLUMN_NAME AS columnName, IS_NULLABLE AS nullable
+     FROM information_schema.COLUMNS
+     WHERE TABLE_SCHEMA = DATABASE() AND DATA_TYPE = 'varchar' AND TABLE_NAME IN (?)`,
+    [Object.keys(ID_COLUMNS)]
+  );
+  const pending = new Map<string, { name: string; notNull: string }[]>();
+  for (const column of columns) {
+    if (!ID_COLUMNS[column.tableName].includes(column.columnName)) continue;
+    const list = pending.get(column.tableName) ?? [];
+    list.push({ name: column.columnName, notNull: column.nullable === 'NO' ? ' NOT NULL' : '' });
+    pending.set(column.tableName, list);
+  }
+  if (pending.size === 0) return;
+
+  // Both ends of a foreign key must have the same type: drop the keys while
+  // converting and put them back afterwards
+  const [foreignKeys] = await connection.query<RowDataPacket[]>(
+    `SELECT k.TABLE_NAME AS tableName, k.CONSTRAINT_NAME AS name, k.COLUMN_NAME AS columnName,
+            k.REFERENCED_TABLE_NAME AS refTable, k.REFERENCED_COLUMN_NAME AS refColumn, r.DELETE_RULE AS onDelete
+     FROM information_schema.KEY_COLUMN_USAGE k
+     JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+       ON r.CONSTRAINT_SCHEMA = k.TABLE_SCHEMA AND r.TABLE_NAME = k.TABLE_NAME AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+     WHERE k.TABLE_SCHEMA = DATABASE() AND k.REFERENCED_TABLE_NAME IS NOT NULL`
+  );
+  for (const key of foreignKeys) {
+    await connection.query(`ALTER TABLE ${key.tableName} DROP FOREIGN KEY ${key.name}`);
+  }
+
+  // VARCHAR -> VARBINARY keeps the bytes, the text is then rewritten in place
+  // as 16 raw bytes, and the column narrowed to BINARY(16)
+  for (const [table, list] of pending) {
+    console.log(`🔄 Converting ${table} ids to BINARY(16)`);
+    await connection.query(`ALTER TABLE ${table} ${list.map(c => `MODIFY ${c.name} VARBINARY(36)${c.notNull}`).join(', ')}`);
+    await connection.query(`UPDATE ${table} SET ${list.map(c => `${c.name} = ${uuidBytes(c.name)}`).join(', ')}`);
+    await connection.query(`ALTER TABLE ${table} ${list.map(c => `MODIFY ${c.name} BINARY(16)${c.notNull}`).join(', ')}`);
+  }
+
+  for (const key of foreignKeys) {
+    await connection.query(
+      `ALTER TABLE ${key.tableName} ADD CONSTRAINT ${key.name} FOREIGN KEY (${key.columnName})
+       REFERENCES ${key.refTable}(${key.refColumn}) ON DELETE ${key.onDelete}`
+    );
+  }
+}
+
+// Bump whenever initDatabase gains a table, column, index or data fix
+export const SCHEMA_VERSION = 4;
+
+// Schema setup (all of initDatabase) runs only when the recorded version is
+// behind; a normal boot costs a single query
+async function schemaVersion() {
+  const [rows] = await pool.query<RowDataPacket[]>(
+    "SELECT COUNT(*) AS count FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'schema_meta'"
+  );
+  if (rows[0].count === 0) return 0;
+  const [meta] = await pool.query<RowDataPacket[]>('SELECT version FROM schema_meta WHERE id = 1');
+  return meta.length > 0 ? Number(meta[0].version) : 0;
+}
+
+// One-shot migration (npm run migrate). A named lock keeps servers booting at
+// the same time from running the DDL concurrently.
+export async function migrate() {
+  const connection = await pool.getConnection();
+  try {
+    const [locked] = await connection.query<RowDataPacket[]>("SELECT GET_LOCK('ihome_migrate', 120) AS ok");
+    if (!locked[0].ok) {
+      throw new Error('Timed out waiting for another migration to finish');
+    }
+    try {
+      if (await schemaVersion() >= SCHEMA_VERSION) return false;
+      await initDatabase();
+      await connection.query(`
+        CREATE TABLE IF NOT EXISTS schema_meta (
+          id TINYINT PRIMARY KEY,
+          version INT NOT NULL,
+          migrated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+      `);
+      await connection.query(
+        'INSERT INTO schema_meta (id, version) VALUES (1, ?) ON DUPLICATE KEY UPDATE version = VALUES(version)',
+        [SCHEMA_VERSION]
+      );
+      console.log(`✅ Database schema migrated to version ${SCHEMA_VERSION}`);
+      return true;
+    } finally {
+      await connection.query("SELECT RELEASE_LOCK('ihome_migrate')");
+    }
+  } finally {
+    connection.release();
+  }
+}
+
+// Called on boot: migrates an outdated schema unless MIGRATE_ON_START=false, in
+// which case the deploy must run `npm run migrate` first
+export async function ensureSchema() {
+  if (await schemaVersion() >= SCHEMA_VERSION) return;
+  if (process.env.MIGRATE_ON_START === 'false') {
+    throw new Error(`Database schema is behind version ${SCHEMA_VERSION}; run npm run migrate`);
+  }
+  await migrate();
+}
+
+// Connect up to DB_PREWARM_CONNECTIONS (default: the pool size) connections
+// ahead of traffic so the first requests do not pay for TCP + auth handshakes
+export async function prewarmPools() {
+  for (const source of new Set([pool, readPool])) {
+    const size = (source.pool as any).config?.connectionLimit ?? 10;
+    const count = Math.min(size, env('DB_PREWARM_CONNECTIONS', size));
+    const connections = await Promise.all(Array.from({ length: count }, () => source.getConnection()));
+    await Promise.all(connections.map(connection => connection.ping()));
+    connections.forEach(connection => connection.release());
+  }
+}
 
 export async function initDatabase() {
   const connection = await pool.getConnection();
 
   try {
+    // Existing tables first, so everything below works on BINARY(16) ids
+    await migrateIdColumns(connection);
+
     // Create products table
     await connection.query(`
       CREATE TABLE IF NOT EXISTS products (
-        id VARCHAR(36) PRIMARY KEY,
+        id BINARY(16) PRIMARY KEY,
         name VARCHAR(255) NOT NULL,
         sku VARCHAR(100),
         category VARCHAR(100),
@@ -32,14 +251,14 @@ export async function initDatabase() {
         image_url VARCHAR(500),
         description TEXT,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
       )
     `);
 
     // Create customers table
     await connection.query(`
       CREATE TABLE IF NOT EXISTS customers (
-        id VARCHAR(36) PRIMARY KEY,
+        id BINARY(16) PRIMARY KEY,
         name VARCHAR(255) NOT NULL,
         email VARCHAR(255),
         phone VARCHAR(50),
@@ -48,16 +267,17 @@ export async function initDatabase() {
         company_name VARCHAR(255),
         tax_number VARCHAR(100),
         details TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
       )
     `);
 
     // Create invoices table
     await connection.query(`
       CREATE TABLE IF NOT EXISTS invoices (
-        id VARCHAR(36) PRIMARY KEY,
+        id BINARY(16) PRIMARY KEY,
         invoice_number VARCHAR(50) NOT NULL,
-        customer_id VARCHAR(36),
+        customer_id BINARY(16),
         customer_name VARCHAR(255),
         customer_email VARCHAR(255),
         customer_phone VARCHAR(50),
@@ -69,16 +289,16 @@ export async function initDatabase() {
         total DECIMAL(10, 2) NOT NULL DEFAULT 0,
         notes TEXT,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
       )
     `);
 
     // Create invoice_items table
     await connection.query(`
       CREATE TABLE IF NOT EXISTS invoice_items (
-        id VARCHAR(36) PRIMARY KEY,
-        invoice_id VARCHAR(36) NOT NULL,
-        product_id VARCHAR(36),
+        id BINARY(16) PRIMARY KEY,
+        invoice_id BINARY(16) NOT NULL,
+        product_id BINARY(16),
         product_name VARCHAR(255) NOT NULL,
         quantity INT NOT NULL DEFAULT 1,
         unit_price DECIMAL(10, 2) NOT NULL DEFAULT 0,
@@ -90,22 +310,24 @@ export async function initDatabase() {
     // Create expense_categories table
     await connection.query(`
       CREATE TABLE IF NOT EXISTS expense_categories (
-        id VARCHAR(36) PRIMARY KEY,
+        id BINARY(16) PRIMARY KEY,
         name VARCHAR(100) NOT NULL,
-        color VARCHAR(20) DEFAULT '#6366f1'
+        color VARCHAR(20) DEFAULT '#6366f1',
+        updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
       )
     `);
 
     // Create expenses table
     await connection.query(`
       CREATE TABLE IF NOT EXISTS expenses (
-        id VARCHAR(36) PRIMARY KEY,
-        category_id VARCHAR(36),
+        id BINARY(16) PRIMARY KEY,
+        category_id BINARY(16),
         category_name VARCHAR(100) NOT NULL,
         amount DECIMAL(10, 2) NOT NULL DEFAULT 0,
         description TEXT,
         date DATE NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
       )
     `);
 
@@ -114,49 +336,50 @@ export async function initDatabase() {
     if ((categories as any)[0].count === 0) {
       await connection.query(`
         INSERT INTO expense_categories (id, name, color) VALUES
-        (UUID(), 'Rent', '#ef4444'),
-        (UUID(), 'Utilities', '#f59e0b'),
-        (UUID(), 'Supplies', '#22c55e'),
-        (UUID(), 'Marketing', '#6366f1'),
-        (UUID(), 'Salaries', '#ec4899'),
-        (UUID(), 'Other', '#64748b')
+        (${NEW_ID_SQL}, 'Rent', '#ef4444'),
+        (${NEW_ID_SQL}, 'Utilities', '#f59e0b'),
+        (${NEW_ID_SQL}, 'Supplies', '#22c55e'),
+        (${NEW_ID_SQL}, 'Marketing', '#6366f1'),
+        (${NEW_ID_SQL}, 'Salaries', '#ec4899'),
+        (${NEW_ID_SQL}, 'Other', '#64748b')
       `);
     }
 
     // Create suppliers table
     await connection.query(`
       CREATE TABLE IF NOT EXISTS suppliers (
-        id VARCHAR(36) PRIMARY KEY,
+        id BINARY(16) PRIMARY KEY,
         name VARCHAR(255) NOT NULL,
         email VARCHAR(255),
         phone VARCHAR(50),
         address TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
       )
     `);
 
     // Create purchase_invoices table
     await connection.query(`
       CREATE TABLE IF NOT EXISTS purchase_invoices (
-        id VARCHAR(36) PRIMARY KEY,
+        id BINARY(16) PRIMARY KEY,
         invoice_number VARCHAR(50) NOT NULL,
-        supplier_id VARCHAR(36),
+        supplier_id BINARY(16),
         supplier_name VARCHAR(255),
         status ENUM('pending', 'received', 'cancelled') NOT NULL DEFAULT 'pending',
         subtotal DECIMAL(10, 2) NOT NULL DEFAULT 0,
         total DECIMAL(10, 2) NOT NULL DEFAULT 0,
         notes TEXT,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
       )
     `);
 
     // Create purchase_items table
     await connection.query(`
       CREATE TABLE IF NOT EXISTS purchase_items (
-        id VARCHAR(36) PRIMARY KEY,
-        purchase_id VARCHAR(36) NOT NULL,
-        product_id VARCHAR(36),
+        id BINARY(16) PRIMARY KEY,
+        purchase_id BINARY(16) NOT NULL,
+        product_id BINARY(16),
         product_name VARCHAR(255) NOT NULL,
         quantity INT NOT NULL DEFAULT 1,
         unit_cost DECIMAL(10, 2) NOT NULL DEFAULT 0,
@@ -168,7 +391,7 @@ export async function initDatabase() {
     // Create roles table
     await connection.query(`
       CREATE TABLE IF NOT EXISTS roles (
-        id VARCHAR(36) PRIMARY KEY,
+        id BINARY(16) PRIMARY KEY,
         name VARCHAR(50) NOT NULL UNIQUE,
         description TEXT,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -178,7 +401,7 @@ export async function initDatabase() {
     // Create permissions table
     await connection.query(`
       CREATE TABLE IF NOT EXISTS permissions (
-        id VARCHAR(36) PRIMARY KEY,
+        id BINARY(16) PRIMARY KEY,
         code VARCHAR(100) NOT NULL UNIQUE,
         description TEXT,
         module VARCHAR(50)
@@ -188,8 +411,8 @@ export async function initDatabase() {
     // Create role_permissions table
     await connection.query(`
       CREATE TABLE IF NOT EXISTS role_permissions (
-        role_id VARCHAR(36),
-        permission_id VARCHAR(36),
+        role_id BINARY(16),
+        permission_id BINARY(16),
         PRIMARY KEY (role_id, permission_id),
         FOREIGN KEY (role_id) REFERENCES roles(id) ON DELETE CASCADE,
         FOREIGN KEY (permission_id) REFERENCES permissions(id) ON DELETE CASCADE
@@ -199,11 +422,11 @@ export async function initDatabase() {
     // Create users table
     await connection.query(`
       CREATE TABLE IF NOT EXISTS users (
-        id VARCHAR(36) PRIMARY KEY,
+        id BINARY(16) PRIMARY KEY,
         username VARCHAR(50) NOT NULL UNIQUE,
         password_hash VARCHAR(255) NOT NULL,
         full_name VARCHAR(100),
-        role_id VARCHAR(36),
+        role_id BINARY(16),
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         FOREIGN KEY (role_id) REFERENCES roles(id) ON DELETE SET NULL
       )
@@ -212,20 +435,81 @@ export async function initDatabase() {
     // Seed Admin Role and User
     const [existingRoles]: any = await connection.query('SELECT * FROM roles WHERE name = ?', ['Admin']);
     if (existingRoles.length === 0) {
-      await connection.query('INSERT INTO roles (id, name, description) VALUES (UUID(), ?, ?)', ['Admin', 'Full System Access']);
+      await connection.query(`INSERT INTO roles (id, name, description) VALUES (${NEW_ID_SQL}, ?, ?)`, ['Admin', 'Full System Access']);
 
       const [adminRole]: any = await connection.query('SELECT id FROM roles WHERE name = ?', ['Admin']);
       const adminRoleId = adminRole[0].id;
 
-      await connection.query('INSERT INTO users (id, username, password_hash, full_name, role_id) VALUES (UUID(), ?, ?, ?, ?)', [
+      await connection.query(`INSERT INTO users (id, username, password_hash, full_name, role_id) VALUES (${NEW_ID_SQL}, ?, ?, ?, ?)`, [
         'admin',
         '$2b$10$B/TZEd1KXaogc/S3Wf./5.t7muwrXXFjxS1Ghcj7KAND9nIsxqlNi', // admin123
         'System Admin',
-        adminRoleId
+        binId(adminRoleId)
       ]);
       console.log('✅ Default Admin user created');
     }
 
+    // Create stock_movements ledger (append-only; products.quantity is its running balance)
+    await connection.query(`
+      CREATE TABLE IF NOT EXISTS stock_movements (
+        id BINARY(16) PRIMARY KEY,
+        product_id BINARY(16) NOT NULL,
+        type ENUM('purchase', 'sale', 'adjustment', 'return') NOT NULL,
+        quantity INT NOT NULL,
+        reference_type VARCHAR(20),
+        reference_id BINARY(16),
+        note VARCHAR(255),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_stock_movements_product (product_id),
+        INDEX idx_stock_movements_reference (reference_type, reference_id)
+      )
+    `);
+    await seedOpeningBalances(connection);
+
+    // Create import_jobs table (background CSV imports)
+    await connection.query(`
+      CREATE TABLE IF NOT EXISTS import_jobs (
+        id BINARY(16) PRIMARY KEY,
+        type VARCHAR(30) NOT NULL,
+        status ENUM('queued', 'running', 'completed', 'failed') NOT NULL DEFAULT 'queued',
+        file_path VARCHAR(500),
+        total_rows INT NOT NULL DEFAULT 0,
+        processed_rows INT NOT NULL DEFAULT 0,
+        failed_rows INT NOT NULL DEFAULT 0,
+        errors JSON,
+        stats JSON,
+        message VARCHAR(255),
+        started_at TIMESTAMP NULL,
+        finished_at TIMESTAMP NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+      )
+    `);
+
+    // Create document_sequences table (one counter per resolved number prefix, see lib/sequences.ts)
+    await connection.query(`
+      CREATE TABLE IF NOT EXISTS document_sequences (
+        name VARCHAR(100) PRIMARY KEY,
+        value INT UNSIGNED NOT NULL DEFAULT 0
+      )
+    `);
+
+    // Conditional GETs validate against updated_at; backfill it on older
+    // databases and index it so the version probes are index-only scans.
+    // Microsecond precision, so two edits within one second still change it.
+    const versionedTables = ['products', 'customers', 'invoices', 'expense_categories', 'expenses', 'suppliers', 'purchase_invoices'];
+    for (const table of versionedTables) {
+      await ensureColumn(connection, table, 'updated_at', UPDATED_AT);
+      await ensureMicrosecondUpdatedAt(connection, table);
+      await ensureIndex(connection, table, 'idx_updated_at', '(updated_at)');
+    }
+    await ensureColumn(connection, 'import_jobs', 'stats', 'JSON');
+    await ensureColumn(connection, 'products', 'image_variants', 'JSON');
+    await ensureUniqueSku(connection);
+    // Sequence counters seed from the highest number already used under their prefix
+    await ensureIndex(connection, 'invoices', 'idx_invoice_number', '(invoice_number)');
+    await ensureIndex(connection, 'purchase_invoices', 'idx_invoice_number', '(invoice_number)');
+
     console.log('✅ Database tables initialized');
   } finally {
     connection.release();
@@ -1,7 +1,18 @@
 import express from 'express';
 import cors from 'cors';
+import compression from 'compression';
 import dotenv from 'dotenv';
-import { initDatabase } from './db.js';
+import pool, { readPool, ensureSchema, prewarmPools } from './db.js';
+import { startStockReconciliation } from './lib/stock.js';
+import { failInterruptedImports, resumeImportJobs, settleImports } from './lib/jobs.js';
+import { HASHED_NAME, backfillProductImages } from './lib/images.js';
+import { cacheStats } from './lib/cache.js';
+import { requestMetrics, metricsHandler } from './lib/metrics.js';
+import { traceRequests } from './lib/queryTrace.js';
+import { authenticateToken, requirePermission } from './middleware/auth.js';
+import { SHUTDOWN_MESSAGE, READY_MESSAGE } from './lib/ipc.js';
+import http, { type Server } from 'http';
+import type { AddressInfo } from 'net';
 import productsRouter from './routes/products.js';
 import customersRouter from './routes/customers.js';
 import invoicesRouter from './routes/invoices.js';
@@ -12,16 +23,36 @@ import authRouter from './routes/auth.js';
 import usersRouter from './routes/users.js';
 import rolesRouter from './routes/roles.js';
 import systemRouter from './routes/system.js';
+import eventsRouter, { closeEventStreams } from './routes/events.js';
+import jobsRouter from './routes/jobs.js';
 
 dotenv.config();
 
 const app = express();
 const port = process.env.PORT || 3001;
+const SHUTDOWN_TIMEOUT_MS = parseInt(process.env.SHUTDOWN_TIMEOUT_MS || '30000');
+// How long /api/ready reports "draining" before the listener closes, so load
+// balancers stop routing here first
+const DRAIN_DELAY_MS = parseInt(process.env.DRAIN_DELAY_MS || '0');
+// Cached lists fetched once before reporting ready
+const WARM_PATHS = (process.env.WARM_PATHS ?? '/api/products,/api/suppliers,/api/expenses/categories').split(',').filter(Boolean);
+
+let state: 'starting' | 'ready' | 'draining' = 'starting';
 
 // Middleware
-app.use(cors());
-app.use(express.json());
-app.use(express.json());
+app.use((req, res, next) => {
+    // Keep-alive clients are moved off a server that is shutting down
+    if (state === 'draining') res.setHeader('Connection', 'close');
+    next();
+});
+app.use('/api', requestMetrics, traceRequests);
+app.use(cors({ exposedHeaders: ['ETag'] }));
+app.use(compression({
+    // SSE frames must reach clients immediately rather than wait in a gzip buffer
+    filter: (req, res) => res.getHeader('Content-Type') !== 'text/event-stream' && compression.filter(req, res),
+}));
+// Large enough for bulk payloads such as a full stock balance snapshot
+app.use(express.json({ limit: process.env.JSON_BODY_LIMIT || '10mb' }));
 
 // Routes
 app.use('/api/auth', authRouter);
@@ -34,12 +65,37 @@ app.use('/api/expenses', expensesRouter);
 app.use('/api/suppliers', suppliersRouter);
 app.use('/api/purchases', purchasesRouter);
 app.use('/api/system', systemRouter);
+app.use('/api/events', eventsRouter);
+app.use('/api/jobs', jobsRouter);
 
-// Health check
+// Health check (liveness: the process is up)
 app.get('/api/health', (req, res) => {
     res.json({ status: 'ok', timestamp: new Date().toISOString() });
 });
 
+// Readiness: warmed up, not shutting down, and the database answers
+app.get('/api/ready', async (req, res) => {
+    if (state !== 'ready') {
+        return res.status(503).json({ status: state });
+    }
+    try {
+        await pool.query('SELECT 1');
+        res.json({ status: 'ready' });
+    } catch {
+        res.status(503).json({ status: 'database unavailable' });
+    }
+});
+
+// Prometheus scrape target (bearer token of a user with system.metrics). Route
+// traffic and cache contents are not for anyone who can reach the port; in
+// cluster mode METRICS_PORT also serves them, aggregated, on an internal address.
+app.get('/api/metrics', authenticateToken, requirePermission('system.metrics'), metricsHandler);
+
+// Response cache hit/miss counters
+app.get('/api/cache/stats', authenticateToken, requirePermission('system.metrics'), async (req, res) => {
+    res.json(await cacheStats());
+});
+
 // Serve static files from the React app
 import path from 'path';
 import { fileURLToPath } from 'url';
@@ -47,8 +103,14 @@ import { fileURLToPath } from 'url';
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 
-// Serve uploads
-app.use('/uploads', express.static(path.join(__dirname, 'public/uploads')));
+// Serve uploads; content-hashed product images and thumbnails never change
+app.use('/uploads', express.static(path.join(__dirname, 'public/uploads'), {
+    setHeaders: (res, filePath) => {
+        if (HASHED_NAME.test(path.basename(filePath))) {
+            res.setHeader('Cache-Control', 'public, max-age=31536000, immutable');
+        }
+    },
+}));
 
 // Serve React build
 app.use(express.static(path.join(__dirname, '../dist')));
@@ -58,12 +120,53 @@ app.get('*', (req, res) => {
     res.sendFile(path.join(__dirname, '../dist/index.html'));
 });
 
+// Under cluster.ts the primary migrates the schema and recovers interrupted
+// imports once; process-wide background work runs in the leader worker only
+const clusterWorker = Boolean(process.env.CLUSTER_WORKER);
+const leader = !clusterWorker || Boolean(process.env.CLUSTER_LEADER);
+
+let server: Server | undefined;
+
+// Run the cached list handlers once through a private loopback listener, so the
+// response cache, prepared statements and handler code are warm before the
+// first real request. `exclusive` keeps it out of the cluster's shared port.
+async function warmCaches() {
+    const warm = http.createServer(app);
+    await new Promise<void>(resolve => warm.listen({ port: 0, host: '127.0.0.1', exclusive: true }, resolve));
+    const { port: warmPort } = warm.address() as AddressInfo;
+    try {
+        for (const warmPath of WARM_PATHS) {
+            const response = await fetch(`http://127.0.0.1:${warmPort}${warmPath}`);
+            await response.arrayBuffer();
+        }
+    } catch (error) {
+        console.warn('Cache warm-up failed:', error);
+    } finally {
+        warm.close();
+    }
+}
+
 // Initialize database and start server
 async function start() {
     try {
-        await initDatabase();
-        app.listen(port, () => {
-            console.log(`🚀 Server running on http://localhost:${port}`);
+        if (!clusterWorker) {
+            await ensureSchema();
+            await failInterruptedImports();
+        }
+        await prewarmPools();
+        if (leader) {
+            startStockReconciliation();
+            await resumeImportJobs();
+            backfillProductImages().catch(error => console.error('Thumbnail backfill failed:', error));
+        }
+        // Warm up before taking the port, so no real request lands on a cold process
+        await warmCaches();
+        if (state === 'draining') return;
+        server = app.listen(port, () => {
+            console.log(`🚀 Server running on http://localhost:${port}${clusterWorker ? ` (worker ${process.pid})` : ''}`);
+            if (state !== 'starting') return;
+            state = 'ready';
+            process.send?.(READY_MESSAGE);
         });
     } catch (error) {
         console.error('Failed to start server:', error);
@@ -71,4 +174,38 @@ async function start() {
     }
 }
 
+// Drain on SIGTERM (or the cluster primary's request): report not-ready, stop
+// accepting connections, let in-flight requests, transactions and imports
+// finish, then close the pools. Forced exit after SHUTDOWN_TIMEOUT_MS.
+async function shutdown() {
+    if (state === 'draining') return;
+    state = 'draining';
+    console.log(`⏳ Draining${clusterWorker ? ` worker ${process.pid}` : ''}`);
+    setTimeout(() => {
+        console.error('Shutdown timed out; exiting with requests still in flight');
+        process.exit(1);
+    }, SHUTDOWN_TIMEOUT_MS).unref();
+
+    await new Promise(resolve => setTimeout(resolve, DRAIN_DELAY_MS));
+    closeEventStreams();
+    if (server) {
+        const closed = new Promise(resolve => server!.close(resolve));
+        server.closeIdleConnections();
+        await closed;
+    }
+    await settleImports();
+    await pool.end();
+    if (readPool !== pool) await readPool.end();
+    process.exit(0);
+}
+
+process.on('message', (message) => {
+    if (message === SHUTDOWN_MESSAGE) {
+        shutdown();
+    }
+});
+process.on('SIGTERM', shutdown);
+// In a cluster, Ctrl+C also reaches the workers; the primary drains them instead
+process.on('SIGINT', clusterWorker ? () => {} : shutdown);
+
 start();
@@ -0,0 +1,255 @@
+import { createHash } from 'crypto';
+import type { Request, Response, NextFunction } from 'express';
+import { etagMatches } from '../middleware/conditional.js';
+import { broadcast, onBroadcast } from './ipc.js';
+
+const TTL = parseFloat(process.env.CACHE_TTL_SECONDS || '300') * 1000;
+const MAX_BYTES = parseFloat(process.env.CACHE_MAX_MB || '64') * 1024 * 1024;
+const PREFIX = process.env.CACHE_PREFIX || 'ihome:cache:';
+
+// Stored values are "<etag>\n<json body>"
+interface CacheBackend {
+    name: string;
+    // Seen by every server process (so one clear is enough)
+    shared: boolean;
+    get(key: string): Promise<string | null>;
+    set(key: string, value: string): Promise<void>;
+    // Remove every key starting with prefix
+    clear(prefix: string): Promise<void>;
+    usage?(): { entries: number; bytes: number };
+}
+
+// ---- Backends ------------------------------------------------------------
+
+// Least recently used entries are evicted once the byte budget is exceeded;
+// Map iteration order doubles as the recency list.
+function memoryBackend(): CacheBackend {
+    const entries = new Map<string, { value: string; bytes: number; expires: number }>();
+    let bytes = 0;
+
+    const remove = (key: string) => {
+        const entry = entries.get(key);
+        if (entry) {
+            bytes -= entry.bytes;
+            entries.delete(key);
+        }
+    };
+
+    return {
+        name: 'memory',
+        shared: false,
+        async get(key) {
+            const entry = entries.get(key);
+            if (!entry) return null;
+            entries.delete(key);
+            if (entry.expires < Date.now()) {
+                bytes -= entry.bytes;
+                return null;
+            }
+            entries.set(key, entry);
+            return entry.value;
+        },
+        async set(key, value) {
+            remove(key);
+            const size = Buffer.byteLength(value);
+            if (size > MAX_BYTES) return;
+            entries.set(key, { value, bytes: size, expires: Date.now() + TTL });
+            bytes += size;
+            for (const oldest of entries.keys()) {
+                if (bytes <= MAX_BYTES) break;
+                remove(oldest);
+            }
+        },
+        async clear(prefix) {
+            for (const key of [...entries.keys()]) {
+                if (key.startsWith(prefix)) remove(key);
+            }
+        },
+        usage: () => ({ entries: entries.size, bytes }),
+    };
+}
+
+// Any Redis-protocol server (Redis, Valkey, KeyDB...) when REDIS_URL is set;
+// entries are shared by every server process pointing at it
+async function redisBackend(url: string): Promise<CacheBackend> {
+    const { Redis } = await import('ioredis');
+    const client = new Redis(url, { maxRetriesPerRequest: 1, enableOfflineQueue: false });
+    client.on('error', (error: Error) => console.error('Cache server error:', error.message));
+
+    return {
+        name: 'redis',
+        shared: true,
+        get: key => client.get(PREFIX + key),
+        async set(key, value) {
+            await client.set(PREFIX + key, value, 'PX', Math.round(TTL));
+        },
+        async clear(prefix) {
+            const stream = client.scanStream({ match: `${PREFIX}${prefix}*`, count: 200 });
+            for await (const keys of stream) {
+                if (keys.length > 0) await client.unlink(...keys);
+            }
+        },
+    };
+}
+
+// ioredis is optional: without it, or without REDIS_URL, the cache is in-process
+let selected: Promise<CacheBackend> | undefined;
+
+function backend() {
+    selected ??= (async () => {
+        const url = process.env.REDIS_URL;
+        if (url) {
+            try {
+                return await redisBackend(url);
+            } catch (error) {
+                console.warn('⚠️ REDIS_URL is set but ioredis could not be loaded; using the in-memory cache', error);
+            }
+        }
+        return memoryBackend();
+    })();
+    return selected;
+}
+
+// ---- Stats ---------------------------------------------------------------
+
+const counters = new Map<string, { hits: number; misses: number; stores: number; invalidations: number; errors: number }>();
+
+function count(resource: string) {
+    let entry = counters.get(resource);
+    if (!entry) {
+        entry = { hits: 0, misses: 0, stores: 0, invalidations: 0, errors: 0 };
+        counters.set(resource, entry);
+    }
+    return entry;
+}
+
+export async function cacheStats() {
+    const cache = await backend();
+    const resources = Object.fromEntries(counters);
+    const totals = { hits: 0, misses: 0, stores: 0, invalidations: 0, errors: 0 };
+    for (const entry of counters.values()) {
+        for (const key of Object.keys(totals) as (keyof typeof totals)[]) totals[key] += entry[key];
+    }
+    const lookups = totals.hits + totals.misses;
+    return {
+        backend: cache.name,
+        ttlSeconds: TTL / 1000,
+        ...cache.usage?.(),
+        ...totals,
+        hitRate: lookups > 0 ? totals.hits / lookups : null,
+        resources,
+    };
+}
+
+// ---- Invalidation ----------------------------------------------------------
+
+// Bumped on every invalidation so a response that was read from MySQL before a
+// write, but finishes after it, is not stored
+const generations = new Map<string, number>();
+
+async function clearResources(resources: string[], remote: boolean) {
+    const cache = await backend();
+    for (const resource of resources) {
+        generations.set(resource, (generations.get(resource) ?? 0) + 1);
+        if (remote && cache.shared) continue; // the writer already cleared it
+        count(resource).invalidations++;
+        try {
+            await cache.clear(`${resource}:`);
+        } catch (error) {
+            count(resource).errors++;
+            console.error(`Error invalidating cache for ${resource}:`, error);
+        }
+    }
+}
+
+// Drop every cached response of a resource. Called by writers after commit and
+// before answering, so the next read is fresh. Other cluster workers drop their
+// in-memory copies too.
+export async function invalidate(...resources: string[]) {
+    broadcast('cache', resources);
+    await clearResources(resources, false);
+}
+
+onBroadcast<string[]>('cache', (resources) => {
+    clearResources(resources, true).catch(() => {});
+});
+
+export async function invalidateAll() {
+    await invalidate(...new Set([...counters.keys(), ...generations.keys()]));
+}
+
+// ---- Middleware ------------------------------------------------------------
+
+// Serve a JSON list from the cache, keyed by resource and URL. Placed in front
+// of conditionalGet, a hit skips both the validator probe and the query; a miss
+// runs the handler as usual (streamed or not) and keeps a copy of the body with
+// its ETag on the way out.
+export function cached(resource: string) {
+    return async (req: Request, res: Response, next: NextFunction) => {
+        const key = `${resource}:${req.originalUrl}`;
+        const stats = count(resource);
+
+        let stored: string | null = null;
+        try {
+            stored = await (await backend()).get(key);
+        } catch (error) {
+            stats.errors++;
+            console.error(`Error reading cache for ${resource}:`, error);
+        }
+
+        if (stored !== null) {
+            stats.hits++;
+            const split = stored.indexOf('\n');
+            const etag = stored.slice(0, split);
+            res.setHeader('X-Cache', 'HIT');
+            res.setHeader('ETag', etag);
+            res.setHeader('Cache-Control', 'private, no-cache');
+            if (etagMatches(req.headers['if-none-match'], etag)) {
+                return res.status(304).end();
+            }
+            res.type('application/json').send(stored.slice(split + 1));
+            return;
+        }
+
+        stats.misses++;
+        res.setHeader('X-Cache', 'MISS');
+        const generation = generations.get(resource) ?? 0;
+        const chunks: Buffer[] = [];
+
+        // Tee whatever the handler writes; compression sits further out, so
+        // these are the uncompressed bytes
+        const capture = (chunk: unknown, encoding: unknown) => {
+            if (chunk && typeof chunk !== 'function') {
+                chunks.push(Buffer.isBuffer(chunk) ? chunk : Buffer.from(String(chunk), (typeof encoding === 'string' ? encoding : 'utf8') as BufferEncoding));
+            }
+        };
+        const write = res.write;
+        const end = res.end;
+        res.write = function (this: Response, chunk: unknown, ...rest: unknown[]) {
+            capture(chunk, rest[0]);
+            return (write as Function).call(this, chunk, ...rest);
+        } as typeof res.write;
+        res.end = function (this: Response, chunk?: unknown, ...rest: unknown[]) {
+            capture(chunk, rest[0]);
+            return (end as Function).call(this, chunk, ...rest);
+        } as typeof res.end;
+
+        res.on('finish', () => {
+            if (res.statusCode !== 200 || (generations.get(resource) ?? 0) !== generation) return;
+            const body = Buffer.concat(chunks).toString('utf8');
+            // Handlers without conditionalGet get a content hash as validator
+            const etag = String(res.getHeader('ETag') || `W/"${createHash('sha1').update(body).digest('base64url')}"`);
+            backend()
+                .then(cache => cache.set(key, `${etag}\n${body}`))
+                .then(() => {
+                    stats.stores++;
+                })
+                .catch((error) => {
+                    stats.errors++;
+                    console.error(`Error writing cache for ${resource}:`, error);
+                });
+        });
+
+        next();
+    };
+}
@@ -0,0 +1,30 @@
+import { EventEmitter } from 'events';
+import { broadcast, onBroadcast } from './ipc.js';
+
+// Change events mirror the frontend AppAction shape ({ type, payload })
+// so subscribers can dispatch them as-is.
+export interface ChangeEvent {
+    type: string;
+    payload: unknown;
+}
+
+const bus = new EventEmitter();
+
+// In cluster mode every worker's SSE clients get every change, whichever
+// worker made it
+export function publish(type: string, payload: unknown) {
+    const event: ChangeEvent = { type, payload };
+    bus.emit('change', event);
+    broadcast('change', event);
+}
+
+onBroadcast<ChangeEvent>('change', (event) => {
+    bus.emit('change', event);
+});
+
+export function subscribe(listener: (event: ChangeEvent) => void) {
+    bus.on('change', listener);
+    return () => {
+        bus.off('change', listener);
+    };
+}
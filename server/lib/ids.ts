@@ -0,0 +1,82 @@
+import { createHash } from 'crypto';
+import { v7 as uuidv7 } from 'uuid';
+import type { PoolOptions } from 'mysql2/promise';
+
+// Row ids are UUIDv7 stored as BINARY(16). v7 starts with a millisecond
+// timestamp, so new rows append to the end of the clustered index instead of
+// landing on random pages, and every key (and every secondary index entry
+// carrying it) takes 16 bytes instead of 36+.
+//
+// Route code keeps handling ids as the usual 36-character strings:
+//   - reads: BINARY(16) columns come back as UUID strings (typeCast below)
+//   - writes: a parameter bound to an id column goes through binId() (or
+//     binIds() for "IN (?)"); other strings are left alone, whatever they look like
+
+const UUID_PATTERN = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+const UUID_HEX = /^[0-9a-f]{32}$/i;
+
+// Id and reference columns per table. Databases created before BINARY(16)
+// stored them as VARCHAR(36) (converted by migrateIdColumns in db.ts), and old
+// backups still carry them as text (mapped by the restore in routes/system.ts).
+export const ID_COLUMNS: Record<string, string[]> = {
+    products: ['id'],
+    customers: ['id'],
+    invoices: ['id', 'customer_id'],
+    invoice_items: ['id', 'invoice_id', 'product_id'],
+    expense_categories: ['id'],
+    expenses: ['id', 'category_id'],
+    suppliers: ['id'],
+    purchase_invoices: ['id', 'supplier_id'],
+    purchase_items: ['id', 'purchase_id', 'product_id'],
+    roles: ['id'],
+    permissions: ['id'],
+    role_permissions: ['role_id', 'permission_id'],
+    users: ['id', 'role_id'],
+    stock_movements: ['id', 'product_id', 'reference_id'],
+    import_jobs: ['id'],
+};
+
+export const newId = () => uuidv7();
+
+// A new id generated by MySQL, for INSERT ... SELECT. The swap flag moves the
+// UUID's timestamp to the front, so these are time-ordered too.
+export const NEW_ID_SQL = 'UUID_TO_BIN(UUID(), 1)';
+
+export function isId(value: unknown): value is string {
+    return typeof value === 'string' && UUID_PATTERN.test(value);
+}
+
+// An id as the 16 bytes it is stored as. UUID text maps to its bytes; anything
+// else (hand-made keys such as "cust-...") to the MD5 of the text, and blanks
+// to NULL: the same mapping migrateIdColumns applies in SQL, so legacy keys
+// keep matching the rows they were converted to.
+export function binId(id: unknown): Buffer | null {
+    if (id === undefined || id === null || id === '') return null;
+    if (Buffer.isBuffer(id)) return id;
+    const text = String(id);
+    const hex = text.replace(/-/g, '');
+    return UUID_HEX.test(hex) ? Buffer.from(hex, 'hex') : createHash('md5').update(text).digest();
+}
+
+// For "IN (?)"; an empty list would render as "IN ()"
+export const binIds = (ids: unknown[]) => ids.map(binId);
+
+function binaryToId(bytes: Buffer) {
+    const hex = bytes.toString('hex');
+    return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+}
+
+const MYSQL_TYPE_STRING = 254;
+const BINARY_CHARSET = 63;
+
+// BINARY(16): a fixed-length string column in the binary character set. The
+// field mysql2 hands to typeCast may omit columnType/characterSet; without them
+// it is known by its type name and width (no CHAR or ENUM in the schema is 16
+// bytes wide).
+export const typeCast: PoolOptions['typeCast'] = (field, next) => {
+    const { columnType, characterSet } = field as typeof field & { columnType?: number; characterSet?: number };
+    const fixedString = columnType === undefined ? field.type === 'STRING' : columnType === MYSQL_TYPE_STRING;
+    if (!fixedString || field.length !== 16 || (characterSet ?? BINARY_CHARSET) !== BINARY_CHARSET) return next();
+    const bytes = field.buffer();
+    return bytes ? binaryToId(bytes) : null;
+};
@@ -0,0 +1,101 @@
+import fs from 'fs';
+import path from 'path';
+import { createHash } from 'crypto';
+import type { RowDataPacket } from 'mysql2';
+import pool from '../db.js';
+import { binId } from './ids.js';
+import { publish } from './events.js';
+import { invalidate } from './cache.js';
+
+const PRODUCTS_DIR = 'public/uploads/products';
+const PRODUCTS_URL = '/uploads/products';
+const WIDTHS = [64, 128, 256, 512];
+const FORMATS = ['avif', 'webp'] as const;
+
+// Content-addressed file names (hash, optionally -width) never change content,
+// so they can be cached forever
+export const HASHED_NAME = /^[0-9a-f]{16}(-\d+)?\.\w+$/;
+
+export type ImageVariants = Partial<Record<(typeof FORMATS)[number], string>>; // format -> srcset
+
+// sharp is optional: without it, products keep only the original image
+let sharpModule: Promise<any> | undefined;
+function loadSharp() {
+    sharpModule ??= import('sharp').then(m => m.default).catch(() => {
+        console.warn('⚠️ sharp is not installed; product thumbnails are disabled');
+        return null;
+    });
+    return sharpModule;
+}
+
+// Rename an uploaded product image to its content hash and render AVIF/WebP
+// variants at fixed widths next to it. Returns the URLs to store on the product.
+export async function storeProductImage(filePath: string, keepOriginal = false) {
+    const data = await fs.promises.readFile(filePath);
+    const hash = createHash('sha256').update(data).digest('hex').slice(0, 16);
+    const ext = path.extname(filePath).toLowerCase() || '.jpg';
+    const name = `${hash}${ext}`;
+
+    await fs.promises.mkdir(PRODUCTS_DIR, { recursive: true });
+    const target = path.join(PRODUCTS_DIR, name);
+    if (path.resolve(filePath) !== path.resolve(target)) {
+        if (keepOriginal) {
+            await fs.promises.copyFile(filePath, target);
+        } else {
+            await fs.promises.rename(filePath, target);
+        }
+    }
+
+    const variants: ImageVariants = {};
+    const sharp = await loadSharp();
+    if (sharp) {
+        const { width: originalWidth = Infinity } = await sharp(data).metadata();
+        // Never upscale; the largest variant is capped at the original width
+        const widths = WIDTHS.filter(w => w < originalWidth);
+        if (widths.length < WIDTHS.length && Number.isFinite(originalWidth)) widths.push(originalWidth);
+
+        for (const format of FORMATS) {
+            const entries: string[] = [];
+            for (const width of widths) {
+                const file = `${hash}-${width}.${format}`;
+                const out = path.join(PRODUCTS_DIR, file);
+                if (!fs.existsSync(out)) {
+                    await sharp(data).rotate().resize({ width }).toFormat(format, { quality: format === 'avif' ? 50 : 75 }).toFile(out);
+                }
+                entries.push(`${PRODUCTS_URL}/${file} ${width}w`);
+            }
+            variants[format] = entries.join(', ');
+        }
+    }
+
+    return { imageUrl: `${PRODUCTS_URL}/${name}`, variants: Object.keys(variants).length > 0 ? variants : null };
+}
+
+// Lazily bring images uploaded before the pipeline existed up to date.
+// Originals are copied, not moved, so any old URL keeps working.
+export async function backfillProductImages() {
+    if (!(await loadSharp())) return;
+
+    const [rows] = await pool.query<RowDataPacket[]>(
+        "SELECT id, image_url FROM products WHERE image_url IS NOT NULL AND image_url <> '' AND image_variants IS NULL"
+    );
+    for (const row of rows) {
+        const filePath = path.join(PRODUCTS_DIR, path.basename(row.image_url));
+        try {
+            const image = await storeProductImage(filePath, true);
+            await pool.query(
+                'UPDATE products SET image_url = ?, image_variants = ? WHERE id = ?',
+                [image.imageUrl, JSON.stringify(image.variants), binId(row.id)]
+            );
+        } catch (error) {
+            console.error(`Thumbnail backfill failed for product ${row.id}:`, error);
+            // Missing or unreadable source: mark it done (no variants) so it is not retried on every boot
+            await pool.query("UPDATE products SET image_variants = '{}' WHERE id = ?", [binId(row.id)]).catch(() => {});
+        }
+    }
+    if (rows.length > 0) {
+        console.log(`🖼️ Generated thumbnails for ${rows.length} product image(s)`);
+        await invalidate('products');
+        publish('REFRESH', { resource: 'products' });
+    }
+}
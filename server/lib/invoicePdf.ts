@@ -0,0 +1,194 @@
+import fs from 'fs';
+import path from 'path';
+import type { RowDataPacket } from 'mysql2';
+import pool from '../db.js';
+import { binIds } from './ids.js';
+import { formatCurrency, formatDate, numberToArabicWords } from '../shared/invoiceText.js';
+
+const TEMPLATE_DIR = process.env.INVOICE_TEMPLATE_DIR || 'templates';
+const LOGO_PATH = process.env.INVOICE_LOGO_PATH || '../iHOME-LOGO-ROFILE@4x.png';
+const CONCURRENCY = Math.max(1, parseInt(process.env.PDF_CONCURRENCY || '2'));
+
+export type InvoiceTemplate = 'standard' | 'detailed';
+
+// ---- Template -------------------------------------------------------------
+
+function escapeHtml(value: unknown) {
+    return String(value ?? '').replace(/[&<>"']/g, c => `&#${c.charCodeAt(0)};`);
+}
+
+// Split the template once into static parts and slots: {{name}} is escaped,
+// {{{name}}} is inserted as-is. Rendering is then a single join.
+function compileTemplate(source: string) {
+    const parts: string[] = [];
+    const slots: { key: string; raw: boolean }[] = [];
+    const pattern = /\{\{\{(\w+)\}\}\}|\{\{(\w+)\}\}/g;
+    let last = 0;
+    for (let match; (match = pattern.exec(source));) {
+        parts.push(source.slice(last, match.index));
+        slots.push({ key: match[1] || match[2], raw: Boolean(match[1]) });
+        last = pattern.lastIndex;
+    }
+    parts.push(source.slice(last));
+
+    return (data: Record<string, unknown>) => {
+        let out = parts[0];
+        for (let i = 0; i < slots.length; i++) {
+            const value = data[slots[i].key];
+            out += (slots[i].raw ? String(value ?? '') : escapeHtml(value)) + parts[i + 1];
+        }
+        return out;
+    };
+}
+
+// Template, stylesheet and logo are read and compiled once per process
+let assets: Promise<{ render: ReturnType<typeof compileTemplate>; styles: string; logo: string }> | undefined;
+
+function loadAssets() {
+    assets ??= (async () => {
+        const [html, styles, logo] = await Promise.all([
+            fs.promises.readFile(path.join(TEMPLATE_DIR, 'invoice.html'), 'utf8'),
+            fs.promises.readFile(path.join(TEMPLATE_DIR, 'invoice.css'), 'utf8'),
+            fs.promises.readFile(LOGO_PATH),
+        ]);
+        return { render: compileTemplate(html), styles, logo: `data:image/png;base64,${logo.toString('base64')}` };
+    })().catch((error) => {
+        assets = undefined;
+        throw error;
+    });
+    return assets;
+}
+
+export async function renderInvoiceHtml(invoice: RowDataPacket, items: RowDataPacket[], template: InvoiceTemplate) {
+    const { render, styles, logo } = await loadAssets();
+    const detailed = template === 'detailed';
+
+    const rows = items.map((item, index) => `
+                        <tr>
+                            <td class="col-num">${index + 1}</td>
+                            <td class="col-img"><div class="product-thumb"></div></td>
+                            <td class="col-product"><strong>${escapeHtml(item.product_name)}</strong></td>
+                            <td class="col-price ltr">${formatCurrency(item.unit_price)}</td>
+                            <td class="col-qty">${item.quantity}</td>
+                            ${detailed ? '<td class="col-discount ltr" style="color: var(--color-error-400)">-</td>' : ''}
+                            <td class="col-total ltr">${formatCurrency(item.total)}</td>
+                        </tr>`).join('');
+
+    const discount = Number(invoice.discount) || 0;
+
+    return render({
+        styles,
+        logo,
+        invoiceNumber: invoice.invoice_number,
+        customerName: invoice.customer_name || '-',
+        customerPhone: invoice.customer_phone || '-',
+        customerAddress: invoice.customer_address || '-',
+        date: formatDate(invoice.created_at),
+        dueDate: '-',
+        status: invoice.status,
+        statusLabel: invoice.status === 'paid' ? 'مدفوع ✓' : 'غير مدفوع',
+        discountHeader: detailed ? '<th class="col-discount">الخصم</th>' : '',
+        rows,
+        subtotal: formatCurrency(invoice.subtotal),
+        discountRow: discount > 0
+            ? `<div class="total-row discount"><span class="total-label">الخصم:</span><span class="total-value ltr">- ${formatCurrency(discount)}</span></div>`
+            : '',
+        total: formatCurrency(invoice.total),
+        totalInWords: numberToArabicWords(Number(invoice.total) || 0),
+    });
+}
+
+// ---- Renderer ------------------------------------------------------------
+
+// puppeteer is optional; one headless browser is shared by all requests and
+// relaunched if it dies
+let browser: Promise<any> | undefined;
+
+async function getBrowser() {
+    browser ??= import('puppeteer')
+        .then(m => m.default.launch({ headless: true, args: ['--no-sandbox', '--font-render-hinting=none'] }))
+        .then((instance) => {
+            instance.on('disconnected', () => {
+                browser = undefined;
+            });
+            return instance;
+        })
+        .catch((error) => {
+            browser = undefined;
+            throw error;
+        });
+    return browser;
+}
+
+export async function pdfRendererAvailable() {
+    try {
+        await import('puppeteer');
+        return true;
+    } catch {
+        return false;
+    }
+}
+
+// Bound concurrent pages so a batch run cannot exhaust memory
+let active = 0;
+const waiting: (() => void)[] = [];
+
+async function withPageSlot<T>(work: () => Promise<T>) {
+    if (active >= CONCURRENCY) {
+        await new Promise<void>(resolve => waiting.push(resolve));
+    }
+    active++;
+    try {
+        return await work();
+    } finally {
+        active--;
+        waiting.shift()?.();
+    }
+}
+
+export async function renderPdf(html: string): Promise<Buffer> {
+    return withPageSlot(async () => {
+        const page = await (await getBrowser()).newPage();
+        try {
+            await page.setContent(html, { waitUntil: 'load' });
+            return Buffer.from(await page.pdf({ format: 'A4', printBackground: true, preferCSSPageSize: true }));
+        } finally {
+            await page.close().catch(() => {});
+        }
+    });
+}
+
+// ---- Data ----------------------------------------------------------------
+
+// Invoices with their items and customer address, in the order of `ids`
+export async function loadInvoicesForPdf(ids: string[]) {
+    if (ids.length === 0) return [];
+
+    const [invoices] = await pool.query<RowDataPacket[]>(
+        `SELECT i.*, c.address AS customer_address
+         FROM invoices i
+         LEFT JOIN customers c ON c.id = i.customer_id
+         WHERE i.id IN (?)`,
+        [binIds(ids)]
+    );
+    const [items] = await pool.query<RowDataPacket[]>(
+        'SELECT * FROM invoice_items WHERE invoice_id IN (?) ORDER BY invoice_id',
+        [binIds(ids)]
+    );
+
+    const itemsByInvoice = new Map<string, RowDataPacket[]>();
+    for (const item of items) {
+        itemsByInvoice.set(item.invoice_id, [...(itemsByInvoice.get(item.invoice_id) || []), item]);
+    }
+    const byId = new Map(invoices.map(i => [i.id as string, i]));
+
+    return ids.filter(id => byId.has(id)).map(id => ({ invoice: byId.get(id)!, items: itemsByInvoice.get(id) || [] }));
+}
+
+export async function renderInvoicePdf(invoice: RowDataPacket, items: RowDataPacket[], template: InvoiceTemplate) {
+    return renderPdf(await renderInvoiceHtml(invoice, items, template));
+}
+
+export function pdfFileName(invoice: RowDataPacket) {
+    return `Invoice-${String(invoice.invoice_number).replace(/[^\w.-]+/g, '_')}.pdf`;
+}
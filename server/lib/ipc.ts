@@ -0,0 +1,54 @@
+import cluster from 'cluster';
+
+// Process-wide notifications in cluster mode (see cluster.ts). A worker's
+// broadcast goes to the primary, which relays it to every other worker; the
+// sender has already applied it locally. Outside a cluster these are no-ops.
+
+const TYPE = 'ihome:broadcast';
+// Sent by the primary to a worker it wants to retire gracefully
+export const SHUTDOWN_MESSAGE = 'ihome:shutdown';
+// Sent by a worker once it is warmed up and ready for traffic
+export const READY_MESSAGE = 'ihome:ready';
+
+interface BroadcastMessage {
+    type: typeof TYPE;
+    topic: string;
+    data: unknown;
+}
+
+const handlers = new Map<string, ((data: any) => void)[]>();
+
+function isBroadcast(message: unknown): message is BroadcastMessage {
+    return (message as BroadcastMessage)?.type === TYPE;
+}
+
+export function broadcast(topic: string, data: unknown) {
+    if (cluster.isWorker && process.connected) {
+        process.send!({ type: TYPE, topic, data } satisfies BroadcastMessage);
+    }
+}
+
+export function onBroadcast<T>(topic: string, handler: (data: T) => void) {
+    handlers.set(topic, [...(handlers.get(topic) || []), handler]);
+}
+
+if (cluster.isWorker) {
+    process.on('message', (message) => {
+        if (!isBroadcast(message)) return;
+        for (const handler of handlers.get(message.topic) || []) {
+            handler(message.data);
+        }
+    });
+}
+
+// Primary side
+export function relayBroadcasts() {
+    cluster.on('message', (sender, message) => {
+        if (!isBroadcast(message)) return;
+        for (const worker of Object.values(cluster.workers || {})) {
+            if (worker && worker !== sender && worker.isConnected()) {
+                worker.send(message);
+            }
+        }
+    });
+}
@@ -0,0 +1,339 @@
+import fs from 'fs';
+import path from 'path';
+import { Readable, pipeline as pipeStreams } from 'stream';
+import { pipeline } from 'stream/promises';
+import csv from 'csv-parser';
+import { v4 as uuidv4 } from 'uuid';
+import { newId, binId } from './ids.js';
+import type { PoolConnection } from 'mysql2/promise';
+import type { RowDataPacket, ResultSetHeader } from 'mysql2';
+import pool from '../db.js';
+
+// Counters an importer reports back (inserted, updated, ...); summed per job
+export type ImportStats = Record<string, number>;
+
+// An importer turns parsed CSV rows into units that must be written together
+// (a single row, or every row of one purchase invoice) and writes a batch of them.
+// Importers that ingest the file in bulk implement `file` instead.
+export interface Importer<T = any> {
+    group?: (rows: any[]) => T[];
+    size?: (unit: T) => number; // CSV rows covered by one unit
+    label?: (unit: T, index: number) => string;
+    apply?: (connection: PoolConnection, units: T[]) => Promise<ImportStats | void>;
+    file?: (filePath: string) => Promise<{ rows: number; failed?: number; stats?: ImportStats }>;
+    done?: () => void | Promise<void>;
+}
+
+const BATCH_SIZE = Math.max(1, parseInt(process.env.IMPORT_BATCH_SIZE || '500'));
+const MAX_ERRORS = 100;
+const TEMP_DIR = 'public/uploads/temp';
+
+const importers = new Map<string, Importer>();
+const queue: string[] = [];
+let draining: Promise<void> | null = null;
+// Imports executing on this process, streamed or from disk
+const running = new Set<Promise<void>>();
+
+export function registerImporter<T>(type: string, importer: Importer<T>) {
+    importers.set(type, importer);
+}
+
+// Start an import from an upload that is still arriving. The job row is created
+// first and reported through `created`, so the request can be answered with its
+// id right away. Row importers parse and commit batches as bytes come in; bulk
+// `file` importers (LOAD DATA) need the whole file, so the stream is written to
+// a temp file and queued as usual. Resolves once the upload has been consumed.
+// A failed upload (over the size limit, corrupt gzip) fails the job.
+export async function startStreamingImport(type: string, input: Readable, created?: (id: string) => void) {
+    const importer = importers.get(type);
+    if (!importer) {
+        throw new Error(`Unknown import type: ${type}`);
+    }
+
+    const id = newId();
+    await pool.query(
+        "INSERT INTO import_jobs (id, type, status, message, started_at) VALUES (?, ?, 'running', ?, CURRENT_TIMESTAMP)",
+        [binId(id), type, importer.file ? 'Receiving upload' : null]
+    );
+    created?.(id);
+
+    if (!importer.file) {
+        await execute(id, importer, progress => importRecords(id, importer, parseCsv(input), progress));
+        return id;
+    }
+
+    await fs.promises.mkdir(TEMP_DIR, { recursive: true });
+    const filePath = path.join(TEMP_DIR, `${Date.now()}-${uuidv4()}.csv`);
+    try {
+        await pipeline(input, fs.createWriteStream(filePath));
+    } catch (error) {
+        fs.promises.unlink(filePath).catch(() => {});
+        await pool.query(
+            "UPDATE import_jobs SET status = 'failed', message = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+            [`Upload failed: ${errorMessage(error)}`.slice(0, 255), binId(id)]
+        ).catch(() => {});
+        throw error;
+    }
+
+    await pool.query(
+        "UPDATE import_jobs SET status = 'queued', file_path = ?, message = NULL, started_at = NULL WHERE id = ?",
+        [filePath, binId(id)]
+    );
+    queue.push(id);
+    setImmediate(drain);
+    return id;
+}
+
+// On a cold start (once per cluster): jobs cut off mid-run keep their committed
+// batches and are marked failed, since re-running them would duplicate rows
+export async function failInterruptedImports() {
+    await pool.query(
+        "UPDATE import_jobs SET status = 'failed', message = 'Interrupted by server restart', finished_at = CURRENT_TIMESTAMP WHERE status = 'running'"
+    );
+}
+
+// Pick up queued jobs. Jobs are claimed atomically when they start, so this is
+// safe to run while other processes are draining their own queues.
+export async function resumeImportJobs() {
+    const [rows] = await pool.query<RowDataPacket[]>("SELECT id FROM import_jobs WHERE status = 'queued' ORDER BY created_at");
+    queue.push(...rows.map(r => r.id));
+    setImmediate(drain);
+}
+
+export async function getJob(id: string) {
+    const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM import_jobs WHERE id = ?', [binId(id)]);
+    return rows.length > 0 ? mapJob(rows[0]) : null;
+}
+
+export async function listJobs(limit = 20) {
+    const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM import_jobs ORDER BY created_at DESC LIMIT ?', [limit]);
+    return rows.map(mapJob);
+}
+
+function mapJob(job: RowDataPacket) {
+    const started = job.started_at ? new Date(job.started_at).getTime() : null;
+    const finished = job.finished_at ? new Date(job.finished_at).getTime() : Date.now();
+    const seconds = started ? Math.max((finished - started) / 1000, 1) : null;
+
+    return {
+        id: job.id,
+        type: job.type,
+        status: job.status,
+        totalRows: job.total_rows,
+        processedRows: job.processed_rows,
+        failedRows: job.failed_rows,
+        errors: typeof job.errors === 'string' ? JSON.parse(job.errors) : job.errors || [],
+        stats: typeof job.stats === 'string' ? JSON.parse(job.stats) : job.stats || {},
+        message: job.message,
+        rowsPerSecond: seconds ? Math.round((job.processed_rows + job.failed_rows) / seconds) : 0,
+        startedAt: job.started_at,
+        finishedAt: job.finished_at,
+        createdAt: job.created_at,
+    };
+}
+
+// Jobs run one at a time so imports never compete with each other for the pool.
+// Nothing awaits the drain, so a job whose own bookkeeping fails (pool
+// exhausted, connection lost) is marked failed and the queue carries on.
+function drain() {
+    draining ??= (async () => {
+        try {
+            while (queue.length > 0) {
+                const id = queue.shift()!;
+                try {
+                    await runJob(id);
+                } catch (error) {
+                    console.error(`Import job ${id} failed:`, error);
+                    await pool.query(
+                        "UPDATE import_jobs SET status = 'failed', message = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ? AND status IN ('queued', 'running')",
+                        [errorMessage(error).slice(0, 255), binId(id)]
+                    ).catch(() => {});
+                }
+            }
+        } finally {
+            draining = null;
+        }
+    })();
+    return draining;
+}
+
+// Resolves once this process has no queued or running imports (graceful shutdown)
+export async function settleImports() {
+    while (draining || running.size > 0) {
+        await Promise.allSettled([draining, ...running]);
+    }
+}
+
+async function inTransaction<R>(work: (connection: PoolConnection) => Promise<R>) {
+    const connection = await pool.getConnection();
+    try {
+        await connection.beginTransaction();
+        const result = await work(connection);
+        await connection.commit();
+        return result;
+    } catch (error) {
+        await connection.rollback();
+        throw error;
+    } finally {
+        connection.release();
+    }
+}
+
+// CSV records from a byte stream; a failing source (e.g. corrupt gzip) fails the iteration
+function parseCsv(input: Readable): AsyncIterable<any> {
+    return pipeStreams(input, csv(), () => {});
+}
+
+function errorMessage(error: unknown) {
+    return error instanceof Error ? error.message : String(error);
+}
+
+interface Progress {
+    total: number;
+    processed: number;
+    failed: number;
+    errors: { row: string; error: string }[];
+    stats: ImportStats;
+}
+
+function addStats(progress: Progress, counts: ImportStats | void) {
+    for (const [key, value] of Object.entries(counts || {})) {
+        progress.stats[key] = (progress.stats[key] || 0) + value;
+    }
+}
+
+// Feed parsed CSV records through the importer in batches, saving progress
+// after each one. Ungrouped imports commit while records are still arriving.
+async function importRecords(id: string, importer: Importer, records: AsyncIterable<any>, progress: Progress) {
+    const apply = importer.apply!;
+    const size = importer.size || (() => 1);
+    // Row numbers match the spreadsheet: line 1 is the header
+    const label = importer.label || ((_: unknown, index: number) => `Row ${index + 2}`);
+
+    const writeBatch = async (batch: any[], offset: number) => {
+        try {
+            addStats(progress, await inTransaction(connection => apply(connection, batch)));
+            progress.processed += batch.reduce((sum, unit) => sum + size(unit), 0);
+        } catch {
+            // Retry the batch one unit at a time so only the bad rows are lost
+            for (let i = 0; i < batch.length; i++) {
+                try {
+                    addStats(progress, await inTransaction(connection => apply(connection, [batch[i]])));
+                    progress.processed += size(batch[i]);
+                } catch (error) {
+                    progress.failed += size(batch[i]);
+                    if (progress.errors.length < MAX_ERRORS) {
+                        progress.errors.push({ row: label(batch[i], offset + i), error: errorMessage(error) });
+                    }
+                }
+            }
+        }
+
+        await pool.query(
+            'UPDATE import_jobs SET total_rows = ?, processed_rows = ?, failed_rows = ?, errors = ?, stats = ? WHERE id = ?',
+            [progress.total, progress.processed, progress.failed, JSON.stringify(progress.errors), JSON.stringify(progress.stats), binId(id)]
+        );
+    };
+
+    if (importer.group) {
+        // Grouped units (e.g. one purchase invoice) may span the whole file
+        const rows: any[] = [];
+        for await (const row of records) {
+            rows.push(row);
+        }
+        progress.total = rows.length;
+        const units = importer.group(rows);
+        for (let start = 0; start < units.length; start += BATCH_SIZE) {
+            await writeBatch(units.slice(start, start + BATCH_SIZE), start);
+        }
+        return;
+    }
+
+    let batch: any[] = [];
+    for await (const row of records) {
+        progress.total++;
+        batch.push(row);
+        if (batch.length >= BATCH_SIZE) {
+            await writeBatch(batch, progress.total - batch.length);
+            batch = [];
+        }
+    }
+    if (batch.length > 0) {
+        await writeBatch(batch, progress.total - batch.length);
+    }
+}
+
+// Run one job to completion and record its outcome. Batches committed before
+// a failure stay committed, so the completion hook runs whenever rows landed.
+function execute(id: string, importer: Importer, work: (progress: Progress) => Promise<void>) {
+    const job = executeJob(id, importer, work);
+    running.add(job);
+    job.finally(() => running.delete(job));
+    return job;
+}
+
+async function executeJob(id: string, importer: Importer, work: (progress: Progress) => Promise<void>) {
+    const progress: Progress = { total: 0, processed: 0, failed: 0, errors: [], stats: {} };
+
+    try {
+        await work(progress);
+        await pool.query(
+            "UPDATE import_jobs SET status = 'completed', total_rows = ?, processed_rows = ?, failed_rows = ?, errors = ?, stats = ?, message = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+            [progress.total, progress.processed, progress.failed, JSON.stringify(progress.errors), JSON.stringify(progress.stats),
+                `Imported ${progress.processed} of ${progress.total} rows`, binId(id)]
+        );
+    } catch (error) {
+        console.error(`Import job ${id} failed:`, error);
+        await pool.query(
+            "UPDATE import_jobs SET status = 'failed', message = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+            [errorMessage(error).slice(0, 255), binId(id)]
+        ).catch(() => {});
+    } finally {
+        if (progress.processed > 0) {
+            try {
+                await importer.done?.();
+            } catch (error) {
+                console.error('Import completion hook failed:', error);
+            }
+        }
+    }
+}
+
+async function runJob(id: string) {
+    const [jobs] = await pool.query<RowDataPacket[]>('SELECT type, file_path FROM import_jobs WHERE id = ?', [binId(id)]);
+    if (jobs.length === 0) return;
+
+    const { type, file_path: filePath } = jobs[0];
+    const importer = importers.get(type);
+
+    // Another process may have started it already
+    const [claimed] = await pool.query<ResultSetHeader>(
+        "UPDATE import_jobs SET status = 'running', started_at = CURRENT_TIMESTAMP WHERE id = ? AND status = 'queued'",
+        [binId(id)]
+    );
+    if (claimed.affectedRows === 0) return;
+
+    try {
+        if (!importer) {
+            console.error(`Import job ${id} has unknown type: ${type}`);
+            await pool.query(
+                "UPDATE import_jobs SET status = 'failed', message = 'Unknown import type', finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+                [binId(id)]
+            );
+            return;
+        }
+        await execute(id, importer, async (progress) => {
+            if (importer.file) {
+                const result = await importer.file(filePath);
+                progress.total = result.rows;
+                progress.failed = result.failed || 0;
+                progress.processed = result.rows - progress.failed;
+                addStats(progress, result.stats);
+            } else {
+                await importRecords(id, importer, parseCsv(fs.createReadStream(filePath)), progress);
+            }
+        });
+    } finally {
+        fs.promises.unlink(filePath).catch(() => {});
+    }
+}
@@ -0,0 +1,161 @@
+import type { Response } from 'express';
+import type { Readable } from 'stream';
+import { StringDecoder } from 'string_decoder';
+import type { Pool } from 'mysql2/promise';
+import pool from '../db.js';
+
+// Rows are buffered into chunks of roughly this size before hitting the socket
+const FLUSH_BYTES = 16 * 1024;
+
+// Stream result rows straight from mysql2 instead of materializing the whole set
+export function streamRows(sql: string, params: unknown[] = [], source: Pool = pool): Readable {
+    return source.pool.query(sql, params).stream({ highWaterMark: 256 });
+}
+
+function drained(res: Response) {
+    return new Promise<void>((resolve) => {
+        const done = () => {
+            res.off('drain', done);
+            res.off('close', done);
+            resolve();
+        };
+        res.on('drain', done);
+        res.on('close', done);
+    });
+}
+
+// Write an async sequence as a JSON array, respecting socket backpressure so
+// memory use stays flat and the first bytes go out before the last row is read.
+export async function streamJsonArray<T>(res: Response, items: AsyncIterable<T>, map?: (item: T) => unknown) {
+    let buffer = '[';
+    let first = true;
+
+    try {
+        for await (const item of items) {
+            buffer += (first ? '' : ',') + JSON.stringify(map ? map(item) : item);
+            first = false;
+
+            if (buffer.length >= FLUSH_BYTES) {
+                if (!res.headersSent) {
+                    res.type('json');
+                }
+                const ok = res.write(buffer);
+                buffer = '';
+                if (!ok) await drained(res);
+                // Client went away; leaving the loop destroys the row stream
+                if (res.destroyed) return;
+            }
+        }
+    } catch (error) {
+        // Before the first chunk the caller can still answer with an error status
+        if (!res.headersSent) throw error;
+        console.error('Error while streaming response:', error);
+        res.destroy();
+        return;
+    }
+
+    if (!res.headersSent) {
+        res.type('json');
+    }
+    res.end(buffer + ']');
+}
+
+export interface TableRows {
+    table: string;
+    rows: Record<string, unknown>[];
+}
+
+const WHITESPACE = ' \t\n\r';
+
+// Read JSON shaped { "table": [ {row}, ... ], ... } (database backups) as it
+// arrives. Each table is announced with an empty batch, then its rows follow in
+// batches of up to `batchSize`; every row is parsed on its own, so memory stays
+// bounded by a batch whatever the file size. Malformed input throws a SyntaxError.
+export async function* parseJsonTables(input: AsyncIterable<Buffer | string>, batchSize = 500): AsyncGenerator<TableRows> {
+    const decoder = new StringDecoder('utf8');
+    let state: 'start' | 'firstKey' | 'key' | 'keyText' | 'colon' | 'array' | 'firstRow' | 'row' | 'rowText' | 'afterRow' | 'afterTable' | 'end' = 'start';
+    // Text of the key or row being read, carried over between chunks
+    let token = '';
+    let depth = 0;
+    let inString = false;
+    let escaped = false;
+    let table = '';
+    let rows: Record<string, unknown>[] = [];
+
+    const unexpected = (c: string) => new SyntaxError(`Unexpected ${JSON.stringify(c)} in JSON backup`);
+
+    for await (const chunk of input) {
+        const text = typeof chunk === 'string' ? chunk : decoder.write(chunk);
+        let from = 0;
+        for (let i = 0; i < text.length; i++) {
+            const c = text[i];
+
+            if (state === 'keyText' || state === 'rowText') {
+                if (escaped) {
+                    escaped = false;
+                } else if (c === '\\') {
+                    escaped = inString;
+                } else if (c === '"') {
+                    if (state === 'keyText') {
+                        table = JSON.parse(`"${token}${text.slice(from, i)}"`);
+                        token = '';
+                        state = 'colon';
+                    } else {
+                        inString = !inString;
+                    }
+                } else if (!inString && (c === '{' || c === '[')) {
+                    depth++;
+                } else if (!inString && (c === '}' || c === ']') && --depth === 0) {
+                    rows.push(JSON.parse(token + text.slice(from, i + 1)));
+                    token = '';
+                    state = 'afterRow';
+                    if (rows.length >= batchSize) {
+                        yield { table, rows };
+                        rows = [];
+                    }
+                }
+                continue;
+            }
+
+            if (WHITESPACE.includes(c)) continue;
+            if (state === 'start' && c === '{') {
+                state = 'firstKey';
+            } else if ((state === 'firstKey' || state === 'key') && c === '"') {
+                state = 'keyText';
+                inString = true;
+                from = i + 1;
+            } else if (state === 'firstKey' && c === '}') {
+                state = 'end';
+            } else if (state === 'colon' && c === ':') {
+                state = 'array';
+            } else if (state === 'array' && c === '[') {
+                yield { table, rows: [] };
+                state = 'firstRow';
+            } else if ((state === 'firstRow' || state === 'row') && c === '{') {
+                state = 'rowText';
+                depth = 1;
+                inString = false;
+                from = i;
+            } else if ((state === 'firstRow' || state === 'afterRow') && c === ']') {
+                if (rows.length > 0) yield { table, rows };
+                rows = [];
+                state = 'afterTable';
+            } else if (state === 'afterRow' && c === ',') {
+                state = 'row';
+            } else if (state === 'afterTable' && c === ',') {
+                state = 'key';
+            } else if (state === 'afterTable' && c === '}') {
+                state = 'end';
+            } else {
+                throw unexpected(c);
+            }
+        }
+        if (state === 'keyText' || state === 'rowText') {
+            token += text.slice(from);
+        }
+    }
+
+    if (state !== 'end') {
+        throw new SyntaxError('Unexpected end of JSON backup');
+    }
+}
@@ -0,0 +1,99 @@
+import client from 'prom-client';
+import type { Request, Response, NextFunction } from 'express';
+import pool, { readPool } from '../db.js';
+import { cacheStats } from './cache.js';
+import { onQuery } from './queryTrace.js';
+
+// Prometheus text exposition of request, database and process metrics at GET /api/metrics
+
+// The global registry, so the cluster primary can aggregate it across workers
+export const registry = client.register;
+
+// Heap, GC, event loop lag (nodejs_eventloop_lag_*), handles, CPU
+client.collectDefaultMetrics({ register: registry, eventLoopMonitoringPrecision: 20 });
+
+const LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+
+const httpDuration = new client.Histogram({
+    name: 'http_request_duration_seconds',
+    help: 'HTTP request latency by route and status (the _count series is the request count)',
+    labelNames: ['method', 'route', 'status'] as const,
+    buckets: LATENCY_BUCKETS,
+    registers: [registry],
+});
+
+const queryDuration = new client.Histogram({
+    name: 'db_query_duration_seconds',
+    help: 'MySQL statement latency by operation and first table',
+    labelNames: ['operation', 'table'] as const,
+    buckets: [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5],
+    registers: [registry],
+});
+
+const queryErrors = new client.Counter({
+    name: 'db_query_errors_total',
+    help: 'MySQL statements that returned an error',
+    labelNames: ['operation', 'table'] as const,
+    registers: [registry],
+});
+
+// Read from the mysql2 core pool when scraped
+new client.Gauge({
+    name: 'db_pool_connections',
+    help: 'Connections in the MySQL pool by state',
+    labelNames: ['pool', 'state'] as const,
+    registers: [registry],
+    collect() {
+        const pools = readPool === pool ? { primary: pool } : { primary: pool, replica: readPool };
+        for (const [name, source] of Object.entries(pools)) {
+            const core = source.pool as any;
+            const all = core._allConnections?.length ?? 0;
+            const idle = core._freeConnections?.length ?? 0;
+            this.set({ pool: name, state: 'active' }, all - idle);
+            this.set({ pool: name, state: 'idle' }, idle);
+            this.set({ pool: name, state: 'queued' }, core._connectionQueue?.length ?? 0);
+            this.set({ pool: name, state: 'limit' }, core.config?.connectionLimit ?? 0);
+        }
+    },
+});
+
+new client.Gauge({
+    name: 'app_cache_operations',
+    help: 'Response cache lookups and writes by resource since start',
+    labelNames: ['resource', 'result'] as const,
+    registers: [registry],
+    async collect() {
+        const { resources } = await cacheStats();
+        for (const [resource, counts] of Object.entries(resources)) {
+            for (const [result, value] of Object.entries(counts)) {
+                this.set({ resource, result }, value);
+            }
+        }
+    },
+});
+
+// ---- Requests --------------------------------------------------------------
+
+// Label by the matched route pattern (never the raw URL) to keep cardinality bounded
+export function requestMetrics(req: Request, res: Response, next: NextFunction) {
+    const start = process.hrtime.bigint();
+    res.once('finish', () => {
+        const route = req.route ? `${req.baseUrl}${req.route.path}` : 'unmatched';
+        httpDuration.observe(
+            { method: req.method, route, status: String(res.statusCode) },
+            Number(process.hrtime.bigint() - start) / 1e9
+        );
+    });
+    next();
+}
+
+// ---- Queries ---------------------------------------------------------------
+
+onQuery(({ operation, table, durationMs, failed }) => {
+    queryDuration.observe({ operation, table }, durationMs / 1000);
+    if (failed) queryErrors.inc({ operation, table });
+});
+
+export async function metricsHandler(req: Request, res: Response) {
+    res.type(registry.contentType).send(await registry.metrics());
+}
@@ -0,0 +1,237 @@
+import fs from 'fs';
+import readline from 'readline';
+import { newId, binId, NEW_ID_SQL } from './ids.js';
+import type { PoolConnection } from 'mysql2/promise';
+import type { RowDataPacket, ResultSetHeader } from 'mysql2';
+import pool from '../db.js';
+import { recordMovements, type StockMovement } from './stock.js';
+
+// CSV columns understood by the product import
+const COLUMNS = ['name', 'sku', 'category', 'price', 'costPrice', 'quantity', 'description'];
+
+function money(value: unknown) {
+    return Math.round((parseFloat(String(value)) || 0) * 100) / 100;
+}
+
+function present(value: unknown) {
+    return value !== undefined && value !== null && String(value).trim() !== '';
+}
+
+// Upsert one batch of CSV rows keyed by SKU with a single multi-row
+// INSERT ... ON DUPLICATE KEY UPDATE. Catalog fields are overwritten only where the
+// CSV has a value; quantity is used as opening stock for new products only,
+// since stock on existing products is owned by the ledger.
+export async function upsertProducts(connection: PoolConnection, rows: any[]) {
+    // Last occurrence of a SKU in the batch wins; rows without a SKU always insert
+    const bySku = new Map<string, any>();
+    const unkeyed: any[] = [];
+    for (const row of rows) {
+        const sku = String(row.sku ?? '').trim();
+        if (sku) {
+            bySku.set(sku, { ...row, sku });
+        } else {
+            unkeyed.push({ ...row, sku: null });
+        }
+    }
+
+    const skus = [...bySku.keys()];
+    const [existing] = skus.length > 0
+        ? await connection.query<RowDataPacket[]>(
+            'SELECT id, sku, name, category, price, cost, description FROM products WHERE sku IN (?) FOR UPDATE',
+            [skus]
+        )
+        : [[] as RowDataPacket[]];
+    const current = new Map(existing.map(p => [p.sku as string, p]));
+
+    const values: unknown[][] = [];
+    const movements: StockMovement[] = [];
+    let inserted = 0;
+    let updated = 0;
+    let unchanged = 0;
+
+    for (const row of [...bySku.values(), ...unkeyed]) {
+        const product = row.sku ? current.get(row.sku) : undefined;
+
+        if (product) {
+            const next = {
+                name: present(row.name) ? String(row.name) : product.name,
+                category: present(row.category) ? String(row.category) : product.category,
+                price: present(row.price) ? money(row.price) : Number(product.price),
+                cost: present(row.costPrice) ? money(row.costPrice) : Number(product.cost),
+                description: present(row.description) ? String(row.description) : product.description,
+            };
+            if (next.name === product.name && next.category === product.category && next.price === Number(product.price)
+                && next.cost === Number(product.cost) && next.description === product.description) {
+                unchanged++;
+                continue;
+            }
+            values.push([binId(product.id), next.name, row.sku, next.category, next.price, next.cost, 0, next.description]);
+            updated++;
+        } else {
+            const id = newId();
+            values.push([binId(id), row.name, row.sku, row.category || '', money(row.price), money(row.costPrice), 0, row.description || '']);
+            movements.push({ productId: id, type: 'adjustment', quantity: parseInt(row.quantity) || 0, referenceType: 'import', note: 'Imported opening stock' });
+            inserted++;
+        }
+    }
+
+    if (values.length > 0) {
+        await connection.query(
+            `INSERT INTO products (id, name, sku, category, price, cost, quantity, description) VALUES ?
+             ON DUPLICATE KEY UPDATE name = VALUES(name), category = VALUES(category), price = VALUES(price),
+                                     cost = VALUES(cost), description = VALUES(description)`,
+            [values]
+        );
+    }
+    await recordMovements(connection, movements);
+
+    return { inserted, updated, unchanged };
+}
+
+async function readHeader(filePath: string) {
+    const lines = readline.createInterface({ input: fs.createReadStream(filePath), crlfDelay: Infinity });
+    try {
+        for await (const line of lines) {
+            return line.replace(/^\uFEFF/, '');
+        }
+        return '';
+    } finally {
+        lines.close();
+    }
+}
+
+async function usesCrlf(filePath: string) {
+    const handle = await fs.promises.open(filePath, 'r');
+    try {
+        const { buffer, bytesRead } = await handle.read(Buffer.alloc(64 * 1024), 0, 64 * 1024, 0);
+        return buffer.subarray(0, bytesRead).includes('\r\n');
+    } finally {
+        await handle.close();
+    }
+}
+
+// Numeric staging cells (price, cost, quantity) that fit DECIMAL(10, 2); NULL
+// (blank) cells never match NOT REGEXP
+const NUMBER = '^-?[0-9]{1,8}([.][0-9]+)?$';
+
+// Very large catalogs: LOAD DATA LOCAL INFILE into a temporary staging table,
+// then merge set-based in one transaction. Needs local_infile enabled on the server.
+export async function loadProductsFile(filePath: string) {
+    const header = (await readHeader(filePath)).split(',').map(h => h.trim().replace(/^"|"$/g, ''));
+    // Unknown columns are read into a throwaway variable
+    const targets = header.map(h => (COLUMNS.includes(h) ? (h === 'costPrice' ? 'cost' : h) : '@skip'));
+    const lineEnding = (await usesCrlf(filePath)) ? '\r\n' : '\n';
+
+    const connection = await pool.getConnection();
+    try {
+        await connection.query('DROP TEMPORARY TABLE IF EXISTS product_import_staging, product_import_latest');
+        await connection.query(`
+            CREATE TEMPORARY TABLE product_import_staging (
+                line INT AUTO_INCREMENT PRIMARY KEY,
+                product_id BINARY(16),
+                is_new BOOLEAN NOT NULL DEFAULT FALSE,
+                name VARCHAR(255),
+                sku VARCHAR(100),
+                category VARCHAR(100),
+                price VARCHAR(32),
+                cost VARCHAR(32),
+                quantity VARCHAR(32),
+                description TEXT,
+                INDEX (sku)
+            )
+        `);
+
+        const [loaded] = await connection.query<ResultSetHeader>({
+            sql: `LOAD DATA LOCAL INFILE ? INTO TABLE product_import_staging CHARACTER SET utf8mb4
+                  FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+                  LINES TERMINATED BY ? IGNORE 1 LINES (${targets.join(', ')})`,
+            values: [filePath, lineEnding],
+            infileStreamFactory: () => fs.createReadStream(filePath),
+        } as any);
+        const total = loaded.affectedRows;
+
+        await connection.beginTransaction();
+
+        // Normalize, then keep only the last row per SKU
+        await connection.query(`
+            UPDATE product_import_staging
+            SET sku = NULLIF(TRIM(sku), ''), name = NULLIF(TRIM(name), ''), category = NULLIF(category, ''),
+                price = NULLIF(TRIM(price), ''), cost = NULLIF(TRIM(cost), ''), quantity = NULLIF(TRIM(quantity), ''),
+                description = NULLIF(description, '')
+        `);
+        // Non-numeric cells would make the CASTs below fail the whole statement in
+        // strict mode; drop those rows up front and report them as failed, as the
+        // batched import does row by row
+        const [malformed] = await connection.query<ResultSetHeader>(`
+            DELETE FROM product_import_staging
+            WHERE price NOT REGEXP '${NUMBER}' OR cost NOT REGEXP '${NUMBER}' OR quantity NOT REGEXP '${NUMBER}'
+        `);
+        // MySQL cannot open a temporary table twice in one statement, so the
+        // last line per SKU goes through a second temporary table
+        await connection.query(`
+            CREATE TEMPORARY TABLE product_import_latest (sku VARCHAR(100) PRIMARY KEY, line INT NOT NULL)
+            SELECT sku, MAX(line) AS line FROM product_import_staging WHERE sku IS NOT NULL GROUP BY sku
+        `);
+        const [deduped] = await connection.query<ResultSetHeader>(`
+            DELETE s FROM product_import_staging s
+            JOIN product_import_latest last ON last.sku = s.sku AND s.line < last.line
+        `);
+
+        await connection.query(`
+            UPDATE product_import_staging s
+            LEFT JOIN products p ON p.sku = s.sku
+            SET s.product_id = COALESCE(p.id, ${NEW_ID_SQL}), s.is_new = p.id IS NULL
+        `);
+        // New products need a name; those rows are reported as failed
+        const [nameless] = await connection.query<ResultSetHeader>(
+            'DELETE FROM product_import_staging WHERE is_new AND name IS NULL'
+        );
+
+        const [merged] = await connection.query<ResultSetHeader>(`
+            UPDATE products p
+            JOIN product_import_staging s ON s.product_id = p.id AND NOT s.is_new
+            SET p.name = COALESCE(s.name, p.name),
+                p.category = COALESCE(s.category, p.category),
+                p.price = COALESCE(CAST(s.price AS DECIMAL(10, 2)), p.price),
+                p.cost = COALESCE(CAST(s.cost AS DECIMAL(10, 2)), p.cost),
+                p.description = COALESCE(s.description, p.description)
+        `);
+
+        // Opening stock lands in products.quantity and the ledger in the same
+        // transaction, keeping the ledger balance equal to quantity
+        const [inserted] = await connection.query<ResultSetHeader>(`
+            INSERT INTO products (id, name, sku, category, price, cost, quantity, description)
+            SELECT product_id, name, sku, COALESCE(category, ''), COALESCE(CAST(price AS DECIMAL(10, 2)), 0),
+                   COALESCE(CAST(cost AS DECIMAL(10, 2)), 0), COALESCE(CAST(TRUNCATE(CAST(quantity AS DECIMAL(12, 2)), 0) AS SIGNED), 0),
+                   COALESCE(description, '')
+            FROM product_import_staging WHERE is_new
+        `);
+        await connection.query(`
+            INSERT INTO stock_movements (id, product_id, type, quantity, reference_type, note)
+            SELECT ${NEW_ID_SQL}, product_id, 'adjustment', CAST(TRUNCATE(CAST(quantity AS DECIMAL(12, 2)), 0) AS SIGNED), 'import', 'Imported opening stock'
+            FROM product_import_staging
+            WHERE is_new AND COALESCE(CAST(TRUNCATE(CAST(quantity AS DECIMAL(12, 2)), 0) AS SIGNED), 0) <> 0
+        `);
+
+        await connection.commit();
+
+        const matched = merged.affectedRows;
+        const updated = merged.changedRows;
+        return {
+            rows: total,
+            failed: malformed.affectedRows + nameless.affectedRows,
+            stats: {
+                inserted: inserted.affectedRows,
+                updated,
+                unchanged: matched - updated,
+                duplicates: deduped.affectedRows,
+            },
+        };
+    } catch (error) {
+        await connection.rollback();
+        throw error;
+    } finally {
+        await connection.query('DROP TEMPORARY TABLE IF EXISTS product_import_staging, product_import_latest').catch(() => {});
+        connection.release();
+    }
+}
@@ -0,0 +1,153 @@
+import { AsyncLocalStorage, AsyncResource } from 'async_hooks';
+import type { Request, Response, NextFunction } from 'express';
+import type { Pool } from 'mysql2/promise';
+
+const SLOW_QUERY_MS = parseFloat(process.env.SLOW_QUERY_MS || '200');
+// A statement repeated this often within one request is reported as a likely N+1
+const REPEAT_WARN = parseInt(process.env.QUERY_REPEAT_WARN || '10');
+// ...as is a request running more statements than this in total
+const COUNT_WARN = parseInt(process.env.QUERY_COUNT_WARN || '50');
+
+export interface QueryEvent {
+    sql: string;
+    operation: string;
+    table: string;
+    route: string;
+    durationMs: number;
+    rows: number;
+    failed: boolean;
+}
+
+interface RequestTrace {
+    req: Request;
+    queries: number;
+    queryMs: number;
+    statements: Map<string, number>;
+}
+
+const context = new AsyncLocalStorage<RequestTrace>();
+const listeners: ((event: QueryEvent) => void)[] = [];
+
+export function onQuery(listener: (event: QueryEvent) => void) {
+    listeners.push(listener);
+}
+
+function routeOf(req: Request) {
+    return req.route ? `${req.baseUrl}${req.route.path}` : `${req.method} ${req.baseUrl || req.path}`;
+}
+
+// Whitespace collapsed and literals replaced, so identical statements group together
+// and no values end up in the logs
+function fingerprint(sql: string) {
+    return sql
+        .replace(/'(?:[^'\\]|\\.)*'/g, '?')
+        .replace(/\b\d+(\.\d+)?\b/g, '?')
+        .replace(/\(\s*\?(?:\s*,\s*\?)+\s*\)/g, '(?+)')
+        .replace(/\s+/g, ' ')
+        .trim();
+}
+
+function describe(sql: string) {
+    const operation = (/^\s*(\w+)/.exec(sql)?.[1] || 'unknown').toUpperCase();
+    const table = /\b(?:FROM|INTO|UPDATE|TABLE)\s+`?(\w+)/i.exec(sql)?.[1]?.toLowerCase() || 'none';
+    return { operation, table };
+}
+
+function rowCount(result: any) {
+    if (Array.isArray(result)) return result.length;
+    return typeof result?.affectedRows === 'number' ? result.affectedRows : 0;
+}
+
+// ---- Requests --------------------------------------------------------------
+
+// Give each request a trace that its queries report into; likely N+1 patterns
+// are logged when the response finishes
+export function traceRequests(req: Request, res: Response, next: NextFunction) {
+    const trace: RequestTrace = { req, queries: 0, queryMs: 0, statements: new Map() };
+    res.once('finish', () => {
+        let repeated: [string, number] | undefined;
+        for (const entry of trace.statements) {
+            if (!repeated || entry[1] > repeated[1]) repeated = entry;
+        }
+        if (trace.queries > COUNT_WARN || (repeated && repeated[1] >= REPEAT_WARN)) {
+            console.warn(
+                `⚠️ ${routeOf(req)} ran ${trace.queries} queries (${trace.queryMs.toFixed(1)} ms)` +
+                (repeated && repeated[1] > 1 ? `; repeated ${repeated[1]}x: ${repeated[0].slice(0, 200)}` : '')
+            );
+        }
+    });
+    context.run(trace, next);
+}
+
+// ---- Pool ------------------------------------------------------------------
+
+// Every statement is a mysql2 command object that emits 'end' once it has
+// completed, successfully or not; results and errors reach its onResult callback
+function traceCommand(command: any) {
+    if (!command || typeof command.once !== 'function') return command;
+
+    const trace = context.getStore();
+    // mysql2 formats values into the SQL client-side; the fingerprint strips them again
+    const text = typeof command.sql === 'string' ? command.sql : command.query;
+    const sql = fingerprint(typeof text === 'string' ? text : '');
+    const start = process.hrtime.bigint();
+    let rows = 0;
+    let failed = false;
+
+    if (trace) {
+        trace.queries++;
+        trace.statements.set(sql, (trace.statements.get(sql) ?? 0) + 1);
+    }
+
+    const onResult = command.onResult;
+    if (typeof onResult === 'function') {
+        command.onResult = function (this: unknown, error: unknown, result: unknown, ...rest: unknown[]) {
+            if (error) failed = true;
+            rows += rowCount(result);
+            return onResult.call(this, error, result, ...rest);
+        };
+    } else {
+        // Streamed rows
+        command.on('result', () => {
+            rows++;
+        });
+    }
+    command.once('error', () => {
+        failed = true;
+    });
+    command.once('end', () => {
+        const durationMs = Number(process.hrtime.bigint() - start) / 1e6;
+        const route = trace ? routeOf(trace.req) : 'background';
+        if (trace) trace.queryMs += durationMs;
+
+        if (durationMs >= SLOW_QUERY_MS) {
+            console.warn(`🐢 Slow query (${durationMs.toFixed(1)} ms, ${rows} rows) from ${route}: ${sql.slice(0, 500)}`);
+        }
+        const event: QueryEvent = { sql, ...describe(sql), route, durationMs, rows, failed };
+        for (const listener of listeners) listener(event);
+    });
+    return command;
+}
+
+// Trace every statement that goes through the pool: query/execute are wrapped
+// on each connection as it is created, which covers pool.query, transactions
+// and row streams alike without touching call sites
+export function instrumentPool(pool: Pool) {
+    const core = pool.pool as any;
+
+    // A connection handed over from the wait queue would otherwise run the
+    // callback in the async context of whoever released it
+    const getConnection = core.getConnection;
+    core.getConnection = function (this: unknown, cb: (...args: unknown[]) => void) {
+        return getConnection.call(this, AsyncResource.bind(cb));
+    };
+
+    core.on('connection', (connection: any) => {
+        for (const method of ['query', 'execute'] as const) {
+            const original = connection[method];
+            connection[method] = function (this: unknown, ...args: unknown[]) {
+                return traceCommand(original.apply(this, args));
+            };
+        }
+    });
+}
@@ -0,0 +1,94 @@
+import type { PoolConnection } from 'mysql2/promise';
+import type { RowDataPacket, ResultSetHeader } from 'mysql2';
+import pool from '../db.js';
+
+// Server-assigned document numbers, in ERP naming-series notation: parts
+// separated by dots, where YYYY/YY/MM/DD are date parts and a run of #
+// sets the counter width (5 digits when absent). "ACC-SINV-.YYYY.-" gives
+// ACC-SINV-2026-00001, ACC-SINV-2026-00002, ...
+//
+// Each resolved prefix ("ACC-SINV-2026-") has a counter row in
+// document_sequences, bumped inside the caller's transaction: numbers are
+// gap-free (a rollback returns the number) and concurrent checkouts queue on
+// that one row only, never on the invoices table.
+
+export type DocumentKind = 'invoice' | 'quotation' | 'purchase';
+
+const SERIES: Record<DocumentKind, { series: string; table: string }> = {
+    invoice: { series: process.env.INVOICE_SERIES || 'INV-.YYYY.-', table: 'invoices' },
+    quotation: { series: process.env.QUOTATION_SERIES || 'QT-.YYYY.-', table: 'invoices' },
+    purchase: { series: process.env.PURCHASE_SERIES || 'PUR-.YYYY.-', table: 'purchase_invoices' },
+};
+
+const DEFAULT_DIGITS = 5;
+
+export function resolveSeries(series: string, date = new Date()) {
+    const pad = (n: number) => String(n).padStart(2, '0');
+    const parts: Record<string, string> = {
+        YYYY: String(date.getFullYear()),
+        YY: String(date.getFullYear()).slice(-2),
+        MM: pad(date.getMonth() + 1),
+        DD: pad(date.getDate()),
+    };
+
+    let prefix = '';
+    let digits = DEFAULT_DIGITS;
+    for (const part of series.split('.')) {
+        if (/^#+$/.test(part)) {
+            digits = part.length;
+        } else {
+            prefix += parts[part] ?? part;
+        }
+    }
+    return { prefix, digits };
+}
+
+// Highest number already used under a prefix, e.g. by imported ERP history.
+// Only consulted when a prefix gets its counter row; invoice_number is indexed.
+const LAST_USED = 'COALESCE(MAX(CAST(SUBSTRING(invoice_number, ?) AS UNSIGNED)), 0)';
+
+function lastUsedParams(prefix: string) {
+    return [prefix.length + 1, prefix.replace(/[\\%_]/g, c => `\\${c}`) + '%'];
+}
+
+// Prefixes known to have a counter row in this process
+const known = new Set<string>();
+
+// Create a prefix's counter row up front, outside any transaction, so checkouts
+// only ever update an existing row
+async function ensureCounter(table: string, prefix: string) {
+    if (known.has(prefix)) return;
+    await pool.query(
+        `INSERT IGNORE INTO document_sequences (name, value)
+         SELECT ?, ${LAST_USED} FROM ${table} WHERE invoice_number LIKE ?`,
+        [prefix, ...lastUsedParams(prefix)]
+    );
+    known.add(prefix);
+}
+
+// Next number of a document series. Call inside the transaction that inserts the document.
+export async function nextDocumentNumber(connection: PoolConnection, kind: DocumentKind, date = new Date()) {
+    const { series, table } = SERIES[kind];
+    const { prefix, digits } = resolveSeries(series, date);
+    await ensureCounter(table, prefix);
+
+    // LAST_INSERT_ID(expr) hands the new value back in the OK packet, so this
+    // is one round trip that also takes the row lock
+    let [result] = await connection.query<ResultSetHeader>(
+        'UPDATE document_sequences SET value = LAST_INSERT_ID(value + 1) WHERE name = ?',
+        [prefix]
+    );
+    if (result.affectedRows === 0) {
+        // The row went away since (database restore): recreate it in this transaction
+        const [rows] = await connection.query<RowDataPacket[]>(
+            `SELECT ${LAST_USED} AS last FROM ${table} WHERE invoice_number LIKE ?`,
+            lastUsedParams(prefix)
+        );
+        [result] = await connection.query<ResultSetHeader>(
+            `INSERT INTO document_sequences (name, value) VALUES (?, LAST_INSERT_ID(?))
+             ON DUPLICATE KEY UPDATE value = LAST_INSERT_ID(value + 1)`,
+            [prefix, Number(rows[0].last) + 1]
+        );
+    }
+    return prefix + String(result.insertId).padStart(digits, '0');
+}
@@ -0,0 +1,165 @@
+import { newId, binId, binIds, NEW_ID_SQL } from './ids.js';
+import pool from '../db.js';
+import type { PoolConnection } from 'mysql2/promise';
+import type { RowDataPacket } from 'mysql2';
+import { publish } from './events.js';
+import { invalidate } from './cache.js';
+
+export type MovementType = 'purchase' | 'sale' | 'adjustment' | 'return';
+
+export interface StockMovement {
+    productId: string;
+    type: MovementType;
+    quantity: number; // signed: positive adds stock, negative removes it
+    referenceType?: string;
+    referenceId?: string;
+    note?: string;
+}
+
+// Apply per-product deltas with a single UPDATE. Rows are matched through the
+// primary key in id order, so concurrent transactions lock them in the same sequence.
+async function applyDeltas(connection: PoolConnection, deltas: Map<string, number>) {
+    const entries = [...deltas].filter(([, delta]) => delta !== 0).sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0));
+    if (entries.length === 0) return;
+
+    const cases = entries.map(() => 'WHEN ? THEN ?').join(' ');
+    await connection.query(
+        `UPDATE products SET quantity = quantity + CASE id ${cases} END WHERE id IN (?)`,
+        [...entries.flatMap(([id, delta]) => [binId(id), delta]), binIds(entries.map(([id]) => id))]
+    );
+}
+
+// Append movements to the ledger and apply them to products.quantity as
+// relative updates inside the caller's transaction. Returns the touched product ids.
+export async function recordMovements(connection: PoolConnection, movements: StockMovement[]) {
+    const moves = movements.filter(m => m.productId && m.quantity);
+    if (moves.length === 0) return [];
+
+    await connection.query(
+        'INSERT INTO stock_movements (id, product_id, type, quantity, reference_type, reference_id, note) VALUES ?',
+        [moves.map(m => [binId(newId()), binId(m.productId), m.type, m.quantity, m.referenceType || null, binId(m.referenceId), m.note || null])]
+    );
+
+    const deltas = new Map<string, number>();
+    for (const m of moves) {
+        deltas.set(m.productId, (deltas.get(m.productId) || 0) + m.quantity);
+    }
+
+    await applyDeltas(connection, deltas);
+    return [...deltas.keys()];
+}
+
+// Bring the ledger's net effect for one document (invoice, purchase) in line
+// with `target` (productId -> signed quantity). Moves in the document's own
+// direction get `type`; moves against it are recorded as returns.
+export async function syncReferenceMovements(
+    connection: PoolConnection,
+    referenceType: string,
+    referenceId: string,
+    target: Map<string, number>,
+    type: MovementType
+) {
+    const [rows] = await connection.query<RowDataPacket[]>(
+        'SELECT product_id, SUM(quantity) AS quantity FROM stock_movements WHERE reference_type = ? AND reference_id = ? GROUP BY product_id',
+        [referenceType, binId(referenceId)]
+    );
+    const current = new Map<string, number>(rows.map(r => [r.product_id, Number(r.quantity)]));
+
+    const direction = type === 'sale' ? -1 : 1;
+    const moves: StockMovement[] = [];
+    for (const productId of new Set([...current.keys(), ...target.keys()])) {
+        const delta = (target.get(productId) || 0) - (current.get(productId) || 0);
+        if (delta !== 0) {
+            moves.push({
+                productId,
+                type: Math.sign(delta) === direction ? type : 'return',
+                quantity: delta,
+                referenceType,
+                referenceId,
+            });
+        }
+    }
+    return recordMovements(connection, moves);
+}
+
+// Undo whatever a document still contributes to stock (deletes, cancellations).
+// Driven by the ledger, so it is idempotent and ignores items that never moved stock.
+export async function reverseReferenceMovements(
+    connection: PoolConnection,
+    referenceType: string,
+    referenceId: string,
+    type: MovementType
+) {
+    return syncReferenceMovements(connection, referenceType, referenceId, new Map(), type);
+}
+
+// Give every product without ledger history an opening adjustment equal to its
+// current quantity, so the ledger balance matches before anything else is recorded
+export async function seedOpeningBalances(connection: PoolConnection) {
+    await connection.query(`
+        INSERT INTO stock_movements (id, product_id, type, quantity, reference_type, note)
+        SELECT ${NEW_ID_SQL}, p.id, 'adjustment', p.quantity, 'opening', 'Opening balance'
+        FROM products p
+        WHERE p.quantity <> 0
+          AND NOT EXISTS (SELECT 1 FROM stock_movements m WHERE m.product_id = p.id)
+    `);
+}
+
+// Correct products whose quantity drifted from the ledger balance (out-of-band
+// writes, manual SQL). The drift is read in one consistent snapshot and applied
+// relatively, so movements committed in between are preserved.
+export async function reconcileStock() {
+    const [rows] = await pool.query<RowDataPacket[]>(`
+        SELECT p.id, COALESCE(m.balance, 0) - p.quantity AS drift
+        FROM products p
+        LEFT JOIN (SELECT product_id, SUM(quantity) AS balance FROM stock_movements GROUP BY product_id) m
+          ON m.product_id = p.id
+        WHERE COALESCE(m.balance, 0) <> p.quantity
+    `);
+    if (rows.length === 0) return [];
+
+    const connection = await pool.getConnection();
+    try {
+        await connection.beginTransaction();
+        const drift = new Map<string, number>(rows.map(r => [r.id, Number(r.drift)]));
+        await applyDeltas(connection, drift);
+        await connection.commit();
+        return [...drift.keys()];
+    } catch (error) {
+        await connection.rollback();
+        throw error;
+    } finally {
+        connection.release();
+    }
+}
+
+export function startStockReconciliation() {
+    const interval = parseInt(process.env.STOCK_RECONCILE_INTERVAL_MS || '900000');
+    if (!interval) return;
+
+    setInterval(async () => {
+        try {
+            const corrected = await reconcileStock();
+            if (corrected.length > 0) {
+                console.warn(`⚠️ Stock reconciliation corrected ${corrected.length} product(s)`);
+                await publishStockLevels(corrected);
+            }
+        } catch (error) {
+            console.error('Stock reconciliation failed:', error);
+        }
+    }, interval).unref();
+}
+
+// Broadcast the current quantity of each product touched by a committed write
+export async function publishStockLevels(productIds: string[]) {
+    const ids = [...new Set(productIds.filter(Boolean))];
+    if (ids.length === 0) return;
+
+    // Cached product lists include quantities
+    await invalidate('products');
+
+    const [rows] = await pool.query<RowDataPacket[]>('SELECT id, quantity FROM products WHERE id IN (?)', [binIds(ids)]);
+    for (const row of rows) {
+        publish('UPDATE_STOCK', { productId: row.id, quantity: row.quantity });
+    }
+}
@@ -2,29 +2,34 @@ import multer from 'multer';
 import path from 'path';
 import { v4 as uuidv4 } from 'uuid';
 import fs from 'fs';
+import zlib from 'zlib';
+import { PassThrough, Readable } from 'stream';
+import type { Request, Response, NextFunction, RequestHandler } from 'express';
+import { startStreamingImport } from '../lib/jobs.js';
+import { parseJsonTables, type TableRows } from '../lib/jsonStream.js';
 
-// Ensure upload directories exist
-const uploadDirs = [
-    'public/uploads/products',
-    'public/uploads/backups',
-    'public/uploads/temp'
-];
+const MB = 1024 * 1024;
+const IMAGE_LIMIT = parseFloat(process.env.UPLOAD_IMAGE_LIMIT_MB || '5') * MB;
+const IMPORT_LIMIT = parseFloat(process.env.UPLOAD_IMPORT_LIMIT_MB || '500') * MB;
+const BACKUP_LIMIT = parseFloat(process.env.UPLOAD_BACKUP_LIMIT_MB || '1024') * MB;
 
-uploadDirs.forEach(dir => {
-    if (!fs.existsSync(dir)) {
-        fs.mkdirSync(dir, { recursive: true });
+// Upload directories are created on first use instead of at import time
+const createdDirs = new Map<string, Promise<unknown>>();
+
+function ensureDir(dir: string) {
+    if (!createdDirs.has(dir)) {
+        createdDirs.set(dir, fs.promises.mkdir(dir, { recursive: true }).catch((error) => {
+            createdDirs.delete(dir);
+            throw error;
+        }));
     }
-});
+    return createdDirs.get(dir)!;
+}
 
 const storage = multer.diskStorage({
     destination: (req, file, cb) => {
-        if (file.fieldname === 'image') {
-            cb(null, 'public/uploads/products');
-        } else if (file.fieldname === 'csv') {
-            cb(null, 'public/uploads/temp');
-        } else {
-            cb(null, 'public/uploads/temp');
-        }
+        const dir = file.fieldname === 'image' ? 'public/uploads/products' : 'public/uploads/temp';
+        ensureDir(dir).then(() => cb(null, dir), cb);
     },
     filename: (req, file, cb) => {
         const uniqueSuffix = `${Date.now()}-${uuidv4()}`;
@@ -40,7 +45,7 @@ const fileFilter = (req: any, file: any, cb: any) => {
             cb(new Error('Only images are allowed!'), false);
         }
     } else if (file.fieldname === 'csv') {
-        if (file.mimetype === 'text/csv' || file.originalname.endsWith('.csv')) {
+        if (file.mimetype === 'text/csv' || /\.csv(\.gz)?$/i.test(file.originalname)) {
             cb(null, true);
         } else {
             cb(new Error('Only CSV files are allowed!'), false);
@@ -54,6 +59,120 @@ export const upload = multer({
     storage: storage,
     fileFilter: fileFilter,
     limits: {
-        fileSize: 5 * 1024 * 1024 // 5MB limit
+        fileSize: IMAGE_LIMIT
     }
 });
+
+class UploadTooLarge extends Error {
+    constructor() {
+        super('File too large');
+    }
+}
+
+// Pass the upload through, gunzipping it when it starts with the gzip magic bytes.
+// If the consumer stops reading early, the rest of the upload is discarded so the
+// multipart parser can still finish the request.
+export function decodeUpload(raw: Readable): Readable {
+    const output = new PassThrough();
+    let piped = false;
+
+    raw.once('data', (head: Buffer) => {
+        raw.pause();
+        raw.unshift(head);
+        piped = true;
+        if (head[0] === 0x1f && head[1] === 0x8b) {
+            const gunzip = zlib.createGunzip();
+            gunzip.on('error', (error) => output.destroy(error));
+            raw.pipe(gunzip).pipe(output);
+        } else {
+            raw.pipe(output);
+        }
+    });
+    raw.once('end', () => {
+        if (!piped) output.end();
+    });
+    // Over the size limit the file is truncated; never process a partial upload
+    raw.once('limit', () => output.destroy(new UploadTooLarge()));
+
+    output.on('close', () => {
+        if (!output.readableEnded) {
+            raw.unpipe();
+            raw.resume();
+        }
+    });
+    return output;
+}
+
+// Multer storage engine that hands the decoded file stream to `consume`; what
+// it returns is merged into req.file
+function streamingStorage(consume: (req: Request, input: Readable) => Promise<Record<string, unknown>>): multer.StorageEngine {
+    return {
+        _handleFile(req, file, cb) {
+            const input = decodeUpload(file.stream);
+            consume(req, input).then(
+                (info) => cb(null, info as Partial<Express.Multer.File>),
+                (error) => {
+                    input.destroy();
+                    cb(error);
+                }
+            );
+        },
+        _removeFile(req, file, cb) {
+            cb(null);
+        },
+    };
+}
+
+// Over-limit uploads get a 413 instead of surfacing as a server error. Multer
+// only reports the error once the storage engine has finished with the file;
+// a request answered before that (a started import) has its job record it.
+function withSizeLimit(handler: RequestHandler, limit: number): RequestHandler {
+    return (req: Request, res: Response, next: NextFunction) => {
+        handler(req, res, (error?: any) => {
+            if (res.headersSent) {
+                if (error) console.error('Upload failed after the response:', error);
+                return next();
+            }
+            if (error?.code === 'LIMIT_FILE_SIZE' || error instanceof UploadTooLarge) {
+                return res.status(413).json({ error: `File is larger than ${limit / MB} MB` });
+            }
+            next(error);
+        });
+    };
+}
+
+// CSV import (plain or gzip-compressed) that starts processing while the upload
+// is still arriving. The request is answered with 202 and the job id as soon as
+// the job exists, from here; the route handler only runs afterwards, once the
+// upload has been consumed. An upload over the limit fails its job.
+export function csvImportUpload(type: string | ((req: Request) => string)) {
+    return withSizeLimit(multer({
+        storage: streamingStorage(async (req, input) => {
+            const jobId = await startStreamingImport(typeof type === 'function' ? type(req) : type, input, (id) => {
+                req.res?.status(202).json({ jobId: id, message: 'Import started' });
+            });
+            return { jobId };
+        }),
+        fileFilter: fileFilter,
+        limits: { fileSize: IMPORT_LIMIT },
+    }).single('csv'), IMPORT_LIMIT);
+}
+
+// Database backup (JSON, optionally gzipped) restored while it arrives: the
+// rows are parsed incrementally and handed to `restore` in batches, so neither
+// the file nor the parsed backup is held in memory. Afterwards req.file.invalid
+// is set if it was not valid JSON, req.file.error if the restore failed.
+export function backupUpload(restore: (tables: AsyncIterable<TableRows>) => Promise<void>) {
+    return withSizeLimit(multer({
+        storage: streamingStorage(async (req, input) => {
+            try {
+                await restore(parseJsonTables(input));
+                return {};
+            } catch (error) {
+                if (error instanceof UploadTooLarge) throw error;
+                return error instanceof SyntaxError ? { invalid: true } : { error };
+            }
+        }),
+        limits: { fileSize: BACKUP_LIMIT },
+    }).single('backup'), BACKUP_LIMIT);
+}
@@ -0,0 +1,20 @@
+import pool, { readPool, migrate, SCHEMA_VERSION } from './db.js';
+
+// One-shot schema migration, run by deploys before starting servers with
+// MIGRATE_ON_START=false
+async function main() {
+    try {
+        const migrated = await migrate();
+        if (!migrated) {
+            console.log(`Database schema is already at version ${SCHEMA_VERSION}`);
+        }
+    } catch (error) {
+        console.error('Migration failed:', error);
+        process.exitCode = 1;
+    } finally {
+        await pool.end();
+        if (readPool !== pool) await readPool.end();
+    }
+}
+
+main();
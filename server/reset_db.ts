@@ -11,6 +11,7 @@ async function resetDatabase() {
 
         // Truncate tables
         const tables = [
+            'stock_movements',
             'purchase_items',
             'purchase_invoices',
             'invoice_items',
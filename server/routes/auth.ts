@@ -3,6 +3,7 @@ import bcrypt from 'bcrypt';
 import jwt from 'jsonwebtoken';
 import pool from '../db.js';
 import { authenticateToken } from '../middleware/auth.js';
+import { binId } from '../lib/ids.js';
 
 const router = express.Router();
 const JWT_SECRET = process.env.JWT_SECRET || 'your-secret-key-change-in-production';
@@ -29,7 +30,7 @@ router.post('/login', async (req, res) => {
         if (user.role_id) {
             // If Admin role (full access check by name or just assume Admin has all? Let's use permission table properly)
             // Or if the role is 'Admin' by name, give 'all'.
-            const [roles]: any = await pool.query('SELECT name FROM roles WHERE id = ?', [user.role_id]);
+            const [roles]: any = await pool.query('SELECT name FROM roles WHERE id = ?', [binId(user.role_id)]);
 
             if (roles[0] && roles[0].name === 'Admin') {
                 permissions = ['all'];
@@ -39,7 +40,7 @@ router.post('/login', async (req, res) => {
                 FROM permissions p
                 JOIN role_permissions rp ON p.id = rp.permission_id
                 WHERE rp.role_id = ?
-            `, [user.role_id]);
+            `, [binId(user.role_id)]);
                 permissions = perms.map((p: any) => p.code);
             }
         }
@@ -64,7 +65,7 @@ router.get('/me', authenticateToken, async (req: any, res) => {
         const [users]: any = await pool.query(`
             SELECT u.id, u.username, u.full_name as fullName, u.role_id as roleId 
             FROM users u WHERE u.id = ?
-        `, [req.user.id]);
+        `, [binId(req.user.id)]);
 
         if (users.length === 0) return res.status(401).send();
 
@@ -72,7 +73,7 @@ router.get('/me', authenticateToken, async (req: any, res) => {
         // Fetch permissions correctly
         let permissions: string[] = [];
         if (user.roleId) {
-            const [roles]: any = await pool.query('SELECT name FROM roles WHERE id = ?', [user.roleId]);
+            const [roles]: any = await pool.query('SELECT name FROM roles WHERE id = ?', [binId(user.roleId)]);
             if (roles[0] && roles[0].name === 'Admin') {
                 permissions = ['all'];
             } else {
@@ -80,7 +81,7 @@ router.get('/me', authenticateToken, async (req: any, res) => {
                     SELECT p.code FROM permissions p
                     JOIN role_permissions rp ON p.id = rp.permission_id
                     WHERE rp.role_id = ?
-                `, [user.roleId]);
+                `, [binId(user.roleId)]);
                 permissions = perms.map((p: any) => p.code);
             }
         }
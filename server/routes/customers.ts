@@ -1,23 +1,24 @@
-import { Router } from 'express';
-import { v4 as uuidv4 } from 'uuid';
-import pool from '../db.js';
+import { Router, Request } from 'express';
+import { newId, binId } from '../lib/ids.js';
+import pool, { readPool } from '../db.js';
 import type { RowDataPacket, ResultSetHeader } from 'mysql2';
-import { upload } from '../middleware/upload.js';
-import fs from 'fs';
-import csv from 'csv-parser';
+import { csvImportUpload } from '../middleware/upload.js';
+import { conditionalGet, replicaTableVersion } from '../middleware/conditional.js';
+import { publish } from '../lib/events.js';
+import { registerImporter } from '../lib/jobs.js';
 
 const router = Router();
 
 // Get all customers with their purchase history
-router.get('/', async (req, res) => {
+router.get('/', conditionalGet(replicaTableVersion('customers', 'invoices')), async (req, res) => {
     try {
-        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM customers ORDER BY name');
+        const [rows] = await readPool.query<RowDataPacket[]>('SELECT * FROM customers ORDER BY name');
 
         const customers = [];
         for (const customer of rows) {
-            const [invoices] = await pool.query<RowDataPacket[]>(
+            const [invoices] = await readPool.query<RowDataPacket[]>(
                 'SELECT COUNT(*) as count, SUM(total) as total FROM invoices WHERE customer_id = ?',
-                [customer.id]
+                [binId(customer.id)]
             );
 
             customers.push({
@@ -43,12 +44,23 @@ router.get('/', async (req, res) => {
     }
 });
 
+// Customer row plus the invoices that make up its purchase history
+const customerVersion = async (req: Request) => {
+    const [rows] = await pool.query<RowDataPacket[]>(
+        `SELECT CAST(c.updated_at AS CHAR) AS updated_at, COUNT(i.id) AS count, CAST(MAX(i.updated_at) AS CHAR) AS updated
+         FROM customers c LEFT JOIN invoices i ON i.customer_id = c.id
+         WHERE c.id = ? GROUP BY c.id, c.updated_at`,
+        [binId(req.params.id)]
+    );
+    return rows.length > 0 ? [rows[0].updated_at, rows[0].count, rows[0].updated] : null;
+};
+
 // Get single customer with invoices
-router.get('/:id', async (req, res) => {
+router.get('/:id', conditionalGet(customerVersion), async (req, res) => {
     try {
         const [rows] = await pool.query<RowDataPacket[]>(
             'SELECT * FROM customers WHERE id = ?',
-            [req.params.id]
+            [binId(req.params.id)]
         );
 
         if (rows.length === 0) {
@@ -60,7 +72,7 @@ router.get('/:id', async (req, res) => {
         // Get invoices
         const [invoices] = await pool.query<RowDataPacket[]>(
             'SELECT * FROM invoices WHERE customer_id = ? ORDER BY created_at DESC',
-            [req.params.id]
+            [binId(req.params.id)]
         );
 
         const mappedCustomer = {
@@ -94,15 +106,15 @@ router.get('/:id', async (req, res) => {
 router.post('/', async (req, res) => {
     try {
         const { name, email, phone, address, customerType, companyName, taxNumber, details } = req.body;
-        const id = uuidv4();
+        const id = newId();
 
         await pool.query<ResultSetHeader>(
             `INSERT INTO customers (id, name, email, phone, address, customer_type, company_name, tax_number, details) 
              VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)`,
-            [id, name, email || '', phone || '', address || '', customerType || 'individual', companyName || '', taxNumber || '', details || '']
+            [binId(id), name, email || '', phone || '', address || '', customerType || 'individual', companyName || '', taxNumber || '', details || '']
         );
 
-        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM customers WHERE id = ?', [id]);
+        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM customers WHERE id = ?', [binId(id)]);
         const c = rows[0];
         res.status(201).json({
             id: c.id,
@@ -130,10 +142,10 @@ router.put('/:id', async (req, res) => {
         await pool.query<ResultSetHeader>(
             `UPDATE customers SET name = ?, email = ?, phone = ?, address = ?, 
              customer_type = ?, company_name = ?, tax_number = ?, details = ? WHERE id = ?`,
-            [name, email, phone, address, customerType || 'individual', companyName || '', taxNumber || '', details || '', req.params.id]
+            [name, email, phone, address, customerType || 'individual', companyName || '', taxNumber || '', details || '', binId(req.params.id)]
         );
 
-        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM customers WHERE id = ?', [req.params.id]);
+        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM customers WHERE id = ?', [binId(req.params.id)]);
         const c = rows[0];
         res.json({
             id: c.id,
@@ -156,7 +168,7 @@ router.put('/:id', async (req, res) => {
 // Delete customer
 router.delete('/:id', async (req, res) => {
     try {
-        await pool.query<ResultSetHeader>('DELETE FROM customers WHERE id = ?', [req.params.id]);
+        await pool.query<ResultSetHeader>('DELETE FROM customers WHERE id = ?', [binId(req.params.id)]);
         res.status(204).send();
     } catch (error) {
         console.error('Error deleting customer:', error);
@@ -164,43 +176,24 @@ router.delete('/:id', async (req, res) => {
     }
 });
 
-// Import customers CSV
-router.post('/import', upload.single('csv'), async (req: any, res) => {
-    if (!req.file) {
-        return res.status(400).json({ error: 'No CSV file uploaded' });
-    }
+registerImporter('customers', {
+    apply: async (connection, rows: any[]) => {
+        await connection.query(
+            'INSERT INTO customers (id, name, email, phone, address, customer_type, company_name, tax_number, details) VALUES ?',
+            [rows.map(({ name, email, phone, address, customerType, companyName, taxNumber, details }) =>
+                [binId(newId()), name, email || '', phone || '', address || '', customerType || 'individual', companyName || '', taxNumber || '', details || ''])]
+        );
+    },
+    done: () => publish('REFRESH', { resource: 'customers' }),
+});
 
-    const customers: any[] = [];
-    fs.createReadStream(req.file.path)
-        .pipe(csv())
-        .on('data', (data) => customers.push(data))
-        .on('end', async () => {
-            const connection = await pool.getConnection();
-            try {
-                await connection.beginTransaction();
-
-                for (const customer of customers) {
-                    const id = uuidv4();
-                    const { name, email, phone, address, customerType, companyName, taxNumber, details } = customer;
-
-                    await connection.query(
-                        `INSERT INTO customers (id, name, email, phone, address, customer_type, company_name, tax_number, details) 
-                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)`,
-                        [id, name, email || '', phone || '', address || '', customerType || 'individual', companyName || '', taxNumber || '', details || '']
-                    );
-                }
-
-                await connection.commit();
-                fs.unlinkSync(req.file.path); // Delete temp file
-                res.status(200).json({ message: `Successfully imported ${customers.length} customers` });
-            } catch (error) {
-                await connection.rollback();
-                console.error('Error importing customers:', error);
-                res.status(500).json({ error: 'Failed to import customers' });
-            } finally {
-                connection.release();
-            }
-        });
+// Import customers CSV (optionally gzipped) as a background job, processed as it
+// uploads. csvImportUpload answers 202 with the job id as soon as the job exists;
+// poll GET /api/jobs/:id for progress
+router.post('/import', csvImportUpload('customers'), (req, res) => {
+    if (!res.headersSent) {
+        res.status(400).json({ error: 'No CSV file uploaded' });
+    }
 });
 
 export default router;
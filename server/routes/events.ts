@@ -0,0 +1,65 @@
+import { Router, Response } from 'express';
+import { subscribe } from '../lib/events.js';
+
+const router = Router();
+
+const HEARTBEAT_INTERVAL_MS = 25000;
+const MAX_BUFFERED_BYTES = 1024 * 1024;
+
+const clients = new Set<Response>();
+let lastEventId = 0;
+
+// One bus listener fans out to every open stream, so each event is
+// serialized once no matter how many terminals are connected.
+subscribe((event) => {
+    if (clients.size === 0) return;
+
+    const frame = `id: ${++lastEventId}\ndata: ${JSON.stringify(event)}\n\n`;
+    for (const res of clients) {
+        // Drop clients that stopped reading instead of buffering for them forever
+        if (res.writableLength > MAX_BUFFERED_BYTES) {
+            clients.delete(res);
+            res.end();
+            continue;
+        }
+        res.write(frame);
+    }
+});
+
+// A single shared timer keeps idle streams alive through proxies
+setInterval(() => {
+    for (const res of clients) {
+        res.write(': ping\n\n');
+    }
+}, HEARTBEAT_INTERVAL_MS).unref();
+
+// End every open stream so the server can close; clients reconnect after
+// `retry` and land on another worker
+export function closeEventStreams() {
+    for (const res of clients) {
+        res.end();
+    }
+    clients.clear();
+}
+
+// Server-Sent Events change feed
+router.get('/', (req, res) => {
+    req.socket.setTimeout(0);
+    req.socket.setNoDelay(true);
+    req.socket.setKeepAlive(true);
+
+    res.writeHead(200, {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache, no-transform',
+        'Connection': 'keep-alive',
+        'X-Accel-Buffering': 'no',
+    });
+    res.write('retry: 5000\n\n');
+
+    clients.add(res);
+    req.on('close', () => {
+        clients.delete(res);
+    });
+});
+
+export default router;
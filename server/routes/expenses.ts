@@ -1,24 +1,30 @@
 import { Router } from 'express';
-import { v4 as uuidv4 } from 'uuid';
-import pool from '../db.js';
+import { newId, binId } from '../lib/ids.js';
+import pool, { readPool } from '../db.js';
 import type { RowDataPacket, ResultSetHeader } from 'mysql2';
+import { publish } from '../lib/events.js';
+import { conditionalGet, tableVersion, replicaTableVersion } from '../middleware/conditional.js';
+import { cached, invalidate } from '../lib/cache.js';
 
 const router = Router();
 
+function mapExpense(row: RowDataPacket) {
+    return {
+        id: row.id,
+        categoryId: row.category_id,
+        categoryName: row.category_name,
+        amount: parseFloat(row.amount),
+        description: row.description,
+        date: row.date,
+        createdAt: row.created_at,
+    };
+}
+
 // Get all expenses
-router.get('/', async (req, res) => {
+router.get('/', conditionalGet(replicaTableVersion('expenses')), async (req, res) => {
     try {
-        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM expenses ORDER BY date DESC');
-        const expenses = rows.map((row: any) => ({
-            id: row.id,
-            categoryId: row.category_id,
-            categoryName: row.category_name,
-            amount: parseFloat(row.amount),
-            description: row.description,
-            date: row.date,
-            createdAt: row.created_at,
-        }));
-        res.json(expenses);
+        const [rows] = await readPool.query<RowDataPacket[]>('SELECT * FROM expenses ORDER BY date DESC');
+        res.json(rows.map(mapExpense));
     } catch (error) {
         console.error('Error fetching expenses:', error);
         res.status(500).json({ error: 'Failed to fetch expenses' });
@@ -26,7 +32,7 @@ router.get('/', async (req, res) => {
 });
 
 // Get expense categories
-router.get('/categories', async (req, res) => {
+router.get('/categories', cached('expense-categories'), conditionalGet(tableVersion('expense_categories')), async (req, res) => {
     try {
         const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM expense_categories ORDER BY name');
         res.json(rows);
@@ -53,15 +59,16 @@ router.post('/', async (req, res) => {
                 categoryName = categoryName || categories[0].name;
             } else {
                 // Create a default category if none exists
-                categoryId = uuidv4();
+                categoryId = newId();
                 categoryName = categoryName || 'Uncategorized';
-                await pool.query('INSERT INTO expense_categories (id, name, color) VALUES (?, ?, ?)', [categoryId, categoryName, '#6366f1']);
+                await pool.query('INSERT INTO expense_categories (id, name, color) VALUES (?, ?, ?)', [binId(categoryId), categoryName, '#6366f1']);
+                await invalidate('expense-categories');
             }
         }
 
         // If categoryId was provided but categoryName was not, fetch it
         if (!categoryName) {
-            const [categories]: any = await pool.query('SELECT name FROM expense_categories WHERE id = ?', [categoryId]);
+            const [categories]: any = await pool.query('SELECT name FROM expense_categories WHERE id = ?', [binId(categoryId)]);
             if (categories.length > 0) {
                 categoryName = categories[0].name;
             } else {
@@ -73,7 +80,7 @@ router.post('/', async (req, res) => {
             return res.status(400).json({ error: 'Amount is required' });
         }
 
-        const id = uuidv4();
+        const id = newId();
 
         if (!date) {
             date = new Date().toISOString().split('T')[0];
@@ -81,20 +88,13 @@ router.post('/', async (req, res) => {
 
         await pool.query<ResultSetHeader>(
             'INSERT INTO expenses (id, category_id, category_name, amount, description, date) VALUES (?, ?, ?, ?, ?, ?)',
-            [id, categoryId, categoryName, amount, description || '', date]
+            [binId(id), binId(categoryId), categoryName, amount, description || '', date]
         );
 
-        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM expenses WHERE id = ?', [id]);
-        const expense = rows[0];
-        res.status(201).json({
-            id: expense.id,
-            categoryId: expense.category_id,
-            categoryName: expense.category_name,
-            amount: parseFloat(expense.amount),
-            description: expense.description,
-            date: expense.date,
-            createdAt: expense.created_at,
-        });
+        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM expenses WHERE id = ?', [binId(id)]);
+        const expense = mapExpense(rows[0]);
+        publish('ADD_EXPENSE', expense);
+        res.status(201).json(expense);
     } catch (error) {
         console.error('Error creating expense:', error);
         res.status(500).json({ error: 'Failed to create expense', details: (error as Error).message });
@@ -108,20 +108,13 @@ router.put('/:id', async (req, res) => {
 
         await pool.query<ResultSetHeader>(
             'UPDATE expenses SET category_id = ?, category_name = ?, amount = ?, description = ?, date = ? WHERE id = ?',
-            [categoryId, categoryName, amount, description, date, req.params.id]
+            [binId(categoryId), categoryName, amount, description, date, binId(req.params.id)]
         );
 
-        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM expenses WHERE id = ?', [req.params.id]);
-        const expense = rows[0];
-        res.json({
-            id: expense.id,
-            categoryId: expense.category_id,
-            categoryName: expense.category_name,
-            amount: parseFloat(expense.amount),
-            description: expense.description,
-            date: expense.date,
-            createdAt: expense.created_at,
-        });
+        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM expenses WHERE id = ?', [binId(req.params.id)]);
+        const expense = mapExpense(rows[0]);
+        publish('UPDATE_EXPENSE', expense);
+        res.json(expense);
     } catch (error) {
         console.error('Error updating expense:', error);
         res.status(500).json({ error: 'Failed to update expense' });
@@ -131,7 +124,8 @@ router.put('/:id', async (req, res) => {
 // Delete expense
 router.delete('/:id', async (req, res) => {
     try {
-        await pool.query<ResultSetHeader>('DELETE FROM expenses WHERE id = ?', [req.params.id]);
+        await pool.query<ResultSetHeader>('DELETE FROM expenses WHERE id = ?', [binId(req.params.id)]);
+        publish('DELETE_EXPENSE', req.params.id);
         res.status(204).send();
     } catch (error) {
         console.error('Error deleting expense:', error);
@@ -143,21 +137,24 @@ router.delete('/:id', async (req, res) => {
 router.post('/categories', async (req, res) => {
     try {
         const { name, color } = req.body;
-        const id = uuidv4();
+        const id = newId();
 
         await pool.query<ResultSetHeader>(
             'INSERT INTO expense_categories (id, name, color) VALUES (?, ?, ?)',
-            [id, name, color || '#6366f1']
+            [binId(id), name, color || '#6366f1']
         );
+        await invalidate('expense-categories');
 
-        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM expense_categories WHERE id = ?', [id]);
+        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM expense_categories WHERE id = ?', [binId(id)]);
         const cat = rows[0];
-        res.status(201).json({
+        const category = {
             id: cat.id,
             name: cat.name,
             color: cat.color,
             createdAt: cat.created_at
-        });
+        };
+        publish('ADD_EXPENSE_CATEGORY', category);
+        res.status(201).json(category);
     } catch (error) {
         console.error('Error creating category:', error);
         res.status(500).json({ error: 'Failed to create category' });
@@ -167,7 +164,9 @@ router.post('/categories', async (req, res) => {
 // Delete category
 router.delete('/categories/:id', async (req, res) => {
     try {
-        await pool.query<ResultSetHeader>('DELETE FROM expense_categories WHERE id = ?', [req.params.id]);
+        await pool.query<ResultSetHeader>('DELETE FROM expense_categories WHERE id = ?', [binId(req.params.id)]);
+        await invalidate('expense-categories');
+        publish('DELETE_EXPENSE_CATEGORY', req.params.id);
         res.status(204).send();
     } catch (error) {
         console.error('Error deleting category:', error);
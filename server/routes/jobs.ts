@@ -0,0 +1,30 @@
+import { Router } from 'express';
+import { getJob, listJobs } from '../lib/jobs.js';
+
+const router = Router();
+
+// Recent import jobs, newest first
+router.get('/', async (req, res) => {
+    try {
+        res.json(await listJobs());
+    } catch (error) {
+        console.error('Error fetching jobs:', error);
+        res.status(500).json({ error: 'Failed to fetch jobs' });
+    }
+});
+
+// Job status: rows processed/failed, first errors and throughput
+router.get('/:id', async (req, res) => {
+    try {
+        const job = await getJob(req.params.id);
+        if (!job) {
+            return res.status(404).json({ error: 'Job not found' });
+        }
+        res.json(job);
+    } catch (error) {
+        console.error('Error fetching job:', error);
+        res.status(500).json({ error: 'Failed to fetch job' });
+    }
+});
+
+export default router;
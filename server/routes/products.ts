@@ -1,31 +1,41 @@
 import { Router } from 'express';
-import { v4 as uuidv4 } from 'uuid';
-import pool from '../db.js';
+import { newId, binId, binIds } from '../lib/ids.js';
+import pool, { readPool } from '../db.js';
 import type { RowDataPacket, ResultSetHeader } from 'mysql2';
-import { upload } from '../middleware/upload.js';
-import fs from 'fs';
-import csv from 'csv-parser';
+import type { PoolConnection } from 'mysql2/promise';
+import { upload, csvImportUpload } from '../middleware/upload.js';
+import { publish } from '../lib/events.js';
+import { recordMovements, publishStockLevels, type StockMovement } from '../lib/stock.js';
+import { conditionalGet, tableVersion, rowVersion } from '../middleware/conditional.js';
+import { streamRows, streamJsonArray } from '../lib/jsonStream.js';
+import { registerImporter } from '../lib/jobs.js';
+import { upsertProducts, loadProductsFile } from '../lib/productImport.js';
+import { storeProductImage } from '../lib/images.js';
+import { cached, invalidate } from '../lib/cache.js';
 
 const router = Router();
 
+function mapProduct(p: RowDataPacket) {
+    return {
+        id: p.id,
+        name: p.name,
+        sku: p.sku || '',
+        category: p.category,
+        price: parseFloat(p.price),
+        costPrice: parseFloat(p.cost),
+        quantity: p.quantity,
+        imageUrl: p.image_url,
+        imageVariants: (typeof p.image_variants === 'string' ? JSON.parse(p.image_variants) : p.image_variants) || undefined,
+        description: p.description,
+        createdAt: p.created_at,
+        updatedAt: p.updated_at,
+    };
+}
+
 // Get all products
-router.get('/', async (req, res) => {
+router.get('/', cached('products'), conditionalGet(tableVersion('products')), async (req, res) => {
     try {
-        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM products ORDER BY created_at DESC');
-        const products = rows.map(p => ({
-            id: p.id,
-            name: p.name,
-            sku: p.sku,
-            category: p.category,
-            price: parseFloat(p.price),
-            costPrice: parseFloat(p.cost),
-            quantity: p.quantity,
-            imageUrl: p.image_url,
-            description: p.description,
-            createdAt: p.created_at,
-            updatedAt: p.updated_at,
-        }));
-        res.json(products);
+        await streamJsonArray(res, streamRows('SELECT * FROM products ORDER BY created_at DESC'), mapProduct);
     } catch (error) {
         console.error('Error fetching products:', error);
         res.status(500).json({ error: 'Failed to fetch products' });
@@ -33,168 +43,334 @@ router.get('/', async (req, res) => {
 });
 
 // Get single product
-router.get('/:id', async (req, res) => {
+router.get('/:id', conditionalGet(rowVersion('products')), async (req, res) => {
     try {
-        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM products WHERE id = ?', [req.params.id]);
+        const [rows] = await pool.execute<RowDataPacket[]>('SELECT * FROM products WHERE id = ?', [binId(req.params.id)]);
         if (rows.length === 0) {
             return res.status(404).json({ error: 'Product not found' });
         }
-        const p = rows[0];
-        res.json({
-            id: p.id,
-            name: p.name,
-            sku: p.sku,
-            category: p.category,
-            price: parseFloat(p.price),
-            costPrice: parseFloat(p.cost),
-            quantity: p.quantity,
-            imageUrl: p.image_url,
-            description: p.description,
-            createdAt: p.created_at,
-            updatedAt: p.updated_at,
-        });
+        res.json(mapProduct(rows[0]));
     } catch (error) {
         console.error('Error fetching product:', error);
         res.status(500).json({ error: 'Failed to fetch product' });
     }
 });
 
-// Create product
+// Create product (opening stock is recorded as a ledger adjustment)
 router.post('/', upload.single('image'), async (req, res) => {
+    const connection = await pool.getConnection();
+
     try {
+        await connection.beginTransaction();
+
         const { name, sku, category, price, costPrice, quantity, description } = req.body;
-        const id = uuidv4();
-        const imageUrl = req.file ? `/uploads/products/${req.file.filename}` : null;
+        const id = newId();
+        const image = req.file ? await storeProductImage(req.file.path) : null;
 
-        await pool.query<ResultSetHeader>(
-            'INSERT INTO products (id, name, sku, category, price, cost, quantity, image_url, description) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
-            [id, name, sku || '', category || '', price || 0, costPrice || 0, quantity || 0, imageUrl, description || '']
+        await connection.query<ResultSetHeader>(
+            'INSERT INTO products (id, name, sku, category, price, cost, quantity, image_url, image_variants, description) VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, ?)',
+            [binId(id), name, sku?.trim() || null, category || '', price || 0, costPrice || 0, image?.imageUrl ?? null,
+                image?.variants ? JSON.stringify(image.variants) : null, description || '']
         );
+        await recordMovements(connection, [
+            { productId: id, type: 'adjustment', quantity: parseInt(quantity) || 0, referenceType: 'product', referenceId: id, note: 'Opening stock' },
+        ]);
 
-        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM products WHERE id = ?', [id]);
-        const p = rows[0];
-        res.status(201).json({
-            id: p.id,
-            name: p.name,
-            sku: p.sku,
-            category: p.category,
-            price: parseFloat(p.price),
-            costPrice: parseFloat(p.cost),
-            quantity: p.quantity,
-            imageUrl: p.image_url,
-            description: p.description,
-            createdAt: p.created_at,
-            updatedAt: p.updated_at,
-        });
+        await connection.commit();
+        await invalidate('products');
+
+        const [rows] = await pool.execute<RowDataPacket[]>('SELECT * FROM products WHERE id = ?', [binId(id)]);
+        const product = mapProduct(rows[0]);
+        publish('ADD_PRODUCT', product);
+        res.status(201).json(product);
     } catch (error) {
+        await connection.rollback();
+        if ((error as any).code === 'ER_DUP_ENTRY') {
+            return res.status(409).json({ error: 'A product with this SKU already exists' });
+        }
         console.error('Error creating product:', error);
         res.status(500).json({ error: 'Failed to create product' });
+    } finally {
+        connection.release();
     }
 });
 
+// Set stock to an absolute count: the difference is locked in and booked as an adjustment
+async function adjustStockTo(connection: PoolConnection, productId: string, target: number, note: string) {
+    const [rows] = await connection.query<RowDataPacket[]>('SELECT quantity FROM products WHERE id = ? FOR UPDATE', [binId(productId)]);
+    if (rows.length === 0) return false;
+
+    await recordMovements(connection, [
+        { productId, type: 'adjustment', quantity: target - rows[0].quantity, referenceType: 'product', referenceId: productId, note },
+    ]);
+    return true;
+}
+
 // Update product
 router.put('/:id', upload.single('image'), async (req, res) => {
+    const connection = await pool.getConnection();
+
     try {
+        await connection.beginTransaction();
+
         const { name, sku, category, price, costPrice, quantity, description } = req.body;
         let imageUrl = req.body.imageUrl;
+        let variants: string | null = null;
 
         if (req.file) {
-            imageUrl = `/uploads/products/${req.file.filename}`;
+            const image = await storeProductImage(req.file.path);
+            imageUrl = image.imageUrl;
+            variants = image.variants ? JSON.stringify(image.variants) : null;
         }
 
-        await pool.query<ResultSetHeader>(
-            'UPDATE products SET name = ?, sku = ?, category = ?, price = ?, cost = ?, quantity = ?, image_url = ?, description = ? WHERE id = ?',
-            [name, sku, category, price, costPrice, quantity, imageUrl, description, req.params.id]
+        // Variants are kept while the image is unchanged (assignments run left to right)
+        await connection.query<ResultSetHeader>(
+            `UPDATE products SET name = ?, sku = ?, category = ?, price = ?, cost = ?,
+                image_variants = IF(? IS NULL AND image_url <=> ?, image_variants, ?), image_url = ?, description = ? WHERE id = ?`,
+            [name, sku?.trim() || null, category, price, costPrice, variants, imageUrl, variants, imageUrl, description, binId(req.params.id)]
         );
 
-        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM products WHERE id = ?', [req.params.id]);
-        const p = rows[0];
-        res.json({
-            id: p.id,
-            name: p.name,
-            sku: p.sku,
-            category: p.category,
-            price: parseFloat(p.price),
-            costPrice: parseFloat(p.cost),
-            quantity: p.quantity,
-            imageUrl: p.image_url,
-            description: p.description,
-            createdAt: p.created_at,
-            updatedAt: p.updated_at,
-        });
+        if (quantity !== undefined && quantity !== '' && Number.isFinite(Number(quantity))) {
+            await adjustStockTo(connection, req.params.id, Number(quantity), 'Edited on product form');
+        }
+
+        await connection.commit();
+        await invalidate('products');
+
+        const [rows] = await pool.execute<RowDataPacket[]>('SELECT * FROM products WHERE id = ?', [binId(req.params.id)]);
+        const product = mapProduct(rows[0]);
+        publish('UPDATE_PRODUCT', product);
+        res.json(product);
     } catch (error) {
+        await connection.rollback();
+        if ((error as any).code === 'ER_DUP_ENTRY') {
+            return res.status(409).json({ error: 'A product with this SKU already exists' });
+        }
         console.error('Error updating product:', error);
         res.status(500).json({ error: 'Failed to update product' });
+    } finally {
+        connection.release();
     }
 });
 
 // Update stock only
+// Body: { delta } for a relative change, or { quantity } for an absolute count
 router.patch('/:id/stock', async (req, res) => {
+    const { quantity, delta, note } = req.body;
+    const change = delta !== undefined ? Number(delta) : Number(quantity);
+    if (!Number.isFinite(change)) {
+        return res.status(400).json({ error: 'quantity or delta must be a number' });
+    }
+
+    const connection = await pool.getConnection();
+
     try {
-        const { quantity } = req.body;
+        await connection.beginTransaction();
 
-        await pool.query<ResultSetHeader>(
-            'UPDATE products SET quantity = ? WHERE id = ?',
-            [quantity, req.params.id]
-        );
+        let found: boolean;
+        if (delta !== undefined) {
+            const [exists] = await connection.execute<RowDataPacket[]>('SELECT id FROM products WHERE id = ?', [binId(req.params.id)]);
+            found = exists.length > 0;
+            if (found) {
+                await recordMovements(connection, [
+                    { productId: req.params.id, type: 'adjustment', quantity: change, referenceType: 'product', referenceId: req.params.id, note: note || 'Stock adjustment' },
+                ]);
+            }
+        } else {
+            found = await adjustStockTo(connection, req.params.id, change, note || 'Stock count');
+        }
 
-        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM products WHERE id = ?', [req.params.id]);
-        const p = rows[0];
-        res.json({
-            id: p.id,
-            name: p.name,
-            sku: p.sku,
-            category: p.category,
-            price: parseFloat(p.price),
-            costPrice: parseFloat(p.cost),
-            quantity: p.quantity,
-            imageUrl: p.image_url,
-            description: p.description,
-            createdAt: p.created_at,
-            updatedAt: p.updated_at,
-        });
+        if (!found) {
+            await connection.rollback();
+            return res.status(404).json({ error: 'Product not found' });
+        }
+
+        await connection.commit();
+        await invalidate('products');
+
+        const [rows] = await pool.execute<RowDataPacket[]>('SELECT * FROM products WHERE id = ?', [binId(req.params.id)]);
+        const product = mapProduct(rows[0]);
+        publish('UPDATE_STOCK', { productId: product.id, quantity: product.quantity });
+        res.json(product);
     } catch (error) {
+        await connection.rollback();
         console.error('Error updating stock:', error);
         res.status(500).json({ error: 'Failed to update stock' });
+    } finally {
+        connection.release();
+    }
+});
+
+// Stock ledger for one product, newest first
+router.get('/:id/movements', async (req, res) => {
+    try {
+        const [rows] = await readPool.query<RowDataPacket[]>(
+            'SELECT * FROM stock_movements WHERE product_id = ? ORDER BY created_at DESC',
+            [binId(req.params.id)]
+        );
+        res.json(rows.map(m => ({
+            id: m.id,
+            productId: m.product_id,
+            type: m.type,
+            quantity: m.quantity,
+            referenceType: m.reference_type,
+            referenceId: m.reference_id,
+            note: m.note,
+            createdAt: m.created_at,
+        })));
+    } catch (error) {
+        console.error('Error fetching stock movements:', error);
+        res.status(500).json({ error: 'Failed to fetch stock movements' });
     }
 });
 
-// Import products CSV
-router.post('/import', upload.single('csv'), async (req: any, res) => {
-    if (!req.file) {
-        return res.status(400).json({ error: 'No CSV file uploaded' });
+// Reconcile against an ERP stock balance snapshot keyed by SKU.
+// Body: { rows: [{ sku, quantity, cost? }], dryRun?, note? }. Only rows that differ are
+// written: quantity through ledger adjustments, cost with one batched UPDATE.
+router.post('/stock-balance', async (req, res) => {
+    const { rows, dryRun, note } = req.body;
+    if (!Array.isArray(rows)) {
+        return res.status(400).json({ error: 'rows must be an array' });
     }
 
-    const products: any[] = [];
-    fs.createReadStream(req.file.path)
-        .pipe(csv())
-        .on('data', (data) => products.push(data))
-        .on('end', async () => {
-            const connection = await pool.getConnection();
-            try {
-                await connection.beginTransaction();
-
-                for (const product of products) {
-                    const id = uuidv4();
-                    const { name, sku, category, price, costPrice, quantity, description } = product;
-
-                    await connection.query(
-                        'INSERT INTO products (id, name, sku, category, price, cost, quantity, description) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
-                        [id, name, sku || '', category || '', price || 0, costPrice || 0, quantity || 0, description || '']
-                    );
-                }
-
-                await connection.commit();
-                fs.unlinkSync(req.file.path); // Delete temp file
-                res.status(200).json({ message: `Successfully imported ${products.length} products` });
-            } catch (error) {
-                await connection.rollback();
-                console.error('Error importing products:', error);
-                res.status(500).json({ error: 'Failed to import products' });
-            } finally {
-                connection.release();
+    // Last occurrence wins if the snapshot repeats a SKU
+    const snapshot = new Map<string, { quantity: number; cost: number | null }>();
+    const invalid: string[] = [];
+    for (const row of rows) {
+        const sku = String(row.sku ?? '').trim();
+        const quantity = Number(row.quantity);
+        const cost = row.cost === undefined || row.cost === null || row.cost === '' ? null : Number(row.cost);
+        if (!sku || !Number.isFinite(quantity) || (cost !== null && !Number.isFinite(cost))) {
+            invalid.push(sku);
+            continue;
+        }
+        snapshot.set(sku, { quantity: Math.round(quantity), cost: cost === null ? null : Math.round(cost * 100) / 100 });
+    }
+
+    const connection = await pool.getConnection();
+
+    try {
+        await connection.beginTransaction();
+
+        const skus = [...snapshot.keys()];
+        const [products] = skus.length > 0
+            ? await connection.query<RowDataPacket[]>(
+                `SELECT id, sku, name, quantity, cost FROM products WHERE sku IN (?) ORDER BY id${dryRun ? '' : ' FOR UPDATE'}`,
+                [skus]
+            )
+            : [[] as RowDataPacket[]];
+
+        const bySku = new Map<string, RowDataPacket[]>();
+        for (const p of products) {
+            bySku.set(p.sku, [...(bySku.get(p.sku) || []), p]);
+        }
+
+        const changes: any[] = [];
+        const missing: string[] = [];
+        const ambiguous: string[] = [];
+        const movements: StockMovement[] = [];
+        const costs = new Map<string, number>();
+        let unchanged = 0;
+
+        for (const [sku, target] of snapshot) {
+            const matches = bySku.get(sku);
+            if (!matches) {
+                missing.push(sku);
+                continue;
             }
+            if (matches.length > 1) {
+                ambiguous.push(sku);
+                continue;
+            }
+
+            const product = matches[0];
+            const currentCost = parseFloat(product.cost);
+            const quantityChanged = product.quantity !== target.quantity;
+            const costChanged = target.cost !== null && currentCost !== target.cost;
+            if (!quantityChanged && !costChanged) {
+                unchanged++;
+                continue;
+            }
+
+            if (quantityChanged) {
+                movements.push({
+                    productId: product.id,
+                    type: 'adjustment',
+                    quantity: target.quantity - product.quantity,
+                    referenceType: 'stock-balance',
+                    note: note || 'Stock balance reconciliation',
+                });
+            }
+            if (costChanged) {
+                costs.set(product.id, target.cost!);
+            }
+            changes.push({
+                productId: product.id,
+                sku,
+                name: product.name,
+                quantity: { from: product.quantity, to: target.quantity },
+                cost: { from: currentCost, to: costChanged ? target.cost : currentCost },
+            });
+        }
+
+        let touched: string[] = [];
+        if (!dryRun) {
+            touched = await recordMovements(connection, movements);
+            if (costs.size > 0) {
+                const ids = [...costs.keys()];
+                await connection.query(
+                    `UPDATE products SET cost = CASE id ${ids.map(() => 'WHEN ? THEN ?').join(' ')} END WHERE id IN (?)`,
+                    [...ids.flatMap(id => [binId(id), costs.get(id)]), binIds(ids)]
+                );
+            }
+            await connection.commit();
+        } else {
+            await connection.rollback();
+        }
+
+        if (costs.size > 0 && !dryRun) {
+            await invalidate('products');
+            publish('REFRESH', { resource: 'products' });
+        } else {
+            await publishStockLevels(touched);
+        }
+
+        res.json({
+            dryRun: Boolean(dryRun),
+            received: rows.length,
+            matched: snapshot.size - missing.length - ambiguous.length,
+            unchanged,
+            changed: changes.length,
+            changes,
+            missing,
+            ambiguous,
+            invalid,
         });
+    } catch (error) {
+        await connection.rollback();
+        console.error('Error reconciling stock balance:', error);
+        res.status(500).json({ error: 'Failed to reconcile stock balance' });
+    } finally {
+        connection.release();
+    }
+});
+
+// Products import upserts by SKU: batched by default, or LOAD DATA + set-based merge
+// for very large catalogs (?mode=load)
+const refreshProducts = async () => {
+    await invalidate('products');
+    publish('REFRESH', { resource: 'products' });
+};
+registerImporter('products', { apply: upsertProducts, done: refreshProducts });
+registerImporter('products-load', { file: loadProductsFile, done: refreshProducts });
+
+// Import products CSV (optionally gzipped) as a background job, processed as it
+// uploads (mode=load writes it to disk first for LOAD DATA). csvImportUpload answers 202 with the job id as soon as the job exists;
+// poll GET /api/jobs/:id for progress
+router.post('/import', csvImportUpload(req => (req.query.mode === 'load' ? 'products-load' : 'products')), (req, res) => {
+    if (!res.headersSent) {
+        res.status(400).json({ error: 'No CSV file uploaded' });
+    }
 });
 
 export default router;
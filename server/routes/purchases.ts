@@ -1,25 +1,29 @@
 import { Router } from 'express';
-import { v4 as uuidv4 } from 'uuid';
-import pool from '../db.js';
+import { newId, isId, binId } from '../lib/ids.js';
+import pool, { readPool } from '../db.js';
 import type { RowDataPacket, ResultSetHeader } from 'mysql2';
-import { upload } from '../middleware/upload.js';
-import fs from 'fs';
-import csv from 'csv-parser';
+import { csvImportUpload } from '../middleware/upload.js';
+import { recordMovements, syncReferenceMovements, reverseReferenceMovements, publishStockLevels, type StockMovement } from '../lib/stock.js';
+import { publish } from '../lib/events.js';
+import { conditionalGet, replicaTableVersion } from '../middleware/conditional.js';
+import { registerImporter } from '../lib/jobs.js';
+import { invalidate } from '../lib/cache.js';
+import { nextDocumentNumber } from '../lib/sequences.js';
 
 const router = Router();
 
 // Get all purchase invoices
-router.get('/', async (req, res) => {
+router.get('/', conditionalGet(replicaTableVersion('purchase_invoices')), async (req, res) => {
     try {
-        const [rows] = await pool.query<RowDataPacket[]>(
+        const [rows] = await readPool.query<RowDataPacket[]>(
             'SELECT * FROM purchase_invoices ORDER BY created_at DESC'
         );
 
         const purchases = [];
         for (const purchase of rows) {
-            const [items] = await pool.query<RowDataPacket[]>(
+            const [items] = await readPool.query<RowDataPacket[]>(
                 'SELECT * FROM purchase_items WHERE purchase_id = ?',
-                [purchase.id]
+                [binId(purchase.id)]
             );
             purchases.push({
                 id: purchase.id,
@@ -63,47 +67,48 @@ router.post('/', async (req, res) => {
         let { invoiceNumber, supplier, status, subtotal, total, notes, items } = req.body;
 
         if (!invoiceNumber) {
-            invoiceNumber = `PUR-${Date.now()}`;
+            invoiceNumber = await nextDocumentNumber(connection, 'purchase');
         }
 
         if (!items || !Array.isArray(items)) {
             items = [];
         }
 
-        const id = uuidv4();
+        const id = newId();
 
         // Create purchase invoice
         await connection.query<ResultSetHeader>(
             `INSERT INTO purchase_invoices (id, invoice_number, supplier_id, supplier_name, status, subtotal, total, notes)
        VALUES (?, ?, ?, ?, ?, ?, ?, ?)`,
-            [id, invoiceNumber, supplier?.id || null, supplier?.name || '', status || 'pending', subtotal || 0, total || 0, notes || '']
+            [binId(id), invoiceNumber, isId(supplier?.id) ? binId(supplier.id) : null, supplier?.name || '', status || 'pending', subtotal || 0, total || 0, notes || '']
         );
 
         // Insert items and update product stock
+        const movements: StockMovement[] = [];
         for (const item of items || []) {
             const itemName = item.productName || item.name || 'Unknown Product';
             const itemQty = item.quantity || 1;
             const itemCost = item.unitCost || 0;
             const itemTotal = item.total || (itemQty * itemCost);
 
-            await connection.query<ResultSetHeader>(
+            await connection.execute<ResultSetHeader>(
                 `INSERT INTO purchase_items (id, purchase_id, product_id, product_name, quantity, unit_cost, total)
          VALUES (?, ?, ?, ?, ?, ?, ?)`,
-                [uuidv4(), id, item.productId || null, itemName, itemQty, itemCost, itemTotal]
+                [binId(newId()), binId(id), binId(item.productId), itemName, itemQty, itemCost, itemTotal]
             );
 
-            // Update product stock - INCREASE quantity
+            // Latest purchase cost becomes the product cost; stock goes through the ledger
             if (item.productId) {
-                await connection.query<ResultSetHeader>(
-                    'UPDATE products SET quantity = quantity + ?, cost = ? WHERE id = ?',
-                    [itemQty, itemCost, item.productId]
-                );
+                await connection.execute<ResultSetHeader>('UPDATE products SET cost = ? WHERE id = ?', [itemCost, binId(item.productId)]);
+                movements.push({ productId: item.productId, type: 'purchase', quantity: itemQty, referenceType: 'purchase', referenceId: id });
             }
         }
+        const touched = await recordMovements(connection, movements);
 
         await connection.commit();
+        await publishStockLevels(touched);
 
-        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM purchase_invoices WHERE id = ?', [id]);
+        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM purchase_invoices WHERE id = ?', [binId(id)]);
         const p = rows[0];
 
         res.status(201).json({
@@ -129,100 +134,144 @@ router.post('/', async (req, res) => {
     }
 });
 
-// Delete purchase (does not reverse stock changes)
+// Change purchase status; cancelling takes its stock back out, un-cancelling books it again
+router.patch('/:id/status', async (req, res) => {
+    const { status } = req.body;
+    if (!['pending', 'received', 'cancelled'].includes(status)) {
+        return res.status(400).json({ error: 'Invalid status' });
+    }
+
+    const connection = await pool.getConnection();
+
+    try {
+        await connection.beginTransaction();
+
+        const [rows] = await connection.query<RowDataPacket[]>(
+            'SELECT status FROM purchase_invoices WHERE id = ? FOR UPDATE',
+            [binId(req.params.id)]
+        );
+        if (rows.length === 0) {
+            await connection.rollback();
+            return res.status(404).json({ error: 'Purchase not found' });
+        }
+
+        let touched: string[] = [];
+        if (status === 'cancelled') {
+            touched = await reverseReferenceMovements(connection, 'purchase', req.params.id, 'purchase');
+        } else if (rows[0].status === 'cancelled') {
+            const [items] = await connection.query<RowDataPacket[]>(
+                'SELECT product_id, SUM(quantity) AS quantity FROM purchase_items WHERE purchase_id = ? AND product_id IS NOT NULL GROUP BY product_id',
+                [binId(req.params.id)]
+            );
+            const target = new Map<string, number>(items.map(i => [i.product_id, Number(i.quantity)]));
+            touched = await syncReferenceMovements(connection, 'purchase', req.params.id, target, 'purchase');
+        }
+
+        await connection.query<ResultSetHeader>('UPDATE purchase_invoices SET status = ? WHERE id = ?', [status, binId(req.params.id)]);
+
+        await connection.commit();
+        await publishStockLevels(touched);
+        res.json({ id: req.params.id, status });
+    } catch (error) {
+        await connection.rollback();
+        console.error('Error updating purchase status:', error);
+        res.status(500).json({ error: 'Failed to update purchase status' });
+    } finally {
+        connection.release();
+    }
+});
+
+// Delete purchase and take back out the stock it added
 router.delete('/:id', async (req, res) => {
+    const connection = await pool.getConnection();
+
     try {
-        await pool.query<ResultSetHeader>('DELETE FROM purchase_invoices WHERE id = ?', [req.params.id]);
+        await connection.beginTransaction();
+
+        await connection.query('SELECT id FROM purchase_invoices WHERE id = ? FOR UPDATE', [binId(req.params.id)]);
+        const touched = await reverseReferenceMovements(connection, 'purchase', req.params.id, 'purchase');
+        await connection.query<ResultSetHeader>('DELETE FROM purchase_invoices WHERE id = ?', [binId(req.params.id)]);
+
+        await connection.commit();
+        await publishStockLevels(touched);
         res.status(204).send();
     } catch (error) {
+        await connection.rollback();
         console.error('Error deleting purchase:', error);
         res.status(500).json({ error: 'Failed to delete purchase' });
+    } finally {
+        connection.release();
     }
 });
 
-// Import purchases CSV
+// Purchase CSV rows grouped into one unit per invoice, so an invoice is never split across batches
 // Format: invoiceNumber, supplierName, status, notes, productName, productId, quantity, unitCost
-router.post('/import', upload.single('csv'), async (req: any, res) => {
-    if (!req.file) {
-        return res.status(400).json({ error: 'No CSV file uploaded' });
-    }
+registerImporter('purchases', {
+    group: (rows: any[]) => {
+        const invoicesMap = new Map<string, any>();
+        rows.forEach((row, index) => {
+            // Rows without a number are each their own invoice, numbered from the purchase series on apply
+            const key = row.invoiceNumber || `\0${index}`;
+            if (!invoicesMap.has(key)) {
+                invoicesMap.set(key, {
+                    invoiceNumber: row.invoiceNumber || '',
+                    supplierName: row.supplierName || 'Imported Supplier',
+                    status: row.status || 'received',
+                    notes: row.notes || 'Imported via CSV',
+                    items: []
+                });
+            }
+            invoicesMap.get(key).items.push(row);
+        });
+        return [...invoicesMap.values()];
+    },
+    size: (inv) => inv.items.length,
+    label: (inv) => inv.invoiceNumber ? `Invoice ${inv.invoiceNumber}` : `Unnumbered invoice (${inv.items[0]?.productName || 'no product'})`,
+    apply: async (connection, invoices) => {
+        const movements: StockMovement[] = [];
+        for (const inv of invoices) {
+            const id = newId();
+            const invoiceNumber = inv.invoiceNumber || await nextDocumentNumber(connection, 'purchase');
+            const items = inv.items.map((item: any) => {
+                const qty = parseInt(item.quantity) || 0;
+                const cost = parseFloat(item.unitCost) || 0;
+                return { productId: item.productId || null, productName: item.productName || 'Unknown Product', qty, cost, total: qty * cost };
+            });
+            const subtotal = items.reduce((sum: number, item: any) => sum + item.total, 0);
 
-    const rows: any[] = [];
-    fs.createReadStream(req.file.path)
-        .pipe(csv())
-        .on('data', (data) => rows.push(data))
-        .on('end', async () => {
-            const connection = await pool.getConnection();
-            try {
-                await connection.beginTransaction();
-
-                // Group items by invoiceNumber
-                const invoicesMap = new Map<string, any>();
-                for (const row of rows) {
-                    const invNum = row.invoiceNumber || `PUR-IMP-${Date.now()}`;
-                    if (!invoicesMap.has(invNum)) {
-                        invoicesMap.set(invNum, {
-                            id: uuidv4(),
-                            invoiceNumber: invNum,
-                            supplierName: row.supplierName || 'Imported Supplier',
-                            status: row.status || 'received',
-                            notes: row.notes || 'Imported via CSV',
-                            items: []
-                        });
-                    }
-                    invoicesMap.get(invNum).items.push(row);
-                }
+            await connection.query(
+                `INSERT INTO purchase_invoices (id, invoice_number, supplier_name, status, subtotal, total, notes)
+                 VALUES (?, ?, ?, ?, ?, ?, ?)`,
+                [binId(id), invoiceNumber, inv.supplierName, inv.status, subtotal, subtotal, inv.notes]
+            );
+            await connection.query(
+                'INSERT INTO purchase_items (id, purchase_id, product_id, product_name, quantity, unit_cost, total) VALUES ?',
+                [items.map((item: any) => [binId(newId()), binId(id), binId(item.productId), item.productName, item.qty, item.cost, item.total])]
+            );
 
-                for (const inv of invoicesMap.values()) {
-                    let subtotal = 0;
-                    let total = 0;
-
-                    // Calculate totals from items
-                    for (const item of inv.items) {
-                        const qty = parseInt(item.quantity) || 0;
-                        const cost = parseFloat(item.unitCost) || 0;
-                        subtotal += qty * cost;
-                    }
-                    total = subtotal;
-
-                    await connection.query(
-                        `INSERT INTO purchase_invoices (id, invoice_number, supplier_name, status, subtotal, total, notes)
-                         VALUES (?, ?, ?, ?, ?, ?, ?)`,
-                        [inv.id, inv.invoiceNumber, inv.supplierName, inv.status, subtotal, total, inv.notes]
-                    );
-
-                    for (const item of inv.items) {
-                        const qty = parseInt(item.quantity) || 0;
-                        const cost = parseFloat(item.unitCost) || 0;
-                        const itemTotal = qty * cost;
-
-                        await connection.query(
-                            `INSERT INTO purchase_items (id, purchase_id, product_id, product_name, quantity, unit_cost, total)
-                             VALUES (?, ?, ?, ?, ?, ?, ?)`,
-                            [uuidv4(), inv.id, item.productId || null, item.productName || 'Unknown Product', qty, cost, itemTotal]
-                        );
-
-                        // Update stock
-                        if (item.productId) {
-                            await connection.query(
-                                'UPDATE products SET quantity = quantity + ?, cost = ? WHERE id = ?',
-                                [qty, cost, item.productId]
-                            );
-                        }
-                    }
+            // Update cost; stock goes through the ledger
+            for (const item of items) {
+                if (item.productId) {
+                    await connection.query('UPDATE products SET cost = ? WHERE id = ?', [item.cost, binId(item.productId)]);
+                    movements.push({ productId: item.productId, type: 'purchase', quantity: item.qty, referenceType: 'purchase', referenceId: id });
                 }
-
-                await connection.commit();
-                fs.unlinkSync(req.file.path);
-                res.status(200).json({ message: `Successfully imported ${invoicesMap.size} invoices` });
-            } catch (error) {
-                await connection.rollback();
-                console.error('Error importing purchases:', error);
-                res.status(500).json({ error: 'Failed to import purchases' });
-            } finally {
-                connection.release();
             }
-        });
+        }
+        await recordMovements(connection, movements);
+    },
+    done: async () => {
+        await invalidate('products');
+        publish('REFRESH', { resource: 'products' });
+    },
+});
+
+// Import purchases CSV (optionally gzipped) as a background job, processed as it
+// uploads. csvImportUpload answers 202 with the job id as soon as the job exists;
+// poll GET /api/jobs/:id for progress
+router.post('/import', csvImportUpload('purchases'), (req, res) => {
+    if (!res.headersSent) {
+        res.status(400).json({ error: 'No CSV file uploaded' });
+    }
 });
 
 export default router;
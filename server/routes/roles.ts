@@ -1,6 +1,8 @@
 import express from 'express';
 import pool from '../db.js';
 import { authenticateToken, requirePermission } from '../middleware/auth.js';
+import { cached } from '../lib/cache.js';
+import { NEW_ID_SQL, binId } from '../lib/ids.js';
 
 const router = express.Router();
 
@@ -16,7 +18,7 @@ router.get('/', requirePermission('roles.view'), async (req, res) => {
         FROM permissions p
         JOIN role_permissions rp ON p.id = rp.permission_id
         WHERE rp.role_id = ?
-      `, [role.id]);
+      `, [binId(role.id)]);
             return {
                 id: role.id,
                 name: role.name,
@@ -32,7 +34,7 @@ router.get('/', requirePermission('roles.view'), async (req, res) => {
 });
 
 // List Permissions
-router.get('/permissions', requirePermission('roles.view'), async (req, res) => {
+router.get('/permissions', requirePermission('roles.view'), cached('permissions'), async (req, res) => {
     try {
         const [perms] = await pool.query('SELECT * FROM permissions');
         res.json(perms);
@@ -46,7 +48,7 @@ router.post('/', requirePermission('roles.create'), async (req, res) => {
     const { name, description, permissions } = req.body; // permissions is array of codes or ids? Let's say IDs or Codes. Codes are safer.
     // Actually, let's assume permissions is array of Permission IDs for simplicity in UI matching.
     try {
-        const roleId = await pool.query('INSERT INTO roles (id, name, description) VALUES (UUID(), ?, ?)', [name, description]);
+        const roleId = await pool.query(`INSERT INTO roles (id, name, description) VALUES (${NEW_ID_SQL}, ?, ?)`, [name, description]);
         // Insert ID... wait, UUID() generates it. I need to select it back or generate in Node.
         // Let's generate in Node for this one to be safe.
         // Actually, I can use UUID() and then SELECT id FROM roles WHERE name = ?
@@ -64,7 +66,7 @@ router.post('/', requirePermission('roles.create'), async (req, res) => {
         if (permissions && permissions.length > 0) {
             // Permissions is array of IDs?
             for (const permId of permissions) {
-                await pool.query('INSERT INTO role_permissions (role_id, permission_id) VALUES (?, ?)', [newRoleId, permId]);
+                await pool.query('INSERT INTO role_permissions (role_id, permission_id) VALUES (?, ?)', [binId(newRoleId), binId(permId)]);
             }
         }
 
@@ -78,14 +80,14 @@ router.post('/', requirePermission('roles.create'), async (req, res) => {
 router.put('/:id', requirePermission('roles.edit'), async (req, res) => {
     const { name, description, permissions } = req.body;
     try {
-        await pool.query('UPDATE roles SET name = ?, description = ? WHERE id = ?', [name, description, req.params.id]);
+        await pool.query('UPDATE roles SET name = ?, description = ? WHERE id = ?', [name, description, binId(req.params.id)]);
 
         // Update perms: Delete all, then insert new
-        await pool.query('DELETE FROM role_permissions WHERE role_id = ?', [req.params.id]);
+        await pool.query('DELETE FROM role_permissions WHERE role_id = ?', [binId(req.params.id)]);
 
         if (permissions && permissions.length > 0) {
             for (const permId of permissions) {
-                await pool.query('INSERT INTO role_permissions (role_id, permission_id) VALUES (?, ?)', [req.params.id, permId]);
+                await pool.query('INSERT INTO role_permissions (role_id, permission_id) VALUES (?, ?)', [binId(req.params.id), binId(permId)]);
             }
         }
         res.json({ message: 'Role updated' });
@@ -97,7 +99,7 @@ router.put('/:id', requirePermission('roles.edit'), async (req, res) => {
 // Delete Role
 router.delete('/:id', requirePermission('roles.delete'), async (req, res) => {
     try {
-        await pool.query('DELETE FROM roles WHERE id = ?', [req.params.id]);
+        await pool.query('DELETE FROM roles WHERE id = ?', [binId(req.params.id)]);
         res.json({ message: 'Role deleted' });
     } catch (error) {
         res.status(500).json({ message: 'Error deleting role' });
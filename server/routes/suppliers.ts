@@ -1,12 +1,14 @@
 import { Router } from 'express';
-import { v4 as uuidv4 } from 'uuid';
+import { newId, binId } from '../lib/ids.js';
 import pool from '../db.js';
 import type { RowDataPacket, ResultSetHeader } from 'mysql2';
+import { conditionalGet, tableVersion } from '../middleware/conditional.js';
+import { cached, invalidate } from '../lib/cache.js';
 
 const router = Router();
 
 // Get all suppliers
-router.get('/', async (req, res) => {
+router.get('/', cached('suppliers'), conditionalGet(tableVersion('suppliers')), async (req, res) => {
     try {
         const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM suppliers ORDER BY name');
         const suppliers = rows.map(s => ({
@@ -28,14 +30,16 @@ router.get('/', async (req, res) => {
 router.post('/', async (req, res) => {
     try {
         const { name, email, phone, address } = req.body;
-        const id = uuidv4();
+        const id = newId();
 
         await pool.query<ResultSetHeader>(
             'INSERT INTO suppliers (id, name, email, phone, address) VALUES (?, ?, ?, ?, ?)',
-            [id, name, email || '', phone || '', address || '']
+            [binId(id), name, email || '', phone || '', address || '']
         );
 
-        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM suppliers WHERE id = ?', [id]);
+        await invalidate('suppliers');
+
+        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM suppliers WHERE id = ?', [binId(id)]);
         res.status(201).json(rows[0]);
     } catch (error) {
         console.error('Error creating supplier:', error);
@@ -50,10 +54,11 @@ router.put('/:id', async (req, res) => {
 
         await pool.query<ResultSetHeader>(
             'UPDATE suppliers SET name = ?, email = ?, phone = ?, address = ? WHERE id = ?',
-            [name, email, phone, address, req.params.id]
+            [name, email, phone, address, binId(req.params.id)]
         );
+        await invalidate('suppliers');
 
-        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM suppliers WHERE id = ?', [req.params.id]);
+        const [rows] = await pool.query<RowDataPacket[]>('SELECT * FROM suppliers WHERE id = ?', [binId(req.params.id)]);
         res.json(rows[0]);
     } catch (error) {
         console.error('Error updating supplier:', error);
@@ -64,7 +69,8 @@ router.put('/:id', async (req, res) => {
 // Delete supplier
 router.delete('/:id', async (req, res) => {
     try {
-        await pool.query<ResultSetHeader>('DELETE FROM suppliers WHERE id = ?', [req.params.id]);
+        await pool.query<ResultSetHeader>('DELETE FROM suppliers WHERE id = ?', [binId(req.params.id)]);
+        await invalidate('suppliers');
         res.status(204).send();
     } catch (error) {
         console.error('Error deleting supplier:', error);
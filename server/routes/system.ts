@@ -1,11 +1,23 @@
 import { Router } from 'express';
-import pool from '../db.js';
-import { upload } from '../middleware/upload.js';
+import pool, { readPool } from '../db.js';
+import { backupUpload } from '../middleware/upload.js';
+import type { TableRows } from '../lib/jsonStream.js';
+import { seedOpeningBalances } from '../lib/stock.js';
+import { invalidateAll } from '../lib/cache.js';
+import { binId, ID_COLUMNS } from '../lib/ids.js';
 import fs from 'fs';
 import { authenticateToken, requirePermission } from '../middleware/auth.js';
 
 const router = Router();
 
+// Ids are stored as 16 bytes; backups from before that carry them as text.
+// JSON columns (products.image_variants) are exported as parsed values, which
+// mysql2 would expand into `key` = value lists.
+function restoreValue(value: unknown, isId: boolean) {
+    if (isId) return binId(value);
+    return value !== null && typeof value === 'object' ? JSON.stringify(value) : value;
+}
+
 router.use(authenticateToken);
 
 // Export Database as JSON
@@ -14,17 +26,18 @@ router.get('/export', requirePermission('system.backup'), async (req, res) => {
         const tables = [
             'products', 'customers', 'invoices', 'invoice_items',
             'expense_categories', 'expenses', 'suppliers',
-            'purchase_invoices', 'purchase_items', 'roles', 'permissions', 'users'
+            'purchase_invoices', 'purchase_items', 'stock_movements', 'document_sequences', 'roles', 'permissions', 'users'
         ];
 
         const backup: any = {};
         for (const table of tables) {
-            const [rows] = await pool.query(`SELECT * FROM ${table}`);
+            const [rows] = await readPool.query(`SELECT * FROM ${table}`);
             backup[table] = rows;
         }
 
         const fileName = `backup-${Date.now()}.json`;
         const filePath = `public/uploads/backups/${fileName}`;
+        await fs.promises.mkdir('public/uploads/backups', { recursive: true });
         fs.writeFileSync(filePath, JSON.stringify(backup, null, 2));
 
         res.download(filePath, fileName, (err) => {
@@ -37,46 +50,66 @@ router.get('/export', requirePermission('system.backup'), async (req, res) => {
     }
 });
 
-// Import Database from JSON
-router.post('/import', requirePermission('system.restore'), upload.single('backup'), async (req: any, res) => {
-    if (!req.file) {
-        return res.status(400).json({ error: 'No backup file uploaded' });
-    }
-
+// Replace the database with a backup as it is parsed. Each table is emptied when
+// it starts and its rows inserted in batches, all in one transaction: DELETE
+// rather than TRUNCATE (which commits implicitly), so a backup that turns out
+// to be malformed halfway through leaves the database as it was.
+async function restoreBackup(tables: AsyncIterable<TableRows>) {
     const connection = await pool.getConnection();
     try {
-        const backup = JSON.parse(fs.readFileSync(req.file.path, 'utf8'));
         await connection.beginTransaction();
-
-        // Disable foreign key checks
         await connection.query('SET FOREIGN_KEY_CHECKS = 0');
 
-        const tables = Object.keys(backup);
-        for (const table of tables) {
-            await connection.query(`TRUNCATE TABLE ${table}`);
-            const rows = backup[table];
-            if (rows.length > 0) {
-                const keys = Object.keys(rows[0]);
-                const values = rows.map((row: any) => keys.map(key => row[key]));
-                await connection.query(
-                    `INSERT INTO ${table} (${keys.join(', ')}) VALUES ?`,
-                    [values]
-                );
+        const restored = new Set<string>();
+        let keys: string[] = [];
+        for await (const { table, rows } of tables) {
+            if (!restored.has(table)) {
+                restored.add(table);
+                keys = [];
+                await connection.query(`DELETE FROM ${table}`);
             }
+            if (rows.length === 0) continue;
+            if (keys.length === 0) keys = Object.keys(rows[0]);
+            const ids = new Set(ID_COLUMNS[table] || []);
+            const values = rows.map(row => keys.map(key => restoreValue(row[key], ids.has(key))));
+            await connection.query(`INSERT INTO ${table} (${keys.join(', ')}) VALUES ?`, [values]);
         }
 
-        await connection.query('SET FOREIGN_KEY_CHECKS = 1');
-        await connection.commit();
-        fs.unlinkSync(req.file.path);
+        // Backups taken before the stock ledger existed: restart it from the restored quantities
+        if (!restored.has('stock_movements')) {
+            await connection.query('DELETE FROM stock_movements');
+            await seedOpeningBalances(connection);
+        }
 
-        res.json({ message: 'Database successfully restored' });
+        // Backups without number counters: drop ours so they reseed from the restored documents
+        if (!restored.has('document_sequences')) {
+            await connection.query('DELETE FROM document_sequences');
+        }
+
+        await connection.commit();
     } catch (error) {
         await connection.rollback();
-        console.error('Import error:', error);
-        res.status(500).json({ error: 'Failed to import backup' });
+        throw error;
     } finally {
+        await connection.query('SET FOREIGN_KEY_CHECKS = 1').catch(() => {});
         connection.release();
     }
+    await invalidateAll();
+}
+
+// Import Database from JSON (plain or gzipped), restored while it uploads
+router.post('/import', requirePermission('system.restore'), backupUpload(restoreBackup), (req: any, res) => {
+    if (!req.file) {
+        return res.status(400).json({ error: 'No backup file uploaded' });
+    }
+    if (req.file.invalid) {
+        return res.status(400).json({ error: 'Backup file is not valid JSON' });
+    }
+    if (req.file.error) {
+        console.error('Import error:', req.file.error);
+        return res.status(500).json({ error: 'Failed to import backup' });
+    }
+    res.json({ message: 'Database successfully restored' });
 });
 
 export default router;
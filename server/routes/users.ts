@@ -2,6 +2,7 @@ import express from 'express';
 import bcrypt from 'bcrypt';
 import pool from '../db.js';
 import { authenticateToken, requirePermission } from '../middleware/auth.js';
+import { NEW_ID_SQL, binId } from '../lib/ids.js';
 
 const router = express.Router();
 
@@ -35,8 +36,8 @@ router.post('/', requirePermission('users.create'), async (req, res) => {
     try {
         const hashedPassword = await bcrypt.hash(password, 10);
         await pool.query(
-            'INSERT INTO users (id, username, password_hash, full_name, role_id) VALUES (UUID(), ?, ?, ?, ?)',
-            [username, hashedPassword, fullName, roleId]
+            `INSERT INTO users (id, username, password_hash, full_name, role_id) VALUES (${NEW_ID_SQL}, ?, ?, ?, ?)`,
+            [username, hashedPassword, fullName, binId(roleId)]
         );
         res.status(201).json({ message: 'User created' });
     } catch (error) {
@@ -52,12 +53,12 @@ router.put('/:id', requirePermission('users.edit'), async (req, res) => {
             const hashedPassword = await bcrypt.hash(password, 10);
             await pool.query(
                 'UPDATE users SET full_name = ?, role_id = ?, password_hash = ? WHERE id = ?',
-                [fullName, roleId, hashedPassword, req.params.id]
+                [fullName, binId(roleId), hashedPassword, binId(req.params.id)]
             );
         } else {
             await pool.query(
                 'UPDATE users SET full_name = ?, role_id = ? WHERE id = ?',
-                [fullName, roleId, req.params.id]
+                [fullName, binId(roleId), binId(req.params.id)]
             );
         }
         res.json({ message: 'User updated' });
@@ -69,7 +70,7 @@ router.put('/:id', requirePermission('users.edit'), async (req, res) => {
 // Delete User
 router.delete('/:id', requirePermission('users.delete'), async (req, res) => {
     try {
-        await pool.query('DELETE FROM users WHERE id = ?', [req.params.id]);
+        await pool.query('DELETE FROM users WHERE id = ?', [binId(req.params.id)]);
         res.json({ message: 'User deleted' });
     } catch (error) {
         res.status(500).json({ message: 'Error deleting user' });
@@ -28,6 +28,7 @@ const permissions = [
   { code: 'roles.create', desc: 'Add Roles', module: 'admin' },
   { code: 'roles.edit', desc: 'Edit Roles', module: 'admin' },
   { code: 'roles.delete', desc: 'Delete Roles', module: 'admin' },
+  { code: 'system.metrics', desc: 'View Metrics', module: 'admin' },
 ];
 
 async function seed() {
@@ -41,7 +42,7 @@ async function seed() {
 
   for (const p of permissions) {
     try {
-      await pool.query('INSERT IGNORE INTO permissions (id, code, description, module) VALUES (UUID(), ?, ?, ?)', [p.code, p.desc, p.module]);
+      await pool.query('INSERT IGNORE INTO permissions (id, code, description, module) VALUES (UUID_TO_BIN(UUID(), 1), ?, ?, ?)', [p.code, p.desc, p.module]);
     } catch (err) {
       console.error(err);
     }
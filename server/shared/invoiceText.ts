@@ -0,0 +1,50 @@
+// Invoice wording shared by the browser print (src/components/sales/InvoicePrint.tsx)
+// and the server-rendered PDF (server/lib/invoicePdf.ts), so both stay identical.
+// No Node or DOM dependencies: imported from both builds.
+
+export const formatCurrency = (value: number) => `EGP ${Number(value || 0).toFixed(2)}`;
+export const formatDate = (date: string | Date) => new Date(date).toLocaleDateString('en-GB');
+
+// Amount in Arabic words for the invoice total (simplified)
+export function numberToArabicWords(num: number): string {
+    const units = ['', 'واحد', 'اثنان', 'ثلاثة', 'أربعة', 'خمسة', 'ستة', 'سبعة', 'ثمانية', 'تسعة'];
+    const tens = ['', 'عشرة', 'عشرون', 'ثلاثون', 'أربعون', 'خمسون', 'ستون', 'سبعون', 'ثمانون', 'تسعون'];
+    const hundreds = ['', 'مائة', 'مائتان', 'ثلاثمائة', 'أربعمائة', 'خمسمائة', 'ستمائة', 'سبعمائة', 'ثمانمائة', 'تسعمائة'];
+
+    if (num === 0) return 'صفر';
+
+    const intPart = Math.floor(num);
+    const decPart = Math.round((num - intPart) * 100);
+
+    let result = '';
+
+    if (intPart >= 1000) {
+        const thousands = Math.floor(intPart / 1000);
+        result += (thousands === 1 ? 'ألف' : thousands === 2 ? 'ألفان' : thousands + ' آلاف') + ' و ';
+    }
+
+    const remainder = intPart % 1000;
+    if (remainder >= 100) {
+        result += hundreds[Math.floor(remainder / 100)] + ' و ';
+    }
+
+    const tensRemainder = remainder % 100;
+    if (tensRemainder >= 20) {
+        const unitsDigit = tensRemainder % 10;
+        if (unitsDigit > 0) {
+            result += units[unitsDigit] + ' و ';
+        }
+        result += tens[Math.floor(tensRemainder / 10)];
+    } else if (tensRemainder >= 10) {
+        result += units[tensRemainder - 10] + ' عشر';
+    } else if (tensRemainder > 0) {
+        result += units[tensRemainder];
+    }
+
+    result = result.replace(/ و $/, '');
+
+    if (decPart > 0) {
+        return `فقط ${result} جنيه مصري فقط لا غير`;
+    }
+    return `فقط ${result} جنيه مصري لا غير`;
+}
@@ -1,5 +1,6 @@
 import React from 'react';
 import type { Invoice } from '../../types';
+import { formatCurrency, formatDate, numberToArabicWords } from '../../../server/shared/invoiceText';
 
 interface InvoicePrintProps {
     invoice: Invoice;
@@ -7,53 +8,6 @@ interface InvoicePrintProps {
 }
 
 const InvoicePrint: React.FC<InvoicePrintProps> = ({ invoice, template = 'standard' }) => {
-    const formatCurrency = (value: number) => `EGP ${value.toFixed(2)}`;
-    const formatDate = (date: string) => new Date(date).toLocaleDateString('en-GB');
-
-    // Convert number to Arabic words (simplified)
-    const numberToArabicWords = (num: number): string => {
-        const units = ['', 'واحد', 'اثنان', 'ثلاثة', 'أربعة', 'خمسة', 'ستة', 'سبعة', 'ثمانية', 'تسعة'];
-        const tens = ['', 'عشرة', 'عشرون', 'ثلاثون', 'أربعون', 'خمسون', 'ستون', 'سبعون', 'ثمانون', 'تسعون'];
-        const hundreds = ['', 'مائة', 'مائتان', 'ثلاثمائة', 'أربعمائة', 'خمسمائة', 'ستمائة', 'سبعمائة', 'ثمانمائة', 'تسعمائة'];
-
-        if (num === 0) return 'صفر';
-
-        const intPart = Math.floor(num);
-        const decPart = Math.round((num - intPart) * 100);
-
-        let result = '';
-
-        if (intPart >= 1000) {
-            const thousands = Math.floor(intPart / 1000);
-            result += (thousands === 1 ? 'ألف' : thousands === 2 ? 'ألفان' : thousands + ' آلاف') + ' و ';
-        }
-
-        const remainder = intPart % 1000;
-        if (remainder >= 100) {
-            result += hundreds[Math.floor(remainder / 100)] + ' و ';
-        }
-
-        const tensRemainder = remainder % 100;
-        if (tensRemainder >= 20) {
-            const unitsDigit = tensRemainder % 10;
-            if (unitsDigit > 0) {
-                result += units[unitsDigit] + ' و ';
-            }
-            result += tens[Math.floor(tensRemainder / 10)];
-        } else if (tensRemainder >= 10) {
-            result += units[tensRemainder - 10] + ' عشر';
-        } else if (tensRemainder > 0) {
-            result += units[tensRemainder];
-        }
-
-        result = result.replace(/ و $/, '');
-
-        if (decPart > 0) {
-            return `فقط ${result} جنيه مصري فقط لا غير`;
-        }
-        return `فقط ${result} جنيه مصري لا غير`;
-    };
-
     return (
         <div className="invoice-print-container">
             {/* ========== PAGE 1: INVOICE ========== */}
@@ -1,6 +1,6 @@
 import React, { createContext, useContext, useReducer, useEffect, useState, useCallback } from 'react';
 import type { AppState, AppAction, Product, Invoice, Expense, Customer } from '../types';
-import { productsApi, customersApi, invoicesApi, expensesApi, purchasesApi } from '../services/api';
+import { productsApi, customersApi, invoicesApi, expensesApi, purchasesApi, jobsApi, eventsApi } from '../services/api';
 
 // Initial state
 const initialState: AppState = {
@@ -11,11 +11,18 @@ const initialState: AppState = {
     customers: [],
 };
 
+// Insert or replace by id, so an ADD echoed back by the change feed is not duplicated
+function upsertById<T extends { id: string }>(list: T[], item: T): T[] {
+    return list.some((x) => x.id === item.id)
+        ? list.map((x) => (x.id === item.id ? item : x))
+        : [...list, item];
+}
+
 // Reducer
 function appReducer(state: AppState, action: AppAction): AppState {
     switch (action.type) {
         case 'ADD_PRODUCT':
-            return { ...state, products: [...state.products, action.payload] };
+            return { ...state, products: upsertById(state.products, action.payload) };
         case 'UPDATE_PRODUCT':
             return {
                 ...state,
@@ -38,7 +45,7 @@ function appReducer(state: AppState, action: AppAction): AppState {
                 ),
             };
         case 'ADD_INVOICE':
-            return { ...state, invoices: [...state.invoices, action.payload] };
+            return { ...state, invoices: upsertById(state.invoices, action.payload) };
         case 'UPDATE_INVOICE':
             return {
                 ...state,
@@ -52,23 +59,23 @@ function appReducer(state: AppState, action: AppAction): AppState {
                 invoices: state.invoices.filter((i) => i.id !== action.payload),
             };
         case 'CONVERT_TO_INVOICE': {
-            const quotation = state.invoices.find((i) => i.id === action.payload);
+            const quotation = state.invoices.find((i) => i.id === action.payload.id);
             if (!quotation) return state;
             const invoice: Invoice = {
                 ...quotation,
                 type: 'invoice',
                 status: 'pending',
-                invoiceNumber: `INV-${Date.now()}`,
+                invoiceNumber: action.payload.invoiceNumber,
             };
             return {
                 ...state,
                 invoices: state.invoices.map((i) =>
-                    i.id === action.payload ? invoice : i
+                    i.id === action.payload.id ? invoice : i
                 ),
             };
         }
         case 'ADD_EXPENSE':
-            return { ...state, expenses: [...state.expenses, action.payload] };
+            return { ...state, expenses: upsertById(state.expenses, action.payload) };
         case 'UPDATE_EXPENSE':
             return {
                 ...state,
@@ -84,7 +91,7 @@ function appReducer(state: AppState, action: AppAction): AppState {
         case 'ADD_EXPENSE_CATEGORY':
             return {
                 ...state,
-                expenseCategories: [...state.expenseCategories, action.payload],
+                expenseCategories: upsertById(state.expenseCategories, action.payload),
             };
         case 'DELETE_EXPENSE_CATEGORY':
             return {
@@ -94,7 +101,7 @@ function appReducer(state: AppState, action: AppAction): AppState {
                 ),
             };
         case 'ADD_CUSTOMER':
-            return { ...state, customers: [...state.customers, action.payload] };
+            return { ...state, customers: upsertById(state.customers, action.payload) };
         case 'UPDATE_CUSTOMER':
             return {
                 ...state,
@@ -128,7 +135,7 @@ interface AppContextType {
     addCustomer: (customer: Omit<Customer, 'id'>) => Promise<void>;
     updateCustomer: (customer: Customer) => Promise<void>;
     deleteCustomer: (id: string) => Promise<void>;
-    importData: (type: 'products' | 'customers' | 'purchases', file: File) => Promise<void>;
+    importData: (type: 'products' | 'customers' | 'purchases', file: File) => Promise<any>;
     refreshData: () => Promise<void>;
 }
 
@@ -140,10 +147,12 @@ export function AppProvider({ children }: { children: React.ReactNode }) {
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState<string | null>(null);
 
-    // Load all data from API
-    const refreshData = useCallback(async () => {
-        setLoading(true);
-        setError(null);
+    // Load all data from API (silently when resyncing in the background)
+    const loadData = useCallback(async (silent: boolean) => {
+        if (!silent) {
+            setLoading(true);
+            setError(null);
+        }
         try {
             const [products, invoices, expenses, categories, customers] = await Promise.all([
                 productsApi.getAll(),
@@ -165,17 +174,37 @@ export function AppProvider({ children }: { children: React.ReactNode }) {
             });
         } catch (err) {
             console.error('Failed to load data:', err);
-            setError('Failed to connect to server. Make sure the backend is running.');
+            if (!silent) {
+                setError('Failed to connect to server. Make sure the backend is running.');
+            }
         } finally {
-            setLoading(false);
+            if (!silent) {
+                setLoading(false);
+            }
         }
     }, []);
 
+    const refreshData = useCallback(() => loadData(false), [loadData]);
+
     // Load data on mount
     useEffect(() => {
         refreshData();
     }, [refreshData]);
 
+    // Apply changes made on other terminals as they happen
+    useEffect(() => {
+        const resync = () => {
+            loadData(true);
+        };
+        return eventsApi.subscribe((event) => {
+            if (event.type === 'REFRESH') {
+                resync();
+            } else {
+                dispatch(event as AppAction);
+            }
+        }, resync);
+    }, [loadData]);
+
     // Product operations
     const addProduct = async (productData: Omit<Product, 'id' | 'createdAt' | 'updatedAt'> | FormData) => {
         try {
@@ -216,20 +245,10 @@ export function AppProvider({ children }: { children: React.ReactNode }) {
     // Invoice operations
     const addInvoice = async (invoiceData: Omit<Invoice, 'id' | 'createdAt' | 'invoiceNumber'>) => {
         try {
-            const prefix = invoiceData.type === 'quotation' ? 'QT' : 'INV';
-            const invoice = await invoicesApi.create({
-                ...invoiceData,
-                invoiceNumber: `${prefix}-${Date.now()}`,
-            });
+            // The number comes from the server's sequence for the invoice or quotation series
+            const invoice = await invoicesApi.create(invoiceData);
+            // Stock for paid invoices is taken out server-side and arrives via the change feed
             dispatch({ type: 'ADD_INVOICE', payload: invoice });
-
-            // Update stock for paid invoices
-            if (invoiceData.type === 'invoice' && invoiceData.status === 'paid') {
-                for (const item of invoiceData.items) {
-                    await productsApi.updateStock(item.productId, -item.quantity);
-                }
-                await refreshData(); // Refresh to get updated stock
-            }
         } catch (err) {
             console.error('Failed to add invoice:', err);
             throw err;
@@ -261,15 +280,12 @@ export function AppProvider({ children }: { children: React.ReactNode }) {
             const quotation = state.invoices.find((i) => i.id === quotationId);
             if (!quotation) return;
 
-            const invoice: Invoice = {
+            const { invoiceNumber } = await invoicesApi.update(quotationId, {
                 ...quotation,
                 type: 'invoice',
                 status: 'pending',
-                invoiceNumber: `INV-${Date.now()}`,
-            };
-
-            await invoicesApi.update(quotationId, invoice);
-            dispatch({ type: 'UPDATE_INVOICE', payload: invoice });
+            });
+            dispatch({ type: 'CONVERT_TO_INVOICE', payload: { id: quotationId, invoiceNumber } });
         } catch (err) {
             console.error('Failed to convert to invoice:', err);
             throw err;
@@ -281,7 +297,6 @@ export function AppProvider({ children }: { children: React.ReactNode }) {
         try {
             const expense = await expensesApi.create(expenseData);
             dispatch({ type: 'ADD_EXPENSE', payload: expense });
-            await refreshData(); // Refresh to get latest
         } catch (err) {
             console.error('Failed to add expense:', err);
             throw err;
@@ -344,15 +359,26 @@ export function AppProvider({ children }: { children: React.ReactNode }) {
             const formData = new FormData();
             formData.append('csv', file);
 
+            let queued: { jobId: string };
             if (type === 'products') {
-                await productsApi.importData(formData);
+                queued = await productsApi.importData(formData);
             } else if (type === 'customers') {
-                await customersApi.importData(formData);
-            } else if (type === 'purchases') {
-                await purchasesApi.importData(formData);
+                queued = await customersApi.importData(formData);
+            } else {
+                queued = await purchasesApi.importData(formData);
+            }
+
+            // Imports run in the background on the server
+            const job = await jobsApi.wait(queued.jobId);
+            if (job.status === 'failed') {
+                throw new Error(job.message || 'Import failed');
+            }
+            if (job.failedRows > 0) {
+                console.warn(`Import of ${type} skipped ${job.failedRows} row(s):`, job.errors);
             }
 
             await refreshData();
+            return job;
         } catch (err) {
             console.error(`Failed to import ${type}:`, err);
             throw err;
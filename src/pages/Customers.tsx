@@ -354,7 +354,7 @@ export default function Customers() {
                                     <input
                                         type="file"
                                         className="form-input"
-                                        accept=".csv"
+                                        accept=".csv,.gz"
                                         onChange={(e) => setImportFile(e.target.files?.[0] || null)}
                                         required
                                     />
@@ -92,8 +92,10 @@ export default function Products() {
         e.preventDefault();
         if (!importFile) return;
         try {
-            await importData('products', importFile);
-            alert('Products imported successfully!');
+            const job = await importData('products', importFile);
+            const { inserted = 0, updated = 0, unchanged = 0 } = job.stats || {};
+            alert(`Products imported: ${inserted} new, ${updated} updated, ${unchanged} unchanged` +
+                (job.failedRows > 0 ? `, ${job.failedRows} skipped` : ''));
             setIsImportModalOpen(false);
             setImportFile(null);
         } catch (error) {
@@ -114,6 +116,9 @@ export default function Products() {
 
     const formatCurrency = (value: number) => `EGP ${value.toFixed(2)}`;
 
+    // Thumbnail srcsets hold server-relative URLs
+    const withHost = (srcSet: string) => srcSet.split(', ').map(entry => `http://localhost:3001${entry}`).join(', ');
+
     return (
         <div className="products-page">
             <div className="page-header">
@@ -190,7 +195,22 @@ export default function Products() {
                                         <div className="product-cell">
                                             <div className="product-image-mini">
                                                 {product.imageUrl ? (
-                                                    <img src={`http://localhost:3001${product.imageUrl}`} alt={product.name} />
+                                                    <picture>
+                                                        {product.imageVariants?.avif && (
+                                                            <source type="image/avif" srcSet={withHost(product.imageVariants.avif)} sizes="40px" />
+                                                        )}
+                                                        {product.imageVariants?.webp && (
+                                                            <source type="image/webp" srcSet={withHost(product.imageVariants.webp)} sizes="40px" />
+                                                        )}
+                                                        <img
+                                                            src={`http://localhost:3001${product.imageUrl}`}
+                                                            alt={product.name}
+                                                            width={40}
+                                                            height={40}
+                                                            loading="lazy"
+                                                            decoding="async"
+                                                        />
+                                                    </picture>
                                                 ) : (
                                                     <div className="image-placeholder">
                                                         <svg viewBox="0 0 24 24" fill="none" stroke="currentColor" strokeWidth="2" width="20" height="20">
@@ -440,13 +460,13 @@ export default function Products() {
                         </div>
                         <form onSubmit={handleImport}>
                             <div className="modal-body">
-                                <p className="mb-4">Select a CSV file to import products. The CSV should have headers: <code>name, sku, category, price, costPrice, quantity, description</code></p>
+                                <p className="mb-4">Select a CSV file to import products. The CSV should have headers: <code>name, sku, category, price, costPrice, quantity, description</code>. Rows with an existing SKU update that product.</p>
                                 <div className="form-group">
                                     <label className="form-label">CSV File</label>
                                     <input
                                         type="file"
                                         className="form-input"
-                                        accept=".csv"
+                                        accept=".csv,.gz"
                                         onChange={(e) => setImportFile(e.target.files?.[0] || null)}
                                         required
                                     />
@@ -78,7 +78,7 @@ export default function SystemBackup() {
                             <input
                                 type="file"
                                 className="form-input"
-                                accept=".json"
+                                accept=".json,.gz"
                                 onChange={(e) => setImportFile(e.target.files?.[0] || null)}
                                 required
                             />
@@ -29,7 +29,7 @@ interface Purchase {
 }
 
 export default function Purchases() {
-    const { state, refreshData, importData } = useApp();
+    const { state, importData } = useApp();
     const [purchases, setPurchases] = useState<Purchase[]>([]);
     const [suppliers, setSuppliers] = useState<Supplier[]>([]);
     const [loading, setLoading] = useState(true);
@@ -96,7 +96,6 @@ export default function Purchases() {
 
         try {
             const purchase = {
-                invoiceNumber: `PO-${Date.now()}`,
                 supplier: selectedSupplier,
                 status: 'received',
                 subtotal: calculateTotal(),
@@ -106,7 +105,6 @@ export default function Purchases() {
             };
             await purchasesApi.create(purchase);
             await loadData();
-            await refreshData(); // Refresh products to show updated stock
             closeModal();
         } catch (error) {
             console.error('Failed to create purchase:', error);
@@ -398,7 +396,7 @@ export default function Purchases() {
                                     <input
                                         type="file"
                                         className="form-input"
-                                        accept=".csv"
+                                        accept=".csv,.gz"
                                         onChange={(e) => setImportFile(e.target.files?.[0] || null)}
                                         required
                                     />
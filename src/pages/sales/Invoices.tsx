@@ -1,6 +1,7 @@
 import { useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useApp } from '../../context/AppContext';
+import { invoicesApi } from '../../services/api';
 import type { Invoice } from '../../types';
 import InvoicePrint from '../../components/sales/InvoicePrint';
 import html2pdf from 'html2pdf.js';
@@ -51,9 +52,25 @@ export default function Invoices() {
         setViewingInvoice(null);
     };
 
-    const handleDownloadPDF = () => {
+    const handleDownloadPDF = async () => {
+        if (!viewingInvoice) return;
+
+        // Prefer the server renderer; fall back to rendering in the browser
+        try {
+            const blob = await invoicesApi.pdf(viewingInvoice.id, printTemplate);
+            const url = URL.createObjectURL(blob);
+            const link = document.createElement('a');
+            link.href = url;
+            link.download = `Invoice-${viewingInvoice.invoiceNumber}.pdf`;
+            link.click();
+            setTimeout(() => URL.revokeObjectURL(url), 1000);
+            return;
+        } catch (error) {
+            console.warn('Server PDF unavailable, rendering in browser:', error);
+        }
+
         const element = document.getElementById('print-root');
-        if (!element || !viewingInvoice) return;
+        if (!element) return;
 
         const opt = {
             margin: 0,
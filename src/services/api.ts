@@ -1,11 +1,17 @@
 const API_BASE = 'https://system.ihome-store.com/api';
 
+// Last GET response per endpoint, revalidated with If-None-Match
+const etagCache = new Map<string, { etag: string; data: unknown }>();
+
 // Generic fetch helper
 async function fetchApi<T>(endpoint: string, options?: RequestInit): Promise<T> {
     const token = localStorage.getItem('token');
+    const isGet = !options?.method || options.method.toUpperCase() === 'GET';
+    const cached = isGet ? etagCache.get(endpoint) : undefined;
 
     const headers: Record<string, string> = {
         ...(token ? { 'Authorization': `Bearer ${token}` } : {}),
+        ...(cached ? { 'If-None-Match': cached.etag } : {}),
         ...options?.headers as any,
     };
 
@@ -19,6 +25,11 @@ async function fetchApi<T>(endpoint: string, options?: RequestInit): Promise<T>
         headers: headers,
     });
 
+    // Unchanged since our last fetch: reuse the cached body
+    if (response.status === 304 && cached) {
+        return cached.data as T;
+    }
+
     if (!response.ok) {
         const error = await response.json().catch(() => ({ error: 'Request failed' }));
         throw new Error(error.error || 'Request failed');
@@ -28,7 +39,31 @@ async function fetchApi<T>(endpoint: string, options?: RequestInit): Promise<T>
         return {} as T;
     }
 
-    return response.json();
+    const data = await response.json();
+    const etag = isGet ? response.headers.get('ETag') : null;
+    if (etag) {
+        etagCache.set(endpoint, { etag, data });
+    }
+    return data;
+}
+
+// Binary downloads (PDF, zip)
+async function fetchBlob(endpoint: string, options?: RequestInit): Promise<Blob> {
+    const token = localStorage.getItem('token');
+    const response = await fetch(`${API_BASE}${endpoint}`, {
+        ...options,
+        headers: {
+            ...(token ? { 'Authorization': `Bearer ${token}` } : {}),
+            ...(options?.body ? { 'Content-Type': 'application/json' } : {}),
+            ...options?.headers as any,
+        },
+    });
+
+    if (!response.ok) {
+        const error = await response.json().catch(() => ({ error: 'Request failed' }));
+        throw new Error(error.error || 'Request failed');
+    }
+    return response.blob();
 }
 
 // Products API
@@ -68,6 +103,9 @@ export const invoicesApi = {
     create: (data: any) => fetchApi<any>('/invoices', { method: 'POST', body: JSON.stringify(data) }),
     update: (id: string, data: any) => fetchApi<any>(`/invoices/${id}`, { method: 'PUT', body: JSON.stringify(data) }),
     delete: (id: string) => fetchApi<void>(`/invoices/${id}`, { method: 'DELETE' }),
+    // Server-rendered PDFs: one invoice, or many as a zip
+    pdf: (id: string, template = 'standard') => fetchBlob(`/invoices/${id}/pdf?template=${template}`),
+    pdfBatch: (ids: string[], template = 'standard') => fetchBlob('/invoices/pdf', { method: 'POST', body: JSON.stringify({ ids, template }) }),
 };
 
 // Expenses API
@@ -93,6 +131,7 @@ export const suppliersApi = {
 export const purchasesApi = {
     getAll: () => fetchApi<any[]>('/purchases'),
     create: (data: any) => fetchApi<any>('/purchases', { method: 'POST', body: JSON.stringify(data) }),
+    updateStatus: (id: string, status: string) => fetchApi<any>(`/purchases/${id}/status`, { method: 'PATCH', body: JSON.stringify({ status }) }),
     delete: (id: string) => fetchApi<void>(`/purchases/${id}`, { method: 'DELETE' }),
     importData: (formData: FormData) => fetchApi<any>('/purchases/import', { method: 'POST', body: formData }),
 };
@@ -103,6 +142,49 @@ export const systemApi = {
     importDb: (formData: FormData) => fetchApi<any>('/system/import', { method: 'POST', body: formData }),
 };
 
+// Background import jobs
+export const jobsApi = {
+    get: (id: string) => fetchApi<any>(`/jobs/${id}`),
+    // Poll until the job has finished; resolves with the final job status
+    wait: async (id: string, intervalMs = 1000) => {
+        for (;;) {
+            const job = await fetchApi<any>(`/jobs/${id}`);
+            if (job.status === 'completed' || job.status === 'failed') {
+                return job;
+            }
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+        }
+    },
+};
+
+// Live change feed (Server-Sent Events)
+export const eventsApi = {
+    subscribe: (onEvent: (event: { type: string; payload: any }) => void, onReconnect?: () => void) => {
+        const source = new EventSource(`${API_BASE}/events`);
+        let disconnected = false;
+
+        source.onmessage = (message) => {
+            try {
+                onEvent(JSON.parse(message.data));
+            } catch (err) {
+                console.error('Invalid change event:', err);
+            }
+        };
+        source.onerror = () => {
+            disconnected = true;
+        };
+        source.onopen = () => {
+            // Events published while we were offline are lost, so resync once
+            if (disconnected) {
+                disconnected = false;
+                onReconnect?.();
+            }
+        };
+
+        return () => source.close();
+    },
+};
+
 // Health check
 export const healthApi = {
     check: () => fetchApi<{ status: string; timestamp: string }>('/health'),
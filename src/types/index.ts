@@ -12,6 +12,7 @@ export interface Product {
   createdAt: string;
   updatedAt: string;
   imageUrl?: string;
+  imageVariants?: { avif?: string; webp?: string }; // srcset per format
 }
 
 // Customer
@@ -98,7 +99,7 @@ export type AppAction =
   | { type: 'ADD_INVOICE'; payload: Invoice }
   | { type: 'UPDATE_INVOICE'; payload: Invoice }
   | { type: 'DELETE_INVOICE'; payload: string }
-  | { type: 'CONVERT_TO_INVOICE'; payload: string }
+  | { type: 'CONVERT_TO_INVOICE'; payload: { id: string; invoiceNumber: string } }
   // Expenses
   | { type: 'ADD_EXPENSE'; payload: Expense }
   | { type: 'UPDATE_EXPENSE'; payload: Expense }
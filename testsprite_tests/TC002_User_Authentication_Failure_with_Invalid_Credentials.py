@@ -1,86 +1,39 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
+import ui
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+    async with ui.new_page() as page:
+        await ui.open(page)
         
         # Interact with the page elements to simulate user flow
         # -> Input invalid username and password and submit login form
-        frame = context.pages[-1]
+        frame = page
         # Input invalid username
         elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('invalidUser')
+        await ui.fill(elem, 'invalidUser')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input invalid password
         elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('invalidPass')
+        await ui.fill(elem, 'invalidPass')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click Sign In button to submit login request
         elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
+        frame = page
         await expect(frame.locator('text=Welcome Back').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Sign in to continue').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Username').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Password').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Sign In').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    ui.run(run_test)
@@ -1,181 +1,76 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
+import ui
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+    async with ui.new_page(authenticated=True) as page:
+        await ui.open(page)
         
         # Interact with the page elements to simulate user flow
-        # -> Input username and password, then click Sign In button
-        frame = context.pages[-1]
-        # Input username admin
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
-        
-
-        frame = context.pages[-1]
-        # Input password admin123
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click Sign In button to login
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input password and click Sign In button again
-        frame = context.pages[-1]
-        # Input password admin123
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Try clicking username field to focus, then send keys to input username 'admin', then input password 'admin123' similarly, then click Sign In button
-        frame = context.pages[-1]
-        # Click username input field to focus
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1]
-        # Click password input field to focus
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Click on Products menu to go to Products page
-        frame = context.pages[-1]
+        frame = page
         # Click on Products menu to navigate to Products page
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click Add Product button to open product creation form
-        frame = context.pages[-1]
+        frame = page
         # Click Add Product button to open product creation form
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Scroll down slightly to ensure 'Add Product' button is fully visible and not overlapped, then retry clicking 'Add Product' button
         await page.mouse.wheel(0, 200)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Retry clicking 'Add Product' button to open product creation form
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Try to click Unit dropdown (index 158) to open options, then click the option 'Pieces' from the dropdown list, then continue filling remaining fields and submit the form.
-        frame = context.pages[-1]
+        frame = page
         # Click Unit dropdown to open options
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/table/tbody/tr[72]/td[8]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click 'Pieces' option from Unit dropdown
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/table/tbody/tr[82]/td[8]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click 'Add Product' button to open product creation form again
-        frame = context.pages[-1]
+        frame = page
         # Click 'Add Product' button to open product creation form
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Fill required fields: Product Name, SKU, Category, Selling Price; fill optional fields: Unit, Cost Price, Initial Stock Quantity, Description; then click Add Product button
-        frame = context.pages[-1]
+        frame = page
         # Input Product Name
         elem = frame.locator('xpath=html/body/div/div/main/div/div[4]/div/form/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test Product 002')
+        await ui.fill(elem, 'Test Product 002')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input SKU
         elem = frame.locator('xpath=html/body/div/div/main/div/div[4]/div/form/div/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TP002')
+        await ui.fill(elem, 'TP002')
         
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
+        frame = page
         try:
             await expect(frame.locator('text=Product creation failed due to missing required fields').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: The product creation test did not pass as expected. The test plan requires verifying successful product creation with HTTP status 201 and correct product details, but the test plan execution has failed.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    ui.run(run_test)
@@ -1,173 +1,73 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
+import ui
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+    async with ui.new_page(authenticated=True) as page:
+        await ui.open(page)
         
         # Interact with the page elements to simulate user flow
-        # -> Retry clicking the Sign In button to log in.
-        frame = context.pages[-1]
-        # Retry clicking Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input password 'admin123' again and click Sign In button to complete login.
-        frame = context.pages[-1]
-        # Input password 'admin123'
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Try to focus/click on username field (index 2) before inputting text or try clearing and inputting username again.
-        frame = context.pages[-1]
-        # Click username input field to focus
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1]
-        # Input username 'admin' after focusing username field
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
-        
-
-        # -> Click the Sign In button (index 4) to log in.
-        frame = context.pages[-1]
-        # Click Sign In button to log in
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input password 'admin123' into password field (index 3) and click Sign In button (index 4) to log in.
-        frame = context.pages[-1]
-        # Input password 'admin123'
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Click on 'Products' tab to navigate to the product management page.
-        frame = context.pages[-1]
+        frame = page
         # Click on 'Products' tab to go to product management page
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click 'Add Product' button to start creating a new product for testing.
-        frame = context.pages[-1]
+        frame = page
         # Click 'Add Product' button to create a new product
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Fill in product details: name, SKU, category, unit, selling price, cost price, initial stock quantity, and description, then submit the form.
-        frame = context.pages[-1]
+        frame = page
         # Input product name
         elem = frame.locator('xpath=html/body/div/div/main/div/div[4]/div/form/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test Product')
+        await ui.fill(elem, 'Test Product')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input SKU
         elem = frame.locator('xpath=html/body/div/div/main/div/div[4]/div/form/div/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TP-001')
+        await ui.fill(elem, 'TP-001')
         
 
         # -> Click 'Add Product' button again to reopen the product creation modal and retry filling product details with a valid category selection.
-        frame = context.pages[-1]
+        frame = page
         # Click 'Add Product' button to reopen product creation modal
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Fill in product details: product name, SKU, select category 'Electronics', select unit 'Pieces', selling price, cost price, initial stock quantity, description, then submit the form.
-        frame = context.pages[-1]
+        frame = page
         # Input product name
         elem = frame.locator('xpath=html/body/div/div/main/div/div[4]/div/form/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test Product')
+        await ui.fill(elem, 'Test Product')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input SKU
         elem = frame.locator('xpath=html/body/div/div/main/div/div[4]/div/form/div/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TP-001')
+        await ui.fill(elem, 'TP-001')
         
 
         # -> Click Edit button for the newly created product 'Test Product' to update its details.
-        frame = context.pages[-1]
+        frame = page
         # Click Edit button for 'Test Product' to update details
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/table/tbody/tr[71]/td[8]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
+        frame = page
         try:
             await expect(frame.locator('text=Update Failed: Product details not saved').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: The product update process did not complete successfully as per the test plan. The updated product details including price, description, and quantity were not reflected in subsequent fetch requests.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    ui.run(run_test)
@@ -1,163 +1,71 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
+import ui
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+    async with ui.new_page(authenticated=True) as page:
+        await ui.open(page)
         
         # Interact with the page elements to simulate user flow
-        # -> Input username and password, then click Sign In button to log in
-        frame = context.pages[-1]
-        # Input username admin
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
-        
-
-        frame = context.pages[-1]
-        # Input password admin123
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Create a product for deletion
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input username and password, then click Sign In button to log in
-        frame = context.pages[-1]
-        # Input username admin
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
-        
-
-        frame = context.pages[-1]
-        # Input password admin123
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Click on 'Products' link in the navigation menu to navigate to the products management page
-        frame = context.pages[-1]
+        frame = page
         # Click on Products link in the navigation menu
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click on 'Add Product' button to create a new product for deletion
-        frame = context.pages[-1]
+        frame = page
         # Click on Add Product button
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click on 'Add Product' button to open the product creation form
-        frame = context.pages[-1]
+        frame = page
         # Click on Add Product button
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Fill in the product details in the 'Add New Product' form and submit to create the product
-        frame = context.pages[-1]
+        frame = page
         # Input product name
         elem = frame.locator('xpath=html/body/div/div/main/div/div[4]/div/form/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test Product for Deletion')
+        await ui.fill(elem, 'Test Product for Deletion')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input SKU
         elem = frame.locator('xpath=html/body/div/div/main/div/div[4]/div/form/div/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TPDEL-001')
+        await ui.fill(elem, 'TPDEL-001')
         
 
         # -> Delete a product and verify deletion by checking for 404 on subsequent GET request
-        frame = context.pages[-1]
+        frame = page
         # Click Delete button for product 'ALEXA ECHO DOT' to delete it
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/table/tbody/tr[71]/td[8]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Scroll to the product 'Test Product for Invoice' to ensure it is visible and then click its Delete button
-        frame = context.pages[-1]
+        frame = page
         # Click Delete button for 'Test Product for Invoice'
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/table/tbody/tr/td[8]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click Confirm button to finalize deletion of 'Test Product for Invoice'
-        frame = context.pages[-1]
+        frame = page
         # Click Confirm button to finalize product deletion
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/table/tbody/tr/td[8]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
+        frame = page
         await expect(frame.locator('text=Test Product for Deletion').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    ui.run(run_test)
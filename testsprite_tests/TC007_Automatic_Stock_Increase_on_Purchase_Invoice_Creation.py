@@ -1,149 +1,83 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
+import ui
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+    async with ui.new_page(authenticated=True) as page:
+        await ui.open(page)
         
         # Interact with the page elements to simulate user flow
-        # -> Try inputting password again or try alternative input method for password field.
-        frame = context.pages[-1]
-        # Retry input password admin123
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        frame = context.pages[-1]
-        # Input username admin
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
-        
-
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Navigate to Products page to record current stock quantity for a product.
-        frame = context.pages[-1]
+        frame = page
         # Click on Products in the navigation menu
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Navigate to Purchase Invoices page to create a new purchase invoice.
-        frame = context.pages[-1]
+        frame = page
         # Click on Purchase Invoices in the navigation menu
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[4]/div/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Try alternative navigation to Purchase Invoices page or scroll to reveal the link and click it.
         await page.mouse.wheel(0, 300)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click on Purchase Invoices in the navigation menu after scrolling
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[4]/div/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click + New Purchase button to start creating a new purchase invoice.
-        frame = context.pages[-1]
+        frame = page
         # Click + New Purchase button
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click + New Purchase button again to reopen the modal and verify presence of + Add Product button or try alternative ways to add product.
-        frame = context.pages[-1]
+        frame = page
         # Click + New Purchase button to reopen modal
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click + Add Product button to add product to the purchase invoice.
-        frame = context.pages[-1]
+        frame = page
         # Click + Add Product button
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[2]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Select 'Test Product for Invoice' from product dropdown and input purchase quantity 5.
-        frame = context.pages[-1]
+        frame = page
         # Input purchase quantity 5
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[2]/table/tbody/tr/td[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('5')
+        await ui.fill(elem, '5')
         
 
         # -> Click 'Create Purchase' button to submit the purchase invoice and verify creation.
-        frame = context.pages[-1]
+        frame = page
         # Click Create Purchase button to submit purchase invoice
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/table/tbody/tr[18]/td[7]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Navigate to Products page and fetch product details for 'Test Product for Invoice' to verify stock quantity increased by 5.
-        frame = context.pages[-1]
+        frame = page
         # Click on Products in the navigation menu
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
+        frame = page
         await expect(frame.locator('text=Test Product for Invoice').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=105 pcs').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    ui.run(run_test)
@@ -1,126 +1,59 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
+import ui
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+    async with ui.new_page(authenticated=True) as page:
+        await ui.open(page)
         
         # Interact with the page elements to simulate user flow
-        # -> Input username and password using correct input indexes, then click Sign In button
-        frame = context.pages[-1]
-        # Input the username 'admin'
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
-        
-
-        # -> Input password and click Sign In button
-        frame = context.pages[-1]
-        # Input the password 'admin123'
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        frame = context.pages[-1]
-        # Click the Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Click on 'Purchase Invoices' to navigate to the purchase invoices page
-        frame = context.pages[-1]
+        frame = page
         # Click on 'Purchase Invoices' in the navigation menu
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[4]/div/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click '+ New Purchase' button at index 14 to create a new purchase invoice
-        frame = context.pages[-1]
+        frame = page
         # Click '+ New Purchase' button to create a new purchase invoice
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Select a supplier from dropdown to proceed with purchase invoice creation
-        frame = context.pages[-1]
+        frame = page
         # Click supplier dropdown to select a supplier
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div/select').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Select a supplier from the dropdown list to proceed with purchase invoice creation
-        frame = context.pages[-1]
+        frame = page
         # Select supplier 'شركة الصالح' from dropdown
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div/select').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click the delete button for the newly created purchase invoice to delete it
-        frame = context.pages[-1]
+        frame = page
         # Click Delete Purchase button for the first purchase invoice in the list
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/table/tbody/tr/td[7]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click on 'Products' tab in the navigation menu to navigate to the Products page
-        frame = context.pages[-1]
+        frame = page
         # Click on 'Products' tab in the navigation menu
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
+        frame = page
         await expect(frame.locator('text=⏳').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Loading iHome System...').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    ui.run(run_test)
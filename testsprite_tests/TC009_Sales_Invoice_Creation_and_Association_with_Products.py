@@ -1,182 +1,109 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
+import ui
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+    async with ui.new_page(authenticated=True) as page:
+        await ui.open(page)
         
         # Interact with the page elements to simulate user flow
-        # -> Click the Sign In button to attempt login
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Re-input username and password correctly and click Sign In button again
-        frame = context.pages[-1]
-        # Input username admin
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
-        
-
-        frame = context.pages[-1]
-        # Input password admin123
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Click on the 'Invoices' tab to start creating a new sales invoice.
-        frame = context.pages[-1]
+        frame = page
         # Click on the 'Invoices' tab in the sidebar to navigate to sales invoices page
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[5]/div/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click the 'New Invoice' button to start creating a new sales invoice.
-        frame = context.pages[-1]
+        frame = page
         # Click the 'New Invoice' button to open the invoice creation form
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Input quantity for the first product line item using the correct input element index, then add the line item.
-        frame = context.pages[-1]
+        frame = page
         # Input quantity 2 for first product line item
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div[2]/div/div/div[4]/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('2')
+        await ui.fill(elem, '2')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input discount 0 for first product line item
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('0')
+        await ui.fill(elem, '0')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click Add button to add first product line item
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div[5]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Input customer name and phone number, add two different products with quantities and discounts, add them as line items, then save the invoice.
-        frame = context.pages[-1]
+        frame = page
         # Input customer name as 'Test Customer'
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div/div[2]/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test Customer')
+        await ui.fill(elem, 'Test Customer')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input phone number for customer
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div/div[2]/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1234567890')
+        await ui.fill(elem, '1234567890')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input quantity 2 for first product
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('2')
+        await ui.fill(elem, '2')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input discount 0 for first product
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('0')
+        await ui.fill(elem, '0')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click Add button to add first product line item
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div[5]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Select second product, input quantity and discount, add second line item, then save the invoice and verify details.
-        frame = context.pages[-1]
+        frame = page
         # Input quantity 1 for second product
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1')
+        await ui.fill(elem, '1')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input discount 0 for second product
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('0')
+        await ui.fill(elem, '0')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click Add button to add second product line item
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div[5]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click the 'Create Invoice' button to save the invoice and verify the response and invoice details.
-        frame = context.pages[-1]
+        frame = page
         # Click the 'Create Invoice' button to save the invoice
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
+        frame = page
         try:
             await expect(frame.locator('text=Invoice Creation Successful').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: Sales invoice creation with multiple line items did not complete successfully as expected according to the test plan.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    ui.run(run_test)
@@ -1,224 +1,151 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
+import ui
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+    async with ui.new_page(authenticated=True) as page:
+        await ui.open(page)
         
         # Interact with the page elements to simulate user flow
-        # -> Click Sign In button to log in
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input username and password, then click Sign In button to log in
-        frame = context.pages[-1]
-        # Input username admin
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
-        
-
-        frame = context.pages[-1]
-        # Input password admin123
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Click on 'Invoices' link in the left menu to go to the sales invoices page
-        frame = context.pages[-1]
+        frame = page
         # Click on 'Invoices' link in the left menu
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[5]/div/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Try to scroll to 'Invoices' link and click again or find alternative navigation to sales invoices
         await page.mouse.wheel(0, 200)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click on 'Invoices' link in the left menu after scrolling
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[5]/div/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click 'New Invoice' button to create a new sales invoice for testing
-        frame = context.pages[-1]
+        frame = page
         # Click 'New Invoice' button to create a new sales invoice
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Input customer name, select product, set quantity, and add item to invoice
-        frame = context.pages[-1]
+        frame = page
         # Input customer name for new invoice
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div/div[2]/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test Customer')
+        await ui.fill(elem, 'Test Customer')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Open product dropdown to select product
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div/select').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click 'Add' button to add product to invoice items, then click 'Create Invoice' to save the invoice
-        frame = context.pages[-1]
+        frame = page
         # Click 'Add' button to add product to invoice items
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div[5]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click 'Create Invoice' button to save the new invoice
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click 'Create Invoice' button to save the new invoice
-        frame = context.pages[-1]
+        frame = page
         # Click 'Create Invoice' button to save the new invoice
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Input customer name, select product, set quantity, add item to invoice, and create invoice
-        frame = context.pages[-1]
+        frame = page
         # Input customer name for new invoice
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div/div[2]/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test Customer')
+        await ui.fill(elem, 'Test Customer')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Open product dropdown to select product
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div/select').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Set quantity to 1 for the product
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click Add button to add product to invoice items
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div[5]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click Create Invoice button to save the new invoice
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click 'Create Invoice' button to save the new invoice
-        frame = context.pages[-1]
+        frame = page
         # Click 'Create Invoice' button to save the new invoice
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Input customer name, select product, set quantity, add item to invoice, and create invoice
-        frame = context.pages[-1]
+        frame = page
         # Input customer name for new invoice
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div/div[2]/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test Customer')
+        await ui.fill(elem, 'Test Customer')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Open product dropdown to select product
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div/select').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Select first product from dropdown
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div/div[2]/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Set quantity to 1 for the product
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1')
+        await ui.fill(elem, '1')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click Add button to add product to invoice items
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div/div[2]/div[2]/div/div[5]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click Create Invoice button to save the new invoice
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
+        frame = page
         try:
             await expect(frame.locator('text=Invoice deletion successful').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: The sales invoice deletion did not complete as expected. The invoice record was not removed or stock levels may have been affected negatively.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    ui.run(run_test)
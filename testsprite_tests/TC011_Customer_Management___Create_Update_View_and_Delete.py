@@ -1,157 +1,91 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
+import ui
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+    async with ui.new_page(authenticated=True) as page:
+        await ui.open(page)
         
         # Interact with the page elements to simulate user flow
-        # -> Input username and password and click Sign In button to log in
-        frame = context.pages[-1]
-        # Input username admin
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
-        
-
-        frame = context.pages[-1]
-        # Input password admin123
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Click on the Customers tab to start creating a new customer
-        frame = context.pages[-1]
+        frame = page
         # Click on Customers tab
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[3]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click on '+ Add Customer' button to open the new customer creation form
-        frame = context.pages[-1]
+        frame = page
         # Click on + Add Customer button
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Fill in the new customer details and submit the form to create the customer
-        frame = context.pages[-1]
+        frame = page
         # Input Full Name as Test User
         elem = frame.locator('xpath=html/body/div/div/main/div/div[4]/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test User')
+        await ui.fill(elem, 'Test User')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input Email as testuser@example.com
         elem = frame.locator('xpath=html/body/div/div/main/div/div[4]/div/form/div[3]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
+        await ui.fill(elem, 'testuser@example.com')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input Phone as 1234567890
         elem = frame.locator('xpath=html/body/div/div/main/div/div[4]/div/form/div[3]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1234567890')
+        await ui.fill(elem, '1234567890')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input Address as 123 Test Address, Test City
         elem = frame.locator('xpath=html/body/div/div/main/div/div[4]/div/form/div[4]/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123 Test Address, Test City')
+        await ui.fill(elem, '123 Test Address, Test City')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click Add Customer button to submit the form
         elem = frame.locator('xpath=html/body/div/div/main/div/div[4]/div/form/div[5]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click Edit button for 'Test User' to update customer details
-        frame = context.pages[-1]
+        frame = page
         # Click Edit button for Test User
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/table/tbody/tr[3]/td[6]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Update the email field and submit the form to update the customer
-        frame = context.pages[-1]
+        frame = page
         # Update Email to updateduser@example.com
         elem = frame.locator('xpath=html/body/div/div/main/div/div[4]/div/form/div[3]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('updateduser@example.com')
+        await ui.fill(elem, 'updateduser@example.com')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click Update Customer button to submit changes
         elem = frame.locator('xpath=html/body/div/div/main/div/div[4]/div/form/div[5]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click Edit button for 'Test User' to fetch detailed customer info including purchase history
-        frame = context.pages[-1]
+        frame = page
         # Click Edit button for Test User to fetch details
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/table/tbody/tr[3]/td[6]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
+        frame = page
         try:
             await expect(frame.locator('text=Customer Creation Successful').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test plan execution failed: Customer creation, update, fetch (including purchase history), and deletion did not complete successfully with expected HTTP status codes.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    ui.run(run_test)
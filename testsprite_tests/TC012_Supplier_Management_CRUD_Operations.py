@@ -1,170 +1,91 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
+import ui
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+    async with ui.new_page(authenticated=True) as page:
+        await ui.open(page)
         
         # Interact with the page elements to simulate user flow
-        # -> Input username and password, then click Sign In button to log in.
-        frame = context.pages[-1]
-        # Input username 'admin'
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
-        
-
-        frame = context.pages[-1]
-        # Input password 'admin123'
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        # -> Retry login by inputting username and password again and clicking Sign In.
-        frame = context.pages[-1]
-        # Re-input username 'admin'
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
-        
-
-        frame = context.pages[-1]
-        # Re-input password 'admin123'
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        frame = context.pages[-1]
-        # Click Sign In button again
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Click on the 'Suppliers' tab to navigate to the suppliers management page.
-        frame = context.pages[-1]
+        frame = page
         # Click on Suppliers tab
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[4]/div/ul/li/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click '+ Add Supplier' button to open the supplier creation form.
-        frame = context.pages[-1]
+        frame = page
         # Click '+ Add Supplier' button
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Fill in supplier name, email, phone, and address fields, then click 'Add Supplier' button to create new supplier.
-        frame = context.pages[-1]
+        frame = page
         # Input supplier name
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test Supplier')
+        await ui.fill(elem, 'Test Supplier')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input supplier email
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('test@supplier.com')
+        await ui.fill(elem, 'test@supplier.com')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input supplier phone
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1234567890')
+        await ui.fill(elem, '1234567890')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input supplier address
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[3]/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123 Test Address, Test City')
+        await ui.fill(elem, '123 Test Address, Test City')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click 'Add Supplier' button to submit form
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[4]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click the 'Edit Supplier' button for 'Test Supplier' to open the update form.
-        frame = context.pages[-1]
+        frame = page
         # Click 'Edit Supplier' button for 'Test Supplier'
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/table/tbody/tr[5]/td[4]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Update the phone number field and click 'Update Supplier' button to save changes.
-        frame = context.pages[-1]
+        frame = page
         # Update phone number to '1234567890'
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1234567890')
+        await ui.fill(elem, '1234567890')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click 'Update Supplier' button to save changes
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[4]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click the 'Delete Supplier' button for 'Test Supplier' to delete the supplier.
-        frame = context.pages[-1]
+        frame = page
         # Click 'Delete Supplier' button for 'Test Supplier'
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/table/tbody/tr[5]/td[4]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
+        frame = page
         try:
             await expect(frame.locator('text=Supplier creation successful').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: Full CRUD functionality for suppliers did not complete successfully as expected. The test plan execution failed to verify creation, update, retrieval, and deletion with correct status codes.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    ui.run(run_test)
@@ -1,170 +1,104 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
+import ui
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+    async with ui.new_page(authenticated=True) as page:
+        await ui.open(page)
         
         # Interact with the page elements to simulate user flow
-        # -> Input username and password, then click Sign In button to authenticate
-        frame = context.pages[-1]
-        # Input username 'admin'
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
-        
-
-        frame = context.pages[-1]
-        # Input password 'admin123'
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Click on 'Users' tab under Admin section to manage users
-        frame = context.pages[-1]
+        frame = page
         # Click on 'Users' tab under Admin section
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[9]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click 'New User' button to open user creation form
-        frame = context.pages[-1]
+        frame = page
         # Click 'New User' button to create a new user
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Fill Full Name, Username, Password, select Role, and click Save User button
-        frame = context.pages[-1]
+        frame = page
         # Input Full Name as 'Test User'
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test User')
+        await ui.fill(elem, 'Test User')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input Username as 'testuser'
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser')
+        await ui.fill(elem, 'testuser')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input Password as 'TestPass123!'
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPass123!')
+        await ui.fill(elem, 'TestPass123!')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click Save User button to create user
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[5]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click 'Edit' button for 'Test User' to update user details and role
-        frame = context.pages[-1]
+        frame = page
         # Click 'Edit' button for 'Test User'
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/table/tbody/tr[2]/td[4]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Change the role to a different one (if available), update Full Name, leave password blank, and save the user
-        frame = context.pages[-1]
+        frame = page
         # Update Full Name to 'Test User Updated'
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test User Updated')
+        await ui.fill(elem, 'Test User Updated')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Leave Password blank to keep current password
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
+        await ui.fill(elem, '')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click Save User button to save updates
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[5]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click 'Delete' button for 'Test User Updated' to delete the user
-        frame = context.pages[-1]
+        frame = page
         # Click 'Delete' button for 'Test User Updated'
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/table/tbody/tr[2]/td[4]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Try refreshing the page to reload the user list and then attempt to delete the user again
-        frame = context.pages[-1]
+        frame = page
         # Click 'Users' tab to refresh the users list page
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[9]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Try clicking 'Delete' button for 'Test User Updated' again after refresh
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/table/tbody/tr[2]/td[4]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
+        frame = page
         try:
             await expect(frame.locator('text=User creation and update successful').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test plan execution failed: User creation, update, fetch, and deletion did not complete successfully with correct status codes and data integrity.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    ui.run(run_test)
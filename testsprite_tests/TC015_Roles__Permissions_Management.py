@@ -1,183 +1,116 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
+import ui
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+    async with ui.new_page(authenticated=True) as page:
+        await ui.open(page)
         
         # Interact with the page elements to simulate user flow
-        # -> Input username and password, then click Sign In button to log in.
-        frame = context.pages[-1]
-        # Input username 'admin'
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
-        
-
-        frame = context.pages[-1]
-        # Input password 'admin123'
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Click on 'Roles' link in the Admin section to proceed with permissions and roles testing.
-        frame = context.pages[-1]
+        frame = page
         # Click on 'Roles' link in the Admin section
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[10]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click 'New Role' button to open the role creation form and fetch permissions list.
-        frame = context.pages[-1]
+        frame = page
         # Click 'New Role' button to open role creation form
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click 'New Role' button to open the role creation form and then input role details and select permissions.
-        frame = context.pages[-1]
+        frame = page
         # Click 'New Role' button to open role creation form
         elem = frame.locator('xpath=html/body/div/div/main/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Input 'Test Role' into Role Name field (index 3), input description into Description field (index 4), select permissions at indexes 7, 13, 16, then click 'Save Role' button (index 20).
-        frame = context.pages[-1]
+        frame = page
         # Input role name 'Test Role'
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test Role')
+        await ui.fill(elem, 'Test Role')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Input role description
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Role for testing permissions assignment')
+        await ui.fill(elem, 'Role for testing permissions assignment')
         
 
-        frame = context.pages[-1]
+        frame = page
         # Select 'Add Products' permission checkbox
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[2]/div[2]/div/label[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Select 'Edit Customers' permission checkbox
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[2]/div[3]/div/label[4]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Select 'Create Invoice/Quote' permission checkbox
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[2]/div[4]/div/label[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click the 'Edit' button for the 'Test Role' to update its permissions.
-        frame = context.pages[-1]
+        frame = page
         # Click 'Edit' button for the 'Test Role' to update permissions
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/table/tbody/tr/td[4]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Toggle some permissions checkboxes to update the role's permissions, then click 'Save Role' button to save changes.
-        frame = context.pages[-1]
+        frame = page
         # Toggle 'Add Products' permission checkbox
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[2]/div[2]/div/label[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Toggle 'Edit Customers' permission checkbox
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[2]/div[3]/div/label[4]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Toggle 'Create Invoice/Quote' permission checkbox
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[2]/div[4]/div/label[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
-        frame = context.pages[-1]
+        frame = page
         # Click 'Save Role' button to save updated role permissions
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/div/form/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Delete the 'Test Role' from the Roles & Permissions list.
-        frame = context.pages[-1]
+        frame = page
         # Click 'Edit' button for the 'Test Role' to open edit form
         elem = frame.locator('xpath=html/body/div/div/main/div/div[2]/table/tbody/tr/td[4]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Refresh the Roles & Permissions page to verify if 'Test Role' exists, then proceed accordingly.
-        await page.goto('http://localhost:5173/admin/roles', timeout=10000)
-        await asyncio.sleep(3)
+        await ui.open(page, '/admin/roles')
         
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
+        frame = page
         await expect(frame.locator('text=Roles & Permissions').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=New Role').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Admin').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Full System Access').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=3 permissions').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Edit').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    ui.run(run_test)
@@ -1,145 +1,74 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
+import ui
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+    async with ui.new_page(authenticated=True) as page:
+        await ui.open(page)
         
         # Interact with the page elements to simulate user flow
-        # -> Input username and password, then click Sign In button.
-        frame = context.pages[-1]
-        # Input username admin
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin')
-        
-
-        frame = context.pages[-1]
-        # Input password admin123
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin123')
-        
-
-        frame = context.pages[-1]
-        # Click Sign In button
-        elem = frame.locator('xpath=html/body/div/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Click on Products link in the navigation menu to view product list.
-        frame = context.pages[-1]
+        frame = page
         # Click on Products link in the navigation menu
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Send PATCH request to /api/products/TPINV-001/stock with updated quantity.
-        await page.goto('http://localhost:5173/api/products/TPINV-001/stock', timeout=10000)
-        await asyncio.sleep(3)
+        await ui.open(page, '/api/products/TPINV-001/stock')
         
 
         # -> Send a proper PATCH request to /api/products/TPINV-001/stock with updated quantity using API testing method or UI if available.
-        await page.goto('http://localhost:5173/products', timeout=10000)
-        await asyncio.sleep(3)
+        await ui.open(page, '/products')
         
 
         # -> Send PATCH request to /api/products/TPINV-001/stock with updated quantity 150 and verify response and product stock update.
-        await page.goto('http://localhost:5173/api/products/TPINV-001/stock', timeout=10000)
-        await asyncio.sleep(3)
+        await ui.open(page, '/api/products/TPINV-001/stock')
         
 
         # -> Click on Products link to view product list and select a product to record current stock.
-        frame = context.pages[-1]
+        frame = page
         # Click on Products link in the navigation menu
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Click Edit button for 'Test Product for Invoice' to update stock quantity via UI or prepare for API PATCH request.
-        frame = context.pages[-1]
+        frame = page
         # Click Edit button for 'Test Product for Invoice' to update stock quantity
         elem = frame.locator('xpath=html/body/div/div/main/div/div[3]/table/tbody/tr/td[8]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Send PATCH request to /api/products/TPINV-001/stock with updated stock quantity 150 and verify response and product stock update.
-        await page.goto('http://localhost:5173/api/products/TPINV-001/stock', timeout=10000)
-        await asyncio.sleep(3)
+        await ui.open(page, '/api/products/TPINV-001/stock')
         
 
         # -> Click on Products link to view product list and select a product to update stock quantity.
-        frame = context.pages[-1]
+        frame = page
         # Click on Products link in the navigation menu
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # -> Send PATCH request to /api/products/TPINV-001/stock with updated quantity 150 and verify response and product stock update.
-        await page.goto('http://localhost:5173/api/products/TPINV-001/stock', timeout=10000)
-        await asyncio.sleep(3)
+        await ui.open(page, '/api/products/TPINV-001/stock')
         
 
         # -> Click on Products link to view product list and select a product to update stock quantity.
-        frame = context.pages[-1]
+        frame = page
         # Click on Products link in the navigation menu
         elem = frame.locator('xpath=html/body/div/div/aside/nav/ul/li[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui.click(elem)
         
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
+        frame = page
         try:
             await expect(frame.locator('text=Stock update successful').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test plan execution failed: Product stock quantities could not be updated independently using the dedicated stock update endpoint, or the changes did not reflect accurately.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    ui.run(run_test)
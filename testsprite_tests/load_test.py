@@ -0,0 +1,297 @@
+"""Load-test harness built on the TC00x API flows.
+
+Each virtual user logs in once (TC001/TC002), then keeps picking a weighted
+scenario until the run ends: catalog browsing (TC005/TC009/TC010), product
+creation and stock updates (TC003/TC004), sales invoices (TC006), purchases
+with stock update (TC007) and expenses (TC008). Users start spread over the
+ramp-up period.
+
+    python testsprite_tests/load_test.py --users 50 --ramp-up 30 --duration 120
+
+Reports throughput and p50/p95/p99 latency per endpoint; --json writes the same
+numbers for comparing runs. Needs aiohttp (pip install aiohttp).
+
+Invoices, purchases and expenses are deleted again by the scenario that
+created them. Products cannot be deleted through the API, so the handful the
+run creates keep a LOAD-<run id> SKU prefix.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+import aiohttp
+
+BASE_URL = os.environ.get('LOAD_BASE_URL', 'http://localhost:3001')
+USERNAME = 'admin'
+PASSWORD = 'admin123'
+TIMEOUT = 30
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)  # endpoint -> ms
+        self.errors = defaultdict(int)
+        self.scenarios = defaultdict(int)
+        self.started = None
+        self.finished = None
+
+    def record(self, endpoint, ms, ok):
+        self.latencies[endpoint].append(ms)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def summary(self):
+        seconds = max((self.finished or time.monotonic()) - self.started, 1e-9)
+        endpoints = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            ordered = sorted(values)
+            endpoints[endpoint] = {
+                'requests': len(ordered),
+                'errors': self.errors[endpoint],
+                'rps': len(ordered) / seconds,
+                'p50': percentile(ordered, 50),
+                'p95': percentile(ordered, 95),
+                'p99': percentile(ordered, 99),
+                'max': ordered[-1],
+            }
+        everything = sorted(v for values in self.latencies.values() for v in values)
+        return {
+            'seconds': seconds,
+            'requests': len(everything),
+            'errors': sum(self.errors.values()),
+            'rps': len(everything) / seconds,
+            'p50': percentile(everything, 50),
+            'p95': percentile(everything, 95),
+            'p99': percentile(everything, 99),
+            'scenarios': dict(self.scenarios),
+            'endpoints': endpoints,
+        }
+
+
+class Client:
+    """One virtual user's authenticated session; every request is timed"""
+
+    def __init__(self, session, stats, base_url):
+        self.session = session
+        self.stats = stats
+        self.base_url = base_url
+        self.headers = {}
+
+    async def call(self, method, path, endpoint=None, expect=(200, 201, 204, 304), **kwargs):
+        endpoint = endpoint or f'{method} {path}'
+        start = time.perf_counter()
+        try:
+            async with self.session.request(method, self.base_url + path, headers=self.headers, **kwargs) as resp:
+                body = await resp.read()
+                ok = resp.status in expect
+                data = json.loads(body) if body and resp.content_type == 'application/json' else None
+        except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError):
+            ok, data = False, None
+        self.stats.record(endpoint, (time.perf_counter() - start) * 1000, ok)
+        return data if ok else None
+
+    async def login(self):
+        data = await self.call('POST', '/api/auth/login', json={'username': USERNAME, 'password': PASSWORD})
+        if not data or not data.get('token'):
+            raise RuntimeError('Login failed; is the server running and the admin user seeded?')
+        self.headers = {'Authorization': f"Bearer {data['token']}"}
+        await self.call('GET', '/api/auth/me')
+
+
+# ---- Scenarios (TC00x flows) -------------------------------------------------
+
+async def browse_catalog(client, ctx):
+    """TC005/TC009/TC010: the lists every screen loads"""
+    await client.call('GET', '/api/products')
+    await client.call('GET', '/api/customers')
+    await client.call('GET', '/api/suppliers')
+    await client.call('GET', '/api/roles')
+
+
+async def browse_reports(client, ctx):
+    """Dashboard and reports: invoice, purchase and expense history"""
+    await client.call('GET', '/api/invoices')
+    await client.call('GET', '/api/purchases')
+    await client.call('GET', '/api/expenses')
+    await client.call('GET', '/api/expenses/categories')
+
+
+async def create_product(client, ctx):
+    """TC003/TC004: create a product, then count and adjust its stock"""
+    n = next(ctx['counter'])
+    product = await client.call('POST', '/api/products', json={
+        'name': f'Load test product {n}',
+        'sku': f"{ctx['prefix']}-P{n}",
+        'category': 'Load test',
+        'price': 50,
+        'costPrice': 30,
+        'quantity': 100,
+    })
+    if not product:
+        return
+    ctx['products'].append(product['id'])
+    await client.call('PATCH', f"/api/products/{product['id']}/stock", 'PATCH /api/products/:id/stock', json={'quantity': 120})
+    await client.call('PATCH', f"/api/products/{product['id']}/stock", 'PATCH /api/products/:id/stock', json={'delta': -5})
+    await client.call('GET', f"/api/products/{product['id']}", 'GET /api/products/:id')
+
+
+async def sales_invoice(client, ctx):
+    """TC006: paid invoice with line items (moves stock), read back, delete"""
+    picks = random.sample(ctx['products'], k=min(3, len(ctx['products'])))
+    items = [{'productId': pid, 'productName': 'Load test item', 'quantity': 1, 'unitPrice': 50, 'total': 50} for pid in picks]
+    invoice = await client.call('POST', '/api/invoices', json={
+        'customer': {'name': 'Load test customer'},
+        'type': 'invoice',
+        'status': 'paid',
+        'subtotal': 50 * len(items),
+        'total': 50 * len(items),
+        'items': items,
+    })
+    if not invoice:
+        return
+    await client.call('GET', f"/api/invoices/{invoice['id']}", 'GET /api/invoices/:id')
+    await client.call('DELETE', f"/api/invoices/{invoice['id']}", 'DELETE /api/invoices/:id')
+
+
+async def purchase(client, ctx):
+    """TC007: purchase invoice that adds stock, check the product, delete"""
+    product_id = random.choice(ctx['products'])
+    created = await client.call('POST', '/api/purchases', json={
+        'supplier': {'name': 'Load test supplier'},
+        'status': 'received',
+        'subtotal': 140,
+        'total': 140,
+        'items': [{'productId': product_id, 'productName': 'Load test item', 'quantity': 5, 'unitCost': 28, 'total': 140}],
+    })
+    if not created:
+        return
+    await client.call('GET', f'/api/products/{product_id}', 'GET /api/products/:id')
+    await client.call('DELETE', f"/api/purchases/{created['id']}", 'DELETE /api/purchases/:id')
+
+
+async def expense(client, ctx):
+    """TC008: expense against an existing category, then delete it"""
+    categories = await client.call('GET', '/api/expenses/categories') or []
+    created = await client.call('POST', '/api/expenses', json={
+        'categoryId': categories[0]['id'] if categories else None,
+        'amount': 12.5,
+        'description': f"{ctx['prefix']} expense",
+        'date': time.strftime('%Y-%m-%d'),
+    })
+    if created:
+        await client.call('DELETE', f"/api/expenses/{created['id']}", 'DELETE /api/expenses/:id')
+
+
+# name -> (weight, scenario); reads dominate, as on the shop floor
+SCENARIOS = {
+    'browse_catalog': (30, browse_catalog),
+    'browse_reports': (15, browse_reports),
+    'sales_invoice': (30, sales_invoice),
+    'purchase': (10, purchase),
+    'expense': (10, expense),
+    'create_product': (5, create_product),
+}
+
+
+def parse_weights(text):
+    """'sales_invoice=50,browse_catalog=10' overrides the default weights"""
+    weights = {name: weight for name, (weight, _) in SCENARIOS.items()}
+    for part in filter(None, (text or '').split(',')):
+        name, _, value = part.partition('=')
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'; choose from {', '.join(SCENARIOS)}")
+        weights[name] = float(value)
+    return weights
+
+
+async def virtual_user(index, args, session, stats, ctx, weights, deadline):
+    await asyncio.sleep(args.ramp_up * index / max(args.users, 1))
+    client = Client(session, stats, args.base_url)
+    try:
+        await client.login()
+    except RuntimeError:
+        return
+    names = [n for n in weights if weights[n] > 0]
+    chances = [weights[n] for n in names]
+    while time.monotonic() < deadline:
+        name = random.choices(names, chances)[0]
+        stats.scenarios[name] += 1
+        await SCENARIOS[name][1](client, ctx)
+        if args.think:
+            await asyncio.sleep(random.uniform(0, 2 * args.think))
+
+
+async def run(args):
+    stats = Stats()
+    prefix = f'LOAD-{int(time.time())}'
+    ctx = {'prefix': prefix, 'products': [], 'counter': iter(range(1, sys.maxsize))}
+    weights = parse_weights(args.weights)
+
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        # A few products for invoices and purchases to draw from
+        setup = Client(session, Stats(), args.base_url)
+        await setup.login()
+        for _ in range(args.products):
+            await create_product(setup, ctx)
+        if not ctx['products']:
+            raise SystemExit('Could not create load-test products')
+
+        stats.started = time.monotonic()
+        deadline = stats.started + args.ramp_up + args.duration
+        await asyncio.gather(*(virtual_user(i, args, session, stats, ctx, weights, deadline) for i in range(args.users)))
+        stats.finished = time.monotonic()
+    return stats.summary()
+
+
+def print_report(report, args):
+    print(f"\n{args.users} users, {args.ramp_up:g}s ramp-up, {args.duration:g}s steady state against {args.base_url}")
+    print(f"Scenarios run: {', '.join(f'{k}={v}' for k, v in sorted(report['scenarios'].items()))}\n")
+    header = f"{'endpoint':<42}{'reqs':>8}{'err':>6}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+    print(header)
+    print('-' * len(header))
+    for endpoint, row in report['endpoints'].items():
+        print(f"{endpoint:<42}{row['requests']:>8}{row['errors']:>6}{row['rps']:>9.1f}"
+              f"{row['p50']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}{row['max']:>9.1f}")
+    print('-' * len(header))
+    print(f"{'total':<42}{report['requests']:>8}{report['errors']:>6}{report['rps']:>9.1f}"
+          f"{report['p50']:>9.1f}{report['p95']:>9.1f}{report['p99']:>9.1f}")
+    print('(latencies in ms)')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Drive the TC00x API flows concurrently and report latency per endpoint')
+    parser.add_argument('--base-url', default=BASE_URL, help=f'Server to test (default {BASE_URL})')
+    parser.add_argument('--users', type=int, default=20, help='Concurrent virtual users')
+    parser.add_argument('--ramp-up', type=float, default=10, help='Seconds over which users start')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds to run after ramp-up')
+    parser.add_argument('--think', type=float, default=0.5, help='Mean pause between scenarios per user, in seconds')
+    parser.add_argument('--products', type=int, default=10, help='Products created up front for invoices and purchases')
+    parser.add_argument('--weights', help='Scenario weights, e.g. sales_invoice=50,browse_catalog=10')
+    parser.add_argument('--seed', type=int, help='Random seed for a repeatable scenario mix')
+    parser.add_argument('--json', help='Write the report to this file as JSON')
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    report = asyncio.run(run(args))
+    print_report(report, args)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if report['errors'] else 0)
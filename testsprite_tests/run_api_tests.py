@@ -0,0 +1,147 @@
+"""Run the TestSprite API tests in parallel.
+
+The generated TC00x API scripts run their test when executed and hardcode
+their fixtures ("Test Product for Purchase", SKU "TPP-001"...), so running two
+at once, or one twice, collides on names and on the unique SKU index. This
+runner executes every script in a pool of worker processes; inside a worker,
+requests is patched so that:
+
+  - 'name' and 'sku' fields of JSON bodies get a prefix unique to the run and
+    worker (in place, so the scripts' own assertions still compare equal)
+  - logging in as the same user is done once per worker and the response reused
+
+    python testsprite_tests/run_api_tests.py                # one worker per core
+    python testsprite_tests/run_api_tests.py -n 4 TC006 TC007
+
+Scripts that set EXCLUSIVE = True (e.g. a database restore) run one at a time
+after the others. UI (Playwright) scripts are skipped; exits non-zero if any
+test fails.
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import runpy
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASE_URL = 'http://localhost:3001'
+PREFIXED_FIELDS = ('name', 'sku')
+
+_prefix = ''
+_base_url = DEFAULT_BASE_URL
+_logins = {}  # (url, username, password) -> response
+
+
+def api_tests(selection):
+    """API test scripts (those not driving a browser), optionally filtered by TC id"""
+    tests = []
+    for path in sorted(glob.glob(os.path.join(HERE, 'TC*.py'))):
+        with open(path, encoding='utf-8') as f:
+            if 'playwright' in f.read():
+                continue
+        name = os.path.basename(path)
+        if not selection or any(name.startswith(s) for s in selection):
+            tests.append(path)
+    return tests
+
+
+def _patched(request):
+    def send(self, method, url, *args, **kwargs):
+        if _base_url != DEFAULT_BASE_URL and url.startswith(DEFAULT_BASE_URL):
+            url = _base_url + url[len(DEFAULT_BASE_URL):]
+
+        body = kwargs.get('json')
+        if isinstance(body, dict) and method.upper() in ('POST', 'PUT', 'PATCH'):
+            for field in PREFIXED_FIELDS:
+                value = body.get(field)
+                if isinstance(value, str) and value and not value.startswith(_prefix):
+                    body[field] = f'{_prefix}{value}'
+
+        if method.upper() == 'POST' and url.endswith('/api/auth/login') and isinstance(body, dict):
+            key = (url, body.get('username'), body.get('password'))
+            if key not in _logins:
+                response = request(self, method, url, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                _logins[key] = response
+            return _logins[key]
+
+        return request(self, method, url, *args, **kwargs)
+    return send
+
+
+def init_worker(run_id, base_url):
+    global _prefix, _base_url
+    _prefix = f'{run_id}-{os.getpid()}-'
+    _base_url = base_url.rstrip('/')
+    requests.Session.request = _patched(requests.Session.request)
+
+
+def is_exclusive(path):
+    with open(path, encoding='utf-8') as f:
+        return 'EXCLUSIVE = True' in f.read()
+
+
+def run_test(path):
+    output = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            runpy.run_path(path, run_name='__testsprite__')
+        error = None
+    except BaseException:
+        error = traceback.format_exc(limit=-3)
+    return {
+        'test': os.path.basename(path),
+        'ok': error is None,
+        'seconds': time.perf_counter() - start,
+        'error': error,
+        'output': output.getvalue(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the TestSprite API tests in parallel with isolated fixtures')
+    parser.add_argument('tests', nargs='*', help='Test ids or file name prefixes to run (default: all API tests)')
+    parser.add_argument('-n', '--workers', type=int, default=os.cpu_count() or 1, help='Worker processes (default: CPU count)')
+    parser.add_argument('--base-url', default=os.environ.get('TEST_BASE_URL', DEFAULT_BASE_URL), help='Server under test')
+    args = parser.parse_args()
+
+    tests = api_tests(args.tests)
+    if not tests:
+        sys.exit('No API tests matched')
+
+    run_id = f'T{int(time.time())}'
+    started = time.perf_counter()
+    results = []
+    exclusive = [path for path in tests if is_exclusive(path)]
+    shared = [path for path in tests if path not in exclusive]
+    for batch, workers in ((shared, args.workers), (exclusive, 1)):
+        if not batch:
+            continue
+        with ProcessPoolExecutor(max_workers=min(workers, len(batch)), initializer=init_worker,
+                                 initargs=(run_id, args.base_url)) as pool:
+            for future in as_completed(pool.submit(run_test, path) for path in batch):
+                result = future.result()
+                results.append(result)
+                print(f"{'PASS' if result['ok'] else 'FAIL'}  {result['test']:<60}{result['seconds']:>7.2f}s")
+
+    failed = [r for r in results if not r['ok']]
+    for result in sorted(failed, key=lambda r: r['test']):
+        print(f"\n---- {result['test']} ----")
+        if result['output']:
+            print(result['output'].rstrip())
+        print(result['error'].rstrip())
+
+    wall = time.perf_counter() - started
+    serial = sum(r['seconds'] for r in results)
+    print(f"\n{len(results) - len(failed)} passed, {len(failed)} failed in {wall:.1f}s "
+          f"({serial:.1f}s of test time, {args.workers} workers)")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,83 @@
+"""Run the Playwright UI tests concurrently in one shared browser.
+
+Each test still gets its own context (see ui.py); up to --concurrency of them
+run at once. Needs the dev server (npm run dev) and the API server running.
+
+    python testsprite_tests/run_ui_tests.py                 # all UI tests
+    python testsprite_tests/run_ui_tests.py -c 2 TC004 TC005
+
+Exits non-zero if any test fails.
+"""
+import argparse
+import asyncio
+import glob
+import importlib.util
+import os
+import sys
+import time
+import traceback
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+import ui  # noqa: E402
+
+
+def ui_tests(selection):
+    tests = []
+    for path in sorted(glob.glob(os.path.join(HERE, 'TC*.py'))):
+        with open(path, encoding='utf-8') as f:
+            if 'playwright' not in f.read():
+                continue
+        name = os.path.basename(path)
+        if not selection or any(name.startswith(s) for s in selection):
+            tests.append(path)
+    return tests
+
+
+def load(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.run_test
+
+
+async def run_one(path, slots):
+    async with slots:
+        start = time.perf_counter()
+        try:
+            await load(path)()
+            error = None
+        except Exception:
+            error = traceback.format_exc(limit=-3)
+        result = {'test': os.path.basename(path), 'ok': error is None, 'seconds': time.perf_counter() - start, 'error': error}
+        print(f"{'PASS' if result['ok'] else 'FAIL'}  {result['test']:<70}{result['seconds']:>7.2f}s", flush=True)
+        return result
+
+
+async def main(tests, concurrency):
+    slots = asyncio.Semaphore(concurrency)
+    try:
+        await ui.browser()
+        return await asyncio.gather(*(run_one(path, slots) for path in tests))
+    finally:
+        await ui.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the Playwright UI tests in one shared browser')
+    parser.add_argument('tests', nargs='*', help='Test ids or file name prefixes to run (default: all UI tests)')
+    parser.add_argument('-c', '--concurrency', type=int, default=os.cpu_count() or 1, help='Tests running at once (default: CPU count)')
+    args = parser.parse_args()
+
+    tests = ui_tests(args.tests)
+    if not tests:
+        sys.exit('No UI tests matched')
+
+    started = time.perf_counter()
+    results = asyncio.run(main(tests, args.concurrency))
+    failed = [r for r in results if not r['ok']]
+    for result in failed:
+        print(f"\n---- {result['test']} ----\n{result['error'].rstrip()}")
+    print(f"\n{len(results) - len(failed)} passed, {len(failed)} failed in {time.perf_counter() - started:.1f}s")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,160 @@
+"""Shared helpers for the Playwright UI tests (TC001-TC019 with capitalised names).
+
+- One Chromium per process, shared by every test; each test gets its own
+  context, so cookies and localStorage never leak between tests
+- new_page(authenticated=True) starts signed in as admin from a storage state
+  built with a single API login, instead of typing into the login form
+- click() and fill() rely on Playwright's locator auto-waiting (visible,
+  enabled, stable) rather than fixed sleeps; click() then waits until the app's
+  requests have settled
+
+Network idle is tracked here rather than with wait_for_load_state('networkidle'):
+the app keeps an SSE stream (/api/events) open, so the page never goes fully idle.
+"""
+import asyncio
+import contextlib
+import json
+import os
+import time
+import urllib.request
+
+from playwright.async_api import async_playwright
+
+BASE_URL = os.environ.get('UI_BASE_URL', 'http://localhost:5173')
+API_URL = os.environ.get('UI_API_URL', 'http://localhost:3001')
+USERNAME = 'admin'
+PASSWORD = 'admin123'
+DEFAULT_TIMEOUT = 10000
+# Quiet period that counts as idle
+IDLE_MS = 250
+# Requests that stay open for the life of the page
+STREAMING = ('/api/events',)
+LAUNCH_ARGS = ['--window-size=1280,720', '--disable-dev-shm-usage']
+
+_playwright = None
+_browser = None
+_auth_state = None
+_networks = {}
+
+
+class _Network:
+    """In-flight requests of one page, long-lived streams excluded"""
+
+    def __init__(self, page):
+        self.pending = set()
+        self.activity = 0
+        page.on('request', self._started)
+        page.on('requestfinished', self._ended)
+        page.on('requestfailed', self._ended)
+
+    def _started(self, request):
+        if request.resource_type == 'eventsource' or any(s in request.url for s in STREAMING):
+            return
+        self.pending.add(request)
+        self.activity += 1
+
+    def _ended(self, request):
+        if request in self.pending:
+            self.pending.discard(request)
+            self.activity += 1
+
+    async def idle(self, timeout):
+        deadline = time.monotonic() + timeout / 1000
+        while time.monotonic() < deadline:
+            seen = self.activity
+            await asyncio.sleep(IDLE_MS / 1000)
+            if not self.pending and self.activity == seen:
+                return
+        # Still busy: the next locator's own auto-wait has the final say
+
+
+async def browser():
+    global _playwright, _browser
+    if _browser is None:
+        _playwright = await async_playwright().start()
+        _browser = await _playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+    return _browser
+
+
+def _login_state():
+    """Storage state with the token and user the app keeps in localStorage"""
+    request = urllib.request.Request(
+        f'{API_URL}/api/auth/login',
+        data=json.dumps({'username': USERNAME, 'password': PASSWORD}).encode(),
+        headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request, timeout=30) as resp:
+        data = json.load(resp)
+    return {
+        'cookies': [],
+        'origins': [{
+            'origin': BASE_URL,
+            'localStorage': [
+                {'name': 'token', 'value': data['token']},
+                {'name': 'user', 'value': json.dumps(data['user'])},
+            ],
+        }],
+    }
+
+
+async def auth_state():
+    global _auth_state
+    if _auth_state is None:
+        _auth_state = await asyncio.to_thread(_login_state)
+    return _auth_state
+
+
+@contextlib.asynccontextmanager
+async def new_page(authenticated=False):
+    """A page in a fresh context of the shared browser"""
+    context = await (await browser()).new_context(
+        viewport={'width': 1280, 'height': 720},
+        storage_state=await auth_state() if authenticated else None,
+    )
+    context.set_default_timeout(DEFAULT_TIMEOUT)
+    try:
+        page = await context.new_page()
+        _networks[page] = _Network(page)
+        yield page
+    finally:
+        for page in context.pages:
+            _networks.pop(page, None)
+        await context.close()
+
+
+async def settle(page, timeout=DEFAULT_TIMEOUT):
+    network = _networks.get(page)
+    if network:
+        await network.idle(timeout)
+
+
+async def open(page, path='/'):
+    await page.goto(BASE_URL + path, wait_until='domcontentloaded')
+    await settle(page)
+
+
+async def click(locator):
+    await locator.click()
+    await settle(locator.page)
+
+
+async def fill(locator, value):
+    await locator.fill(value)
+
+
+async def close():
+    global _playwright, _browser
+    if _browser is not None:
+        await _browser.close()
+        await _playwright.stop()
+    _playwright = _browser = None
+
+
+def run(test):
+    """Run one test coroutine function on its own (python TC0xx_....py)"""
+    async def main():
+        try:
+            await test()
+        finally:
+            await close()
+    asyncio.run(main())